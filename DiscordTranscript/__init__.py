@@ -1,9 +1,16 @@
 from importlib.metadata import PackageNotFoundError, version
 
 from DiscordTranscript.chat_exporter import (
+    AssetCache,
     AttachmentHandler,
     AttachmentToDataURIHandler,
     AttachmentToDiscordChannelHandler,
+    CacheBackend,
+    DiskCache,
+    ExportStats,
+    LRUCache,
+    MessageSnapshot,
+    TranscriptRecorder,
     export,
     quick_export,
     raw_export,
@@ -24,4 +31,11 @@ __all__ = (
     AttachmentHandler,
     AttachmentToDataURIHandler,
     AttachmentToDiscordChannelHandler,
+    AssetCache,
+    CacheBackend,
+    DiskCache,
+    ExportStats,
+    LRUCache,
+    MessageSnapshot,
+    TranscriptRecorder,
 )
@@ -1,22 +1,35 @@
 import datetime
 import io
-from typing import TYPE_CHECKING, Optional
+import os
+from typing import TYPE_CHECKING, Any, Optional
 
 from DiscordTranscript.construct.attachment_handler import (
     AttachmentHandler,
     AttachmentToDataURIHandler,
     AttachmentToDiscordChannelHandler,
 )
+from DiscordTranscript.construct.recorder import TranscriptRecorder
 from DiscordTranscript.construct.transcript import Transcript
+from DiscordTranscript.ext.asset_cache import AssetCache
+from DiscordTranscript.ext.cache_backend import CacheBackend, DiskCache, LRUCache
 from DiscordTranscript.ext.discord_import import discord
+from DiscordTranscript.ext.snapshot import MessageSnapshot
+from DiscordTranscript.ext.stats import ExportStats
 
 if TYPE_CHECKING:
     import discord as discord_typings
 
 __all__ = (
+    "AssetCache",
     "AttachmentHandler",
     "AttachmentToDataURIHandler",
     "AttachmentToDiscordChannelHandler",
+    "CacheBackend",
+    "DiskCache",
+    "ExportStats",
+    "LRUCache",
+    "MessageSnapshot",
+    "TranscriptRecorder",
     "export",
     "quick_export",
     "raw_export",
@@ -85,6 +98,20 @@ async def export(
     after: datetime.datetime | None = None,
     attachment_handler: AttachmentHandler | None = None,
     language: str = "en",
+    fp: Any | None = None,
+    output_path: str | os.PathLike | None = None,
+    concurrency: int = 1,
+    cache_backend: CacheBackend | None = None,
+    max_downloads: int = 8,
+    max_downloads_per_host: int = 4,
+    stats: ExportStats | None = None,
+    history_shards: int = 1,
+    pipeline: bool = False,
+    fragment_cache: CacheBackend | None = None,
+    state_path: str | os.PathLike | None = None,
+    processes: int = 1,
+    ndjson_fp: Any | None = None,
+    ndjson_path: str | os.PathLike | None = None,
 ):
     """Creates a customized transcript of a Discord channel.
 
@@ -102,9 +129,52 @@ async def export(
         after (Optional[datetime.datetime]): The date to fetch messages after. Defaults to None.
         attachment_handler (Optional[AttachmentHandler]): The attachment handler to use. Defaults to None.
         language (str): The language to use for the transcript. Defaults to "en".
+        fp (Optional[Any]): A text or binary file-like object, or an async writer, to stream
+            the transcript into instead of building it in memory. Defaults to None.
+        output_path (Optional[str | os.PathLike]): A file path to stream the transcript into.
+            Takes precedence over ``fp``. Defaults to None.
+        concurrency (int): How many messages to render at once. Fetches and downloads for
+            different messages then overlap; the output is unchanged. Defaults to 1.
+        cache_backend (Optional[CacheBackend]): A cache such as `LRUCache` to keep member,
+            sticker and replied-to message lookups in across exports. Defaults to None (a cache
+            private to the export).
+        max_downloads (int): How many attachment downloads may run at once across the
+            transcript. Defaults to 8.
+        max_downloads_per_host (int): How many attachment downloads may run at once to a
+            single host. Defaults to 4.
+        stats (Optional[ExportStats]): An `ExportStats` to fill with per-stage timings,
+            call counts and the slowest messages. Defaults to None (not profiled).
+        history_shards (int): How many time windows of the history to fetch at once. The
+            ``[after, before]`` range is split into that many windows, paged concurrently
+            and merged back in order. Ignored when ``limit`` is set. Defaults to 1.
+        pipeline (bool): Whether to render messages while the history is still being
+            fetched. Only a window of recent messages is kept in memory, so memory stays
+            flat on large channels. Ignored when ``limit`` is set without ``after``.
+            Defaults to False.
+        fragment_cache (Optional[CacheBackend]): A cache such as `DiskCache` to keep the
+            rendered body of each message in. Re-exports of the same channel then only
+            render messages that are new, edited or whose reactions, attachments or embeds
+            changed. Defaults to None.
+        state_path (Optional[str | os.PathLike]): A file to keep the state of the export in,
+            such as the last message and the participants. When it describes the transcript
+            at ``output_path``, only the messages sent since are fetched and appended to it.
+            Requires ``output_path``. Defaults to None.
+        processes (int): How many worker processes to render the messages in. Rendering
+            then runs on other cores instead of the event loop; the output is unchanged.
+            Ignored with ``pipeline``. Defaults to 1 (rendered on the event loop).
+        ndjson_fp (Optional[Any]): A text or binary file-like object, or an async writer,
+            to write a structured record of each message into, one JSON object per line:
+            the author, resolved mentions, plain text, processed attachments, embeds,
+            components and reactions. The records are written as the HTML is rendered.
+            Defaults to None.
+        ndjson_path (Optional[str | os.PathLike]): A file path to write the records into.
+            Takes precedence over ``ndjson_fp``. Defaults to None.
 
     Returns:
-        str: The transcript HTML.
+        Optional[str]: The transcript HTML, or None when it was streamed to ``fp`` or ``output_path``.
+
+    Raises:
+        ValueError: If ``state_path`` is set without ``output_path``.
     """
     if guild:
         channel.guild = guild
@@ -122,6 +192,20 @@ async def export(
             bot=bot,
             attachment_handler=attachment_handler,
             language=language,
+            fp=fp,
+            output_path=output_path,
+            concurrency=concurrency,
+            cache_backend=cache_backend,
+            max_downloads=max_downloads,
+            max_downloads_per_host=max_downloads_per_host,
+            stats=stats,
+            history_shards=history_shards,
+            pipeline=pipeline,
+            fragment_cache=fragment_cache,
+            state_path=state_path,
+            processes=processes,
+            ndjson_fp=ndjson_fp,
+            ndjson_path=ndjson_path,
         ).export()
     ).html
 
@@ -136,6 +220,17 @@ async def raw_export(
     fancy_times: bool = True,
     attachment_handler: AttachmentHandler | None = None,
     language: str = "en",
+    fp: Any | None = None,
+    output_path: str | os.PathLike | None = None,
+    concurrency: int = 1,
+    cache_backend: CacheBackend | None = None,
+    max_downloads: int = 8,
+    max_downloads_per_host: int = 4,
+    stats: ExportStats | None = None,
+    fragment_cache: CacheBackend | None = None,
+    processes: int = 1,
+    ndjson_fp: Any | None = None,
+    ndjson_path: str | os.PathLike | None = None,
 ):
     """Creates a customized transcript with your own captured Discord messages.
 
@@ -151,9 +246,38 @@ async def raw_export(
         fancy_times (bool): Whether to use fancy times. Defaults to True.
         attachment_handler (Optional[AttachmentHandler]): The attachment handler to use. Defaults to None.
         language (str): The language to use for the transcript. Defaults to "en".
+        fp (Optional[Any]): A text or binary file-like object, or an async writer, to stream
+            the transcript into instead of building it in memory. Defaults to None.
+        output_path (Optional[str | os.PathLike]): A file path to stream the transcript into.
+            Takes precedence over ``fp``. Defaults to None.
+        concurrency (int): How many messages to render at once. Fetches and downloads for
+            different messages then overlap; the output is unchanged. Defaults to 1.
+        cache_backend (Optional[CacheBackend]): A cache such as `LRUCache` to keep member,
+            sticker and replied-to message lookups in across exports. Defaults to None (a cache
+            private to the export).
+        max_downloads (int): How many attachment downloads may run at once across the
+            transcript. Defaults to 8.
+        max_downloads_per_host (int): How many attachment downloads may run at once to a
+            single host. Defaults to 4.
+        stats (Optional[ExportStats]): An `ExportStats` to fill with per-stage timings,
+            call counts and the slowest messages. Defaults to None (not profiled).
+        fragment_cache (Optional[CacheBackend]): A cache such as `DiskCache` to keep the
+            rendered body of each message in. Re-exports of the same channel then only
+            render messages that are new, edited or whose reactions, attachments or embeds
+            changed. Defaults to None.
+        processes (int): How many worker processes to render the messages in. Rendering
+            then runs on other cores instead of the event loop; the output is unchanged.
+            Defaults to 1 (rendered on the event loop).
+        ndjson_fp (Optional[Any]): A text or binary file-like object, or an async writer,
+            to write a structured record of each message into, one JSON object per line:
+            the author, resolved mentions, plain text, processed attachments, embeds,
+            components and reactions. The records are written as the HTML is rendered.
+            Defaults to None.
+        ndjson_path (Optional[str | os.PathLike]): A file path to write the records into.
+            Takes precedence over ``ndjson_fp``. Defaults to None.
 
     Returns:
-        str: The transcript HTML.
+        Optional[str]: The transcript HTML, or None when it was streamed to ``fp`` or ``output_path``.
     """
     if guild:
         channel.guild = guild
@@ -171,5 +295,16 @@ async def raw_export(
             bot=bot,
             attachment_handler=attachment_handler,
             language=language,
+            fp=fp,
+            output_path=output_path,
+            concurrency=concurrency,
+            cache_backend=cache_backend,
+            max_downloads=max_downloads,
+            max_downloads_per_host=max_downloads_per_host,
+            stats=stats,
+            fragment_cache=fragment_cache,
+            processes=processes,
+            ndjson_fp=ndjson_fp,
+            ndjson_path=ndjson_path,
         ).export()
     ).html
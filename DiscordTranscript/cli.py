@@ -0,0 +1,385 @@
+import argparse
+import asyncio
+from collections.abc import AsyncIterator, Iterable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
+import os
+import sys
+from typing import IO
+
+from DiscordTranscript.construct.transcript import TranscriptDAO
+from DiscordTranscript.ext.cache_backend import DictCache
+from DiscordTranscript.ext.dce_archive import (
+    channel_from_archive,
+    guild_from_archive,
+    is_archive,
+    message_from_archive,
+    read_archive,
+)
+from DiscordTranscript.ext.discord_import import discord
+from DiscordTranscript.ext.payload import message_from_payload
+from DiscordTranscript.ext.references import ReferenceIndex
+from DiscordTranscript.ext.snapshot import (
+    ChannelSnapshot,
+    ClientSnapshot,
+    GuildSnapshot,
+    MessageSnapshot,
+    NotFound,
+)
+
+
+class ArchivedChannel:
+    """The channel of an archived dump, as the transcript header reads it.
+
+    Attributes:
+        id (int): The ID of the channel.
+        name (str): The name of the channel.
+        type (str): The type of the channel.
+        topic (Optional[str]): The topic of the channel.
+        created_at (datetime.datetime): When the channel was created.
+        guild (GuildSnapshot): The guild the channel belongs to.
+    """
+
+    def __init__(self, channel: ChannelSnapshot, guild: GuildSnapshot):
+        self.id = channel.id
+        self.name = channel.name
+        self.type = channel.type
+        self.topic = channel.topic
+        self.created_at = discord.utils.snowflake_time(channel.id or 0)
+        self.guild = guild
+
+    async def fetch_message(self, message_id: int):
+        raise NotFound(message_id)
+
+
+def load_guild(path: str | os.PathLike) -> GuildSnapshot:
+    """Reads a guild snapshot file.
+
+    Args:
+        path (str | os.PathLike): A JSON file holding the output of
+            ``GuildSnapshot.to_dict()``.
+
+    Returns:
+        GuildSnapshot: The guild, with its members, roles and channels.
+    """
+    with open(path, encoding="utf-8") as file:
+        return GuildSnapshot.from_dict(json.load(file))
+
+
+def read_message(data: dict, channel: ChannelSnapshot) -> MessageSnapshot:
+    """Reads a message of a dump.
+
+    Args:
+        data (dict): A message payload of the Discord API, or the output of
+            ``MessageSnapshot.to_dict()``.
+        channel (ChannelSnapshot): The channel of the dump.
+
+    Returns:
+        MessageSnapshot: The message.
+    """
+    if "type_value" in data:
+        return MessageSnapshot.from_dict(data)
+    return message_from_payload(data, channel)
+
+
+def _channel_id(data: dict) -> int | None:
+    if "type_value" in data:
+        return (data.get("channel") or {}).get("id")
+    channel_id = data.get("channel_id")
+    return int(channel_id) if channel_id is not None else None
+
+
+def dump_channel(file: IO[str], guild: GuildSnapshot) -> ChannelSnapshot:
+    """Finds the channel a dump was taken from.
+
+    The channel is looked up in ``guild`` by the ID of the first message. A
+    channel missing from it is named after the dump file. The file is rewound
+    afterwards.
+
+    Args:
+        file (IO[str]): The dump, opened in text mode.
+        guild (GuildSnapshot): The guild the channel belongs to.
+
+    Returns:
+        ChannelSnapshot: The channel.
+    """
+    channel_id = None
+    for line in file:
+        if line.strip():
+            channel_id = _channel_id(json.loads(line))
+            break
+    file.seek(0)
+    channel = guild.get_channel(channel_id)
+    if channel is None:
+        name = os.path.splitext(os.path.basename(getattr(file, "name", "dump")))[0]
+        channel = ChannelSnapshot(channel_id, name, "text")
+    return channel
+
+
+def _as_member(message: MessageSnapshot, guild: GuildSnapshot) -> MessageSnapshot:
+    member = guild.get_member(message.author.id)
+    return message if member is None else message.replace(author=member)
+
+
+async def read_messages(
+    file: IO[str],
+    channel: ChannelSnapshot,
+    guild: GuildSnapshot,
+    references: ReferenceIndex,
+    users: dict,
+) -> AsyncIterator[MessageSnapshot]:
+    """Reads the messages of a dump, one line at a time.
+
+    Authors who are members of ``guild`` are replaced by the members, as in
+    messages received from a guild. The ``referenced_message`` of an API payload
+    is remembered in ``references``, so replies to messages outside the dump still
+    show them. Mentioned users are added to ``users`` as they are read.
+
+    Args:
+        file (IO[str]): The dump, opened in text mode, with one message per line,
+            oldest first.
+        channel (ChannelSnapshot): The channel of the dump.
+        guild (GuildSnapshot): The guild the channel belongs to.
+        references (ReferenceIndex): Where to remember the replied-to messages.
+        users (dict): The users mentioned so far, keyed by ID.
+
+    Yields:
+        MessageSnapshot: Each message.
+    """
+    for line in file:
+        if not line.strip():
+            continue
+        data = json.loads(line)
+        referenced = data.get("referenced_message")
+        if referenced:
+            references.remember(
+                channel, _as_member(read_message(referenced, channel), guild)
+            )
+        message = _as_member(read_message(data, channel), guild)
+        for user in message.mentions:
+            users.setdefault(user.id, user)
+        yield message
+
+
+async def read_archive_messages(
+    messages: Iterable[dict],
+    channel: ChannelSnapshot,
+    guild: GuildSnapshot,
+    users: dict,
+) -> AsyncIterator[MessageSnapshot]:
+    """Reads the messages of a DiscordChatExporter JSON export.
+
+    Exports carry no member list, so each author is added to ``guild`` when it
+    is first read, which keeps the name colours of their roles. Authors already
+    known to ``guild`` are replaced by the members, and mentioned users are added
+    to ``users`` as they are read.
+
+    Args:
+        messages (Iterable[dict]): The exported messages, as read by
+            ``read_archive``.
+        channel (ChannelSnapshot): The channel of the export.
+        guild (GuildSnapshot): The guild the channel belongs to.
+        users (dict): The users mentioned so far, keyed by ID.
+
+    Yields:
+        MessageSnapshot: Each message.
+    """
+    for data in messages:
+        message = message_from_archive(data, channel)
+        guild.members.setdefault(message.author.id, message.author)
+        message = _as_member(message, guild)
+        for user in message.mentions:
+            users.setdefault(user.id, user)
+        yield message
+
+
+async def render_dump(
+    path: str | os.PathLike,
+    output: str | os.PathLike | None,
+    guild_path: str | os.PathLike | None = None,
+    tz_info: str = "UTC",
+    military_time: bool = True,
+    fancy_times: bool = True,
+    language: str = "en",
+) -> str:
+    """Renders a message dump into a transcript.
+
+    The dump is either NDJSON, with one message per line, or a DiscordChatExporter
+    JSON export. Either way the messages are read as they are rendered, so only
+    the recent ones are kept in memory, and the HTML is streamed to ``output``.
+
+    Args:
+        path (str | os.PathLike): The dump.
+        output (Optional[str | os.PathLike]): The file to write the transcript to, or
+            None to write it to the standard output.
+        guild_path (Optional[str | os.PathLike]): The guild snapshot file. Required
+            for NDJSON dumps; exports name their guild and channel themselves.
+            Defaults to None.
+        tz_info (str): The timezone to use for timestamps. Defaults to "UTC".
+        military_time (bool): Whether to use military time. Defaults to True.
+        fancy_times (bool): Whether to use fancy times. Defaults to True.
+        language (str): The language to use for the transcript. Defaults to "en".
+
+    Returns:
+        str: The path of the dump.
+
+    Raises:
+        ValueError: If an NDJSON dump is given no guild snapshot file.
+    """
+    cache = DictCache()
+    # Filled in as the dump is read, before the mentions are rendered.
+    users: dict = {}
+    with open(path, encoding="utf-8-sig") as file:
+        if is_archive(file):
+            header, messages = read_archive(file)
+            channel = channel_from_archive(header.get("channel") or {})
+            if guild_path is None:
+                guild = guild_from_archive(header)
+            else:
+                guild = load_guild(guild_path)
+                guild.channels.setdefault(channel.id, channel)
+            stream = read_archive_messages(messages, channel, guild, users)
+        elif guild_path is None:
+            raise ValueError("a guild snapshot file (--guild) is needed for NDJSON")
+        else:
+            guild = load_guild(guild_path)
+            channel = dump_channel(file, guild)
+            stream = read_messages(file, channel, guild, ReferenceIndex(cache), users)
+
+        transcript = TranscriptDAO(
+            channel=ArchivedChannel(channel, guild),
+            limit=None,
+            messages=None,
+            pytz_timezone=tz_info,
+            military_time=military_time,
+            fancy_times=fancy_times,
+            before=None,
+            after=None,
+            bot=ClientSnapshot(users),
+            attachment_handler=None,
+            language=language,
+            fp=sys.stdout if output is None else None,
+            output_path=output,
+            cache_backend=cache,
+        )
+        transcript.message_stream = stream
+        await transcript.build_transcript()
+    return os.fspath(path)
+
+
+def _render_dump(path: str, output: str | None, options: dict) -> str:
+    return asyncio.run(render_dump(path, output, **options))
+
+
+def _output_path(path: str, output: str | None, single: bool) -> str | None:
+    stem = os.path.splitext(os.path.basename(path))[0]
+    if output is None:
+        return os.path.join(os.path.dirname(path), f"{stem}.html")
+    if output == "-":
+        return None
+    if single and not os.path.isdir(output):
+        return output
+    os.makedirs(output, exist_ok=True)
+    return os.path.join(output, f"{stem}.html")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Builds the parser of the command line arguments.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(
+        prog="python -m DiscordTranscript",
+        description="Render HTML transcripts from NDJSON message dumps or "
+        "DiscordChatExporter JSON exports.",
+    )
+    parser.add_argument(
+        "dumps",
+        nargs="+",
+        help="NDJSON files with one message per line, oldest first (API payloads "
+        "or MessageSnapshot.to_dict() output), or DiscordChatExporter JSON exports.",
+    )
+    parser.add_argument(
+        "-g",
+        "--guild",
+        help="JSON file holding GuildSnapshot.to_dict() output. Required for NDJSON "
+        "dumps.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        help="Output file, directory, or - for the standard output. Defaults to "
+        "an .html file next to each dump.",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="How many dumps to render at once, each in its own process. "
+        "Defaults to the number of CPUs.",
+    )
+    parser.add_argument("--timezone", default="UTC", help='Defaults to "UTC".')
+    parser.add_argument("--language", default="en", help='Defaults to "en".')
+    parser.add_argument(
+        "--12-hour",
+        dest="military_time",
+        action="store_false",
+        help="Use 12-hour times.",
+    )
+    parser.add_argument(
+        "--no-fancy-times",
+        dest="fancy_times",
+        action="store_false",
+        help="Show plain dates instead of relative ones.",
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Renders the message dumps named on the command line.
+
+    Args:
+        argv (Optional[List[str]]): The arguments. Defaults to ``sys.argv[1:]``.
+
+    Returns:
+        int: The exit status: 0 if every dump was rendered, 1 otherwise.
+    """
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    single = len(args.dumps) == 1
+    if args.output == "-" and not single:
+        parser.error("only one dump can be written to the standard output")
+
+    options = {
+        "guild_path": args.guild,
+        "tz_info": args.timezone,
+        "military_time": args.military_time,
+        "fancy_times": args.fancy_times,
+        "language": args.language,
+    }
+    jobs = [(path, _output_path(path, args.output, single)) for path in args.dumps]
+    failed = 0
+
+    if args.jobs <= 1 or single:
+        for path, output in jobs:
+            try:
+                _render_dump(path, output, options)
+            except Exception as e:
+                failed += 1
+                print(f"{path}: {e}", file=sys.stderr)
+        return 1 if failed else 0
+
+    with ProcessPoolExecutor(min(args.jobs, len(jobs))) as pool:
+        futures = {
+            pool.submit(_render_dump, path, output, options): path
+            for path, output in jobs
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                failed += 1
+                print(f"{futures[future]}: {e}", file=sys.stderr)
+    return 1 if failed else 0
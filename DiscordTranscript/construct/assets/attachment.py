@@ -1,6 +1,7 @@
 import math
 from typing import TYPE_CHECKING, Optional
 
+from DiscordTranscript.ext.context import ExportContext
 from DiscordTranscript.ext.discord_utils import DiscordUtils
 from DiscordTranscript.ext.html_generator import (
     PARSE_MODE_NONE,
@@ -21,6 +22,7 @@ class Attachment:
     Attributes:
         attachments (discord.Attachment): The attachment to represent.
         guild (discord.Guild): The guild the attachment is in.
+        context (ExportContext): The export the attachment belongs to.
     """
 
     def __init__(
@@ -29,6 +31,7 @@ class Attachment:
         guild,
         bot: Optional["discord_typings.Client"] = None,
         timezone: str = "UTC",
+        context: ExportContext | None = None,
     ):
         """Initializes the Attachment.
 
@@ -37,11 +40,13 @@ class Attachment:
             guild (discord.Guild): The guild the attachment is in.
             bot (Optional[discord.Client]): The bot instance. Defaults to None.
             timezone (str): The timezone to use. Defaults to "UTC".
+            context (Optional[ExportContext]): The export this belongs to. Defaults to a new one.
         """
         self.attachments = attachments
         self.guild = guild
         self.bot = bot
         self.timezone = timezone
+        self.context = context or ExportContext()
 
     async def flow(self) -> str:
         """Builds the attachment and returns the HTML.
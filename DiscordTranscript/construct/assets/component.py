@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, Optional
 
-from DiscordTranscript.ext.discord_import import discord
+from DiscordTranscript.ext.context import ExportContext
 from DiscordTranscript.ext.discord_utils import DiscordUtils
 from DiscordTranscript.ext.html_generator import (
     PARSE_MODE_EMOJI,
@@ -17,6 +17,7 @@ from DiscordTranscript.ext.html_generator import (
     component_thumbnail,
     fill_out,
 )
+from DiscordTranscript.ext.snapshot import component_kind
 
 if TYPE_CHECKING:
     import discord as discord_typings
@@ -33,6 +34,7 @@ class Component:
         menu_div_id (int): The ID of the menu div.
         component (discord.Component): The component to represent.
         guild (discord.Guild): The guild the component is in.
+        context (ExportContext): The export the component belongs to.
     """
 
     styles = {
@@ -59,6 +61,7 @@ class Component:
         guild,
         bot: Optional["discord_typings.Client"] = None,
         timezone: str = "UTC",
+        context: ExportContext | None = None,
     ):
         """Initializes the Component.
 
@@ -67,11 +70,13 @@ class Component:
             guild (discord.Guild): The guild the component is in.
             bot (Optional[discord.Client]): The bot instance. Defaults to None.
             timezone (str): The timezone to use. Defaults to "UTC".
+            context (Optional[ExportContext]): The export this belongs to. Defaults to a new one.
         """
         self.component = component
         self.guild = guild
         self.bot = bot
         self.timezone = timezone
+        self.context = context or ExportContext()
 
     async def build_component(self, c):
         """Builds a component.
@@ -79,23 +84,26 @@ class Component:
         Args:
             c (discord.Component): The component to build.
         """
-        if isinstance(c, discord.Button):
+        kind = component_kind(c)
+        if kind == "button":
             await self.build_button(c)
-        elif isinstance(c, discord.SelectMenu):
+        elif kind == "select":
+            self.menu_div_id = self.context.next_menu_div_id()
             await self.build_menu(c)
-            Component.menu_div_id += 1
-        elif isinstance(c, discord.SectionComponent):
+        elif kind == "section":
             self.components += await self.build_section(c)
-        elif isinstance(c, discord.TextDisplay):
+        elif kind == "text_display":
             self.components += await self.build_text_display(c)
-        elif isinstance(c, discord.ThumbnailComponent):
+        elif kind == "thumbnail":
             self.components += await self.build_thumbnail(c)
-        elif isinstance(c, discord.SeparatorComponent):
+        elif kind == "separator":
             self.components += await self.build_separator(c)
-        elif isinstance(c, discord.Container):
+        elif kind == "container":
             self.components += await self.build_container(c)
-        elif isinstance(c, discord.ActionRow):
-            sub_component = Component(c, self.guild, self.bot, self.timezone)
+        elif kind == "action_row":
+            sub_component = Component(
+                c, self.guild, self.bot, self.timezone, self.context
+            )
             self.components += await sub_component.flow()
 
     async def build_container(self, c):
@@ -104,11 +112,15 @@ class Component:
         children = getattr(c, "children", [])
 
         for child in children:
-            if isinstance(child, discord.ActionRow):
-                sub_comp = Component(child, self.guild, self.bot, self.timezone)
+            if component_kind(child) == "action_row":
+                sub_comp = Component(
+                    child, self.guild, self.bot, self.timezone, self.context
+                )
                 children_html += await sub_comp.flow()
             else:
-                temp = Component(child, self.guild, self.bot, self.timezone)
+                temp = Component(
+                    child, self.guild, self.bot, self.timezone, self.context
+                )
 
                 await temp.build_component(child)
 
@@ -139,7 +151,7 @@ class Component:
         children_html = ""
         children = getattr(c, "children", [])
         for child in children:
-            temp = Component(child, self.guild, self.bot, self.timezone)
+            temp = Component(child, self.guild, self.bot, self.timezone, self.context)
             await temp.build_component(child)
             children_html += temp.components
             if temp.menus:
@@ -151,7 +163,9 @@ class Component:
 
         accessory_html = ""
         if c.accessory:
-            temp = Component(c.accessory, self.guild, self.bot, self.timezone)
+            temp = Component(
+                c.accessory, self.guild, self.bot, self.timezone, self.context
+            )
             await temp.build_component(c.accessory)
             accessory_html += temp.components
 
@@ -332,7 +346,7 @@ class Component:
         Returns:
             str: The HTML for the components.
         """
-        if isinstance(self.component, discord.Container):
+        if component_kind(self.component) == "container":
             self.components += await self.build_container(self.component)
         else:
             children = getattr(self.component, "children", [])
@@ -5,6 +5,7 @@ from typing import TYPE_CHECKING
 
 from pytz import timezone
 
+from DiscordTranscript.ext.context import ExportContext
 from DiscordTranscript.ext.discord_import import discord
 from DiscordTranscript.ext.html_generator import (
     PARSE_MODE_EMBED,
@@ -27,6 +28,7 @@ from DiscordTranscript.ext.html_generator import (
     embed_video,
     fill_out,
 )
+from DiscordTranscript.ext.snapshot import EmbedSnapshot
 
 if TYPE_CHECKING:
     import discord as discord_typings
@@ -59,6 +61,7 @@ class Embed:
         check_against (Any): The value to check against for empty values.
         embed (discord.Embed): The embed to represent.
         guild (discord.Guild): The guild the embed is in.
+        context (ExportContext): The export the embed belongs to.
     """
 
     r: int
@@ -82,6 +85,7 @@ class Embed:
         guild,
         bot: discord_typings.Client | None = None,
         timezone: str = "UTC",
+        context: ExportContext | None = None,
     ):
         """Initializes the Embed.
 
@@ -90,11 +94,13 @@ class Embed:
             guild (discord.Guild): The guild the embed is in.
             bot (Optional[discord.Client]): The bot instance. Defaults to None.
             timezone (str): The timezone to use. Defaults to "UTC".
+            context (Optional[ExportContext]): The export this belongs to. Defaults to a new one.
         """
         self.embed: discord_typings.Embed = embed
         self.guild: discord_typings.Guild = guild
         self.bot = bot
         self.timezone = timezone
+        self.context = context or ExportContext()
         self.timestamp = ""
         self.provider = ""
         self.video = ""
@@ -105,7 +111,9 @@ class Embed:
         Returns:
             str: The HTML of the embed.
         """
-        self.check_against = _gather_checker()
+        self.check_against = (
+            None if isinstance(self.embed, EmbedSnapshot) else _gather_checker()
+        )
         self.build_colour()
         await self.build_provider()
         await self.build_title()
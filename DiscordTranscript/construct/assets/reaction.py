@@ -1,6 +1,7 @@
 import re
 from typing import TYPE_CHECKING, Optional
 
+from DiscordTranscript.ext.context import ExportContext
 from DiscordTranscript.ext.emoji_convert import convert_emoji
 from DiscordTranscript.ext.html_generator import (
     PARSE_MODE_NONE,
@@ -19,6 +20,7 @@ class Reaction:
     Attributes:
         reaction (discord.Reaction): The reaction to represent.
         guild (discord.Guild): The guild the reaction is in.
+        context (ExportContext): The export the reaction belongs to.
     """
 
     def __init__(
@@ -27,6 +29,7 @@ class Reaction:
         guild,
         bot: Optional["discord_typings.Client"] = None,
         timezone: str = "UTC",
+        context: ExportContext | None = None,
     ):
         """Initializes the Reaction.
 
@@ -35,11 +38,13 @@ class Reaction:
             guild (discord.Guild): The guild the reaction is in.
             bot (Optional[discord.Client]): The bot instance. Defaults to None.
             timezone (str): The timezone to use. Defaults to "UTC".
+            context (Optional[ExportContext]): The export this belongs to. Defaults to a new one.
         """
         self.reaction = reaction
         self.guild = guild
         self.bot = bot
         self.timezone = timezone
+        self.context = context or ExportContext()
 
     async def flow(self):
         """Builds the reaction and returns the HTML.
@@ -1,12 +1,18 @@
 from __future__ import annotations
 
+import asyncio
 import base64
+import contextlib
 import io
+import sqlite3
 from typing import TYPE_CHECKING
 
 import aiohttp
 
+from DiscordTranscript.ext.asset_cache import AssetCache
+from DiscordTranscript.ext.context import ExportContext
 from DiscordTranscript.ext.discord_import import discord
+from DiscordTranscript.ext.snapshot import AttachmentSnapshot
 
 try:
     from PIL import Image, ImageOps
@@ -19,6 +25,39 @@ if TYPE_CHECKING:
     import discord as discord_typings
 
 
+async def fetch_asset(
+    url: str, session: aiohttp.ClientSession | None = None
+) -> tuple[int, bytes]:
+    """Downloads an asset.
+
+    During an export, the download goes through the export's scheduler, so it
+    shares its session, concurrency limits and in-flight downloads.
+
+    Args:
+        url (str): The URL of the asset.
+        session (Optional[aiohttp.ClientSession]): The session to download with.
+            Defaults to the session of the export in progress.
+
+    Returns:
+        Tuple[int, bytes]: The HTTP status and, when it is 200, the response body.
+    """
+    context = ExportContext.current()
+    if context is not None:
+        return await context.fetch(url, session)
+
+    close_session = session is None
+    if session is None:
+        session = aiohttp.ClientSession()
+    try:
+        async with session.get(url) as res:
+            if res.status != 200:
+                return res.status, b""
+            return res.status, await res.read()
+    finally:
+        if close_session:
+            await session.close()
+
+
 class AttachmentHandler:
     """A base class for handling attachments.
 
@@ -49,21 +88,26 @@ class AttachmentToDataURIHandler(AttachmentHandler):
         optimize_images: bool = True,
         max_image_dimension: int = 1280,
         quality: int = 80,
+        asset_cache: AssetCache | None = None,
     ):
         """Initializes AttachmentToDataURIHandler.
 
         Args:
             session (Optional[aiohttp.ClientSession]): The shared HTTP session to use.
+                Defaults to the session of the export in progress.
             only_expiring (bool): Whether to only convert expiring Discord URLs to Data URIs. Defaults to True.
             optimize_images (bool): Whether to resize and compress images before Base64 encoding. Defaults to True.
             max_image_dimension (int): Maximum width/height in pixels for compressed images. Defaults to 1280.
             quality (int): Compression quality (1-100) for JPEG/WebP images. Defaults to 80.
+            asset_cache (Optional[AssetCache]): An on-disk cache of processed assets, so
+                later exports skip downloading and optimising them again. Defaults to None.
         """
         self.session = session
         self.only_expiring = only_expiring
         self.optimize_images = optimize_images
         self.max_image_dimension = max_image_dimension
         self.quality = quality
+        self.asset_cache = asset_cache
         self._cache: dict[str, str] = {}
 
     def is_expiring_url(self, url: str) -> bool:
@@ -117,48 +161,77 @@ class AttachmentToDataURIHandler(AttachmentHandler):
     ) -> discord_typings.Attachment:
         """Saves an asset to a data URI and returns a new attachment.
 
+        The attachment itself is left unchanged.
+
         Args:
             attachment (discord.Attachment): The attachment to process.
 
         Returns:
-            discord.Attachment: The processed attachment with a new URL.
+            discord.Attachment | AttachmentSnapshot: A copy of the attachment whose
+                URLs are the data URI, or the attachment itself if it was not saved.
         """
         if self.only_expiring and not self.is_expiring_url(attachment.url):
             return attachment
 
         if attachment.url in self._cache:
             data_uri = self._cache[attachment.url]
-            attachment.url = data_uri
-            attachment.proxy_url = data_uri
-            return attachment
+            return AttachmentSnapshot.of(attachment).replace(
+                url=data_uri, proxy_url=data_uri
+            )
+
+        cache_key = None
+        if self.asset_cache is not None:
+            cache_key = self.asset_cache.make_key(
+                attachment.url,
+                attachment.content_type,
+                self.optimize_images and HAS_PIL,
+                self.max_image_dimension,
+                self.quality,
+            )
+            with contextlib.suppress(OSError, sqlite3.Error):
+                cached = await asyncio.to_thread(self.asset_cache.get, cache_key)
+                if cached is not None:
+                    return self._embed(attachment, *cached)
 
         try:
-            close_session = False
-            session = self.session
-            if session is None:
-                session = aiohttp.ClientSession()
-                close_session = True
-
-            try:
-                async with session.get(attachment.url) as res:
-                    if res.status != 200:
-                        return attachment
-                    data = await res.read()
-                    content_type = attachment.content_type
-                    if content_type and content_type.startswith("image/"):
-                        data, content_type = self._optimize_image(data, content_type)
-                    encoded_data = base64.b64encode(data).decode("utf-8")
-                    data_uri = f"data:{content_type};base64,{encoded_data}"
-                    self._cache[attachment.url] = data_uri
-                    attachment.url = data_uri
-                    attachment.proxy_url = data_uri
-                    return attachment
-            finally:
-                if close_session:
-                    await session.close()
+            status, data = await fetch_asset(attachment.url, self.session)
+            if status != 200:
+                return attachment
+            content_type = attachment.content_type
+            if content_type and content_type.startswith("image/"):
+                data, content_type = self._optimize_image(data, content_type)
+            if cache_key is not None:
+                with contextlib.suppress(OSError, sqlite3.Error):
+                    await asyncio.to_thread(
+                        self.asset_cache.set, cache_key, data, content_type
+                    )
+            return self._embed(attachment, data, content_type)
         except Exception:
             return attachment
 
+    def _embed(
+        self,
+        attachment: discord_typings.Attachment,
+        data: bytes,
+        content_type: str | None,
+    ) -> AttachmentSnapshot:
+        """Returns a copy of an attachment pointing at a data URI of its content.
+
+        Args:
+            attachment (discord.Attachment): The attachment, which is left unchanged.
+            data (bytes): The content of the attachment.
+            content_type (Optional[str]): The MIME type of the content.
+
+        Returns:
+            AttachmentSnapshot: The copy.
+        """
+        encoded_data = base64.b64encode(data).decode("utf-8")
+        data_uri = f"data:{content_type};base64,{encoded_data}"
+        self._cache[attachment.url] = data_uri
+        return AttachmentSnapshot.of(attachment).replace(
+            url=data_uri, proxy_url=data_uri
+        )
+
 
 class AttachmentToDiscordChannelHandler(AttachmentHandler):
     """Saves an attachment to a Discord channel and embeds it in the transcript.
@@ -177,6 +250,7 @@ class AttachmentToDiscordChannelHandler(AttachmentHandler):
         Args:
             channel (discord.TextChannel): The channel to save attachments to.
             session (Optional[aiohttp.ClientSession]): The shared HTTP session to use.
+                Defaults to the session of the export in progress.
         """
         self.channel = channel
         self.session = session
@@ -193,24 +267,12 @@ class AttachmentToDiscordChannelHandler(AttachmentHandler):
             discord.Attachment: The processed attachment with a new URL.
         """
         try:
-            close_session = False
-            session = self.session
-            if session is None:
-                session = aiohttp.ClientSession()
-                close_session = True
-
-            try:
-                async with session.get(attachment.url) as res:
-                    if res.status != 200:
-                        res.raise_for_status()
-                    data = io.BytesIO(await res.read())
-                    data.seek(0)
-                    attach = discord.File(data, attachment.filename)
-                    msg = await self.channel.send(file=attach)
-                    return msg.attachments[0]
-            finally:
-                if close_session:
-                    await session.close()
+            status, data = await fetch_asset(attachment.url, self.session)
+            if status != 200:
+                return attachment
+            attach = discord.File(io.BytesIO(data), attachment.filename)
+            msg = await self.channel.send(file=attach)
+            return msg.attachments[0]
         except Exception as e:
             if type(e).__name__ == "HTTPException":
                 raise e
@@ -1,16 +1,23 @@
 from __future__ import annotations
 
 import asyncio
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Iterable
 from datetime import timedelta
+import hashlib
 import html
+import json
 import re
+from time import perf_counter
 from typing import TYPE_CHECKING
 
 from pytz import timezone
 
 from DiscordTranscript.construct.assets import Attachment, Component, Embed, Reaction
 from DiscordTranscript.construct.attachment_handler import AttachmentHandler
+from DiscordTranscript.ext.asset_cache import normalize_url
 from DiscordTranscript.ext.cache import cache
+from DiscordTranscript.ext.context import ExportContext
 from DiscordTranscript.ext.discord_import import discord
 from DiscordTranscript.ext.discord_utils import DiscordUtils
 from DiscordTranscript.ext.discriminator import discriminator
@@ -34,10 +41,25 @@ from DiscordTranscript.ext.html_generator import (
     start_message,
     system_notification,
 )
+from DiscordTranscript.ext.members import MemberIndex, collect_user_ids
+from DiscordTranscript.ext.snapshot import (
+    AttachmentSnapshot,
+    ChannelSnapshot,
+    ComponentSnapshot,
+    EmbedSnapshot,
+    MessageSnapshot,
+    ReactionSnapshot,
+    RoleSnapshot,
+    UserSnapshot,
+)
+from DiscordTranscript.ext.stats import timed
+from DiscordTranscript.parse.plain_text import ParsePlainText
 
 if TYPE_CHECKING:
     import discord as discord_typings
 
+FRAGMENT_FORMAT = 3
+
 
 def _gather_user_bot(author: discord_typings.Member | discord_typings.User):
     if author.bot and author.public_flags.verified_bot:
@@ -47,6 +69,52 @@ def _gather_user_bot(author: discord_typings.Member | discord_typings.User):
     return ""
 
 
+def _member_index(context: ExportContext, guild: discord_typings.Guild) -> MemberIndex:
+    if context.members is None or context.members.guild is not guild:
+        context.members = MemberIndex(guild, context.cache)
+    return context.members
+
+
+def _missing_references(
+    messages: list[discord_typings.Message], message_dict: dict
+) -> list[tuple[object, int]]:
+    """Collects the replied-to messages that are not among the exported messages.
+
+    The reference of a thread's first message points to its starter message in
+    the parent channel, which is fetched separately, so it is left out.
+
+    Args:
+        messages (List[discord.Message]): The exported messages.
+        message_dict (dict): The exported messages, keyed by ID.
+
+    Returns:
+        List[Tuple[discord.abc.Messageable, int]]: The channel to fetch each missing
+            message from, and its ID.
+    """
+    references = []
+    for index, message in enumerate(messages):
+        if not message.reference or not message.reference.message_id:
+            continue
+        if index == 0 and "thread" in str(message.channel.type):
+            continue
+        if message.reference.message_id in message_dict:
+            continue
+        if hasattr(message.channel, "fetch_message"):
+            references.append((message.channel, message.reference.message_id))
+    return references
+
+
+def _is_regular_message(message: discord_typings.Message) -> bool:
+    return message.type not in (
+        discord.MessageType.pins_add,
+        discord.MessageType.thread_created,
+        discord.MessageType.recipient_remove,
+        discord.MessageType.recipient_add,
+        discord.MessageType.new_member,
+        discord.MessageType.premium_guild_subscription,
+    )
+
+
 def _set_edit_at(message_edited_at):
     return f'<span class="chatlog__reference-edited-timestamp" data-timestamp="{message_edited_at}">(edited)</span>'
 
@@ -67,15 +135,25 @@ class MessageConstruct:
         message_edited_at (str): The message's edit time.
         meta_data (dict): A dictionary of metadata for the transcript.
         message_html (str): The HTML for the message.
+        content (str): The HTML for the message's content, or its sticker.
         embeds (str): The HTML for the message's embeds.
         reactions (str): The HTML for the message's reactions.
         components (str): The HTML for the message's components.
         attachments (str): The HTML for the message's attachments.
+        processed_attachments (list): The message's attachments, as processed by the
+            attachment handler.
         interaction (str): The HTML for the message's interaction.
         bot (Optional[discord.Client]): The bot instance.
+        message_bodies (dict): The constructs of earlier messages and their body-rendering
+            tasks, keyed by message ID.
+        asset_tasks (dict): Attachment-processing tasks started ahead of time, keyed by message ID.
+        context (ExportContext): The export the message belongs to.
+        fragment_key (Optional[str]): The key of the message's body in the export's
+            fragment cache.
     """
 
     message_html: str = ""
+    content: str = ""
 
     embeds: str = ""
     reactions: str = ""
@@ -97,6 +175,10 @@ class MessageConstruct:
         attachment_handler: AttachmentHandler | None,
         bot: discord_typings.Client | None = None,
         translations: dict | None = None,
+        message_bodies: dict | None = None,
+        context: ExportContext | None = None,
+        asset_tasks: dict | None = None,
+        fragment_key: str | None = None,
     ):
         """Initializes the MessageConstruct.
 
@@ -111,6 +193,15 @@ class MessageConstruct:
             attachment_handler (Optional[AttachmentHandler]): The attachment handler to use.
             bot (Optional[discord.Client]): The bot instance.
             translations (dict): A dictionary of translations.
+            message_bodies (Optional[dict]): The constructs of earlier messages and their
+                body-rendering tasks, keyed by message ID. Replies to those messages wait
+                for the tasks before reading their rendered content.
+            context (Optional[ExportContext]): The export the message belongs to. Defaults to a new one.
+            asset_tasks (Optional[dict]): Attachment-processing tasks started ahead of time,
+                keyed by message ID. The message uses them instead of processing its
+                attachments itself.
+            fragment_key (Optional[str]): The key of the message's body in the fragment
+                cache of ``context``, if any. See `fragment_key`.
         """
         self.message = message
         self.previous_message = previous_message
@@ -120,8 +211,14 @@ class MessageConstruct:
         self.message_dict = message_dict
         self.attachment_handler = attachment_handler
         self.processed_tenor_links = []
+        self.processed_attachments = []
         self.bot = bot
         self.translations = translations or {}
+        self.message_bodies = message_bodies or {}
+        self.asset_tasks = asset_tasks if asset_tasks is not None else {}
+        self.context = context or ExportContext()
+        self.fragment_key = fragment_key
+        self.body_built = False
         self.time_format = "%A, %e %B %Y %I:%M %p"
         if self.military_time:
             self.time_format = "%A, %e %B %Y %H:%M"
@@ -160,15 +257,154 @@ class MessageConstruct:
             await self.build_message()
         return self.message_html, self.meta_data
 
+    async def build_record(self) -> dict:
+        """Builds the structured record of the message, for NDJSON exports.
+
+        The record reuses what the HTML was rendered from: the author as resolved
+        for the transcript, the mentions as they resolve in the content, and the
+        attachments as processed by the attachment handler. It is built after
+        `construct_message`.
+
+        Returns:
+            dict: The fields of the message, ready to be written as JSON.
+        """
+        message = self.message
+        author = await self._gather_member(message.author) or message.author
+        parser = ParsePlainText(
+            message.content or "", self.guild, bot=self.bot, timezone=self.pytz_timezone
+        )
+        text = await parser.flow()
+        users = dict(parser.users)
+        for user in message.mentions or ():
+            if user.id not in users:
+                users[user.id] = await self._gather_member(user) or user
+        reference = getattr(message, "reference", None)
+        attachments = (
+            self.processed_attachments if self.body_built else message.attachments
+        )
+        return {
+            "id": message.id,
+            "type": getattr(message.type, "name", message.type),
+            "channel_id": message.channel.id,
+            "created_at": message.created_at.isoformat(),
+            "edited_at": message.edited_at.isoformat() if message.edited_at else None,
+            "author": UserSnapshot.of(author).to_dict(),
+            "reference": {
+                "message_id": reference.message_id,
+                "channel_id": reference.channel_id,
+            }
+            if reference
+            else None,
+            "content": message.content or "",
+            "text": text,
+            "mentions": {
+                "users": [UserSnapshot.of(user).to_dict() for user in users.values()],
+                "roles": [
+                    RoleSnapshot.of(role).to_dict() for role in parser.roles.values()
+                ],
+                "channels": [
+                    ChannelSnapshot.of(channel).to_dict()
+                    for channel in parser.channels.values()
+                ],
+            },
+            "attachments": [
+                AttachmentSnapshot.of(attachment).to_dict()
+                for attachment in attachments or ()
+            ],
+            "embeds": [
+                EmbedSnapshot.of(embed).to_dict() for embed in message.embeds or ()
+            ],
+            "components": [
+                component.to_dict()
+                for component in map(ComponentSnapshot.of, message.components or ())
+                if component is not None
+            ],
+            "reactions": [
+                ReactionSnapshot.of(reaction).to_dict()
+                for reaction in message.reactions or ()
+            ],
+        }
+
+    def is_regular_message(self) -> bool:
+        """Checks if the message is rendered as a regular message rather than a notice.
+
+        Returns:
+            bool: Whether the message is a regular message.
+        """
+        return _is_regular_message(self.message)
+
     async def build_message(self):
         """Builds the HTML for a regular message."""
+        await self.build_message_body()
+        await self.build_components()
+        await self.build_message_template()
+        await self.build_meta_data()
+
+    async def build_message_body(self):
+        """Builds the parts of a regular message that do not depend on the transcript order.
+
+        This covers the content, reference, interaction, sticker, embeds, attachments
+        and reactions, and may run concurrently for several messages. Components,
+        grouping and metadata are built afterwards, in order, by `build_message`.
+
+        A body restored from the fragment cache still gets its reference built
+        again, as the preview shows the replied-to message as it is now.
+        """
+        if self.body_built:
+            return
+
+        if self._restore_body():
+            await self.build_reference()
+            return
+
         await self.build_content()
         await self.build_reference()
         await self.build_interaction()
         await self.build_sticker()
         await self.build_assets()
-        await self.build_message_template()
-        await self.build_meta_data()
+        self.body_built = True
+
+        fragments = self.context.fragments
+        if fragments is not None and self.fragment_key is not None:
+            fragments.set(
+                self.fragment_key,
+                {
+                    "content": self.content,
+                    "edited_at": self.message_edited_at,
+                    "interaction": self.interaction,
+                    "embeds": self.embeds,
+                    "attachments": self.attachments,
+                    "processed_attachments": [
+                        AttachmentSnapshot.of(attachment).to_dict()
+                        for attachment in self.processed_attachments
+                    ],
+                    "reactions": self.reactions,
+                },
+            )
+
+    def _restore_body(self) -> bool:
+        fragments = self.context.fragments
+        if fragments is None or self.fragment_key is None:
+            return False
+        try:
+            fragment = fragments.get(self.fragment_key)
+        except KeyError:
+            return False
+
+        for task in self.asset_tasks.pop(self.message.id, {}).values():
+            task.cancel()
+        self.content = fragment["content"]
+        self.message_edited_at = fragment["edited_at"]
+        self.interaction = fragment["interaction"]
+        self.embeds = fragment["embeds"]
+        self.attachments = fragment["attachments"]
+        self.processed_attachments = [
+            AttachmentSnapshot.from_dict(attachment)
+            for attachment in fragment["processed_attachments"]
+        ]
+        self.reactions = fragment["reactions"]
+        self.body_built = True
+        return True
 
     async def build_pin(self):
         """Builds the HTML for a message pin."""
@@ -230,7 +466,7 @@ class MessageConstruct:
     async def build_content(self):
         """Builds the HTML for the message's content."""
         if not self.message.content:
-            self.message.content = ""
+            self.content = ""
             return
 
         content = self.message.content
@@ -269,13 +505,15 @@ class MessageConstruct:
         if self.message_edited_at:
             self.message_edited_at = _set_edit_at(self.message_edited_at)
 
-        self.message.content = html.escape(content).replace("&#96;", "`")
-
-        self.message.content = await fill_out(
+        self.content = await fill_out(
             self.guild,
             message_content,
             [
-                ("MESSAGE_CONTENT", self.message.content, PARSE_MODE_MARKDOWN),
+                (
+                    "MESSAGE_CONTENT",
+                    html.escape(content).replace("&#96;", "`"),
+                    PARSE_MODE_MARKDOWN,
+                ),
                 ("EDIT", self.message_edited_at, PARSE_MODE_NONE),
             ],
             placeholders=placeholders,
@@ -292,13 +530,17 @@ class MessageConstruct:
         ref_msg_id = self.message.reference.message_id
         message: discord_typings.Message | None = self.message_dict.get(ref_msg_id)
 
+        rendered = self.message_bodies.get(ref_msg_id)
+        if rendered is not None:
+            await rendered[1]
+
         if not message and hasattr(self.message.channel, "fetch_message"):
             try:
-                message = await self.message.channel.fetch_message(ref_msg_id)
-            except Exception as e:
+                message = await self.context.references.get(
+                    self.message.channel, ref_msg_id
+                )
+            except Exception:
                 self.message_reference = ""
-                if type(e).__name__ == "NotFound":
-                    self.message_reference = message_reference_unknown
                 return
 
         if not message:
@@ -324,8 +566,9 @@ class MessageConstruct:
             icon = DiscordUtils.interaction_command_icon
             dummy = "Click to see command"
 
-        if not message.content:
-            message.content = dummy
+        content = rendered[0].content if rendered is not None else message.content
+        if not content:
+            content = dummy
 
         _, message_edited_at = self.set_time(message)
 
@@ -354,7 +597,7 @@ class MessageConstruct:
                 ("USER_COLOUR", user_colour, PARSE_MODE_NONE),
                 (
                     "CONTENT",
-                    message.content.replace("\n", "").replace("<br>", ""),
+                    content.replace("\n", "").replace("<br>", ""),
                     PARSE_MODE_REFERENCE,
                 ),
                 ("EDIT", message_edited_at, PARSE_MODE_NONE),
@@ -457,16 +700,11 @@ class MessageConstruct:
         if not self.message.stickers or not hasattr(self.message.stickers[0], "url"):
             return
 
-        sticker_image_url = self.message.stickers[0].url
-
-        if sticker_image_url.endswith(".json"):
-            sticker = await self.message.stickers[0].fetch()
-            pack_id = getattr(sticker, "pack_id", "0")
-            sticker_image_url = f"https://cdn.jsdelivr.net/gh/mahtoid/DiscordUtils@master/stickers/{pack_id}/{sticker.id}.gif"
+        sticker_image_url = await sticker_image(self.message.stickers[0])
 
         sticker_template = '<div class="chatlog__attachment"><img class="chatlog__sticker" src="{{ATTACH_URL}}" alt="Sticker" title="Sticker"></div>'
 
-        self.message.content = await fill_out(
+        self.content = await fill_out(
             self.guild,
             sticker_template,
             [
@@ -477,64 +715,70 @@ class MessageConstruct:
         )
 
     async def build_assets(self):
-        """Builds the HTML for the message's assets (embeds, attachments, components, reactions)."""
+        """Builds the HTML for the message's assets (embeds, attachments, reactions)."""
+        embeds = self.message.embeds
         if self.processed_tenor_links:
-            self.message.embeds = [
+            embeds = [
                 embed
-                for embed in self.message.embeds
+                for embed in embeds
                 if not (embed.url and embed.url in self.processed_tenor_links)
             ]
 
         if self.suppressed_embed_links:
-            self.message.embeds = [
+            embeds = [
                 embed
-                for embed in self.message.embeds
+                for embed in embeds
                 if not (embed.url and embed.url in self.suppressed_embed_links)
             ]
 
-        if self.message.embeds:
+        if embeds:
             embed_results = await asyncio.gather(
                 *(
                     Embed(
-                        e, self.guild, bot=self.bot, timezone=self.pytz_timezone
+                        e,
+                        self.guild,
+                        bot=self.bot,
+                        timezone=self.pytz_timezone,
+                        context=self.context,
                     ).flow()
-                    for e in self.message.embeds
+                    for e in embeds
                 )
             )
             self.embeds += "".join(embed_results)
 
         if self.message.attachments:
+            prefetched = self.asset_tasks.pop(self.message.id, {})
 
             async def _process_att(att):
-                if self.attachment_handler and isinstance(
+                if id(att) in prefetched:
+                    att = await prefetched[id(att)]
+                elif self.attachment_handler and isinstance(
                     self.attachment_handler, AttachmentHandler
                 ):
-                    att = await self.attachment_handler.process_asset(att)
-                return await Attachment(
-                    att, self.guild, bot=self.bot, timezone=self.pytz_timezone
+                    att = await _process_asset(self.attachment_handler, att)
+                return att, await Attachment(
+                    att,
+                    self.guild,
+                    bot=self.bot,
+                    timezone=self.pytz_timezone,
+                    context=self.context,
                 ).flow()
 
             att_results = await asyncio.gather(
                 *(_process_att(a) for a in self.message.attachments)
             )
-            self.attachments += "".join(att_results)
-
-        if self.message.components:
-            comp_results = await asyncio.gather(
-                *(
-                    Component(
-                        c, self.guild, bot=self.bot, timezone=self.pytz_timezone
-                    ).flow()
-                    for c in self.message.components
-                )
-            )
-            self.components += "".join(comp_results)
+            self.processed_attachments = [att for att, _ in att_results]
+            self.attachments += "".join(att_html for _, att_html in att_results)
 
         if self.message.reactions:
             react_results = await asyncio.gather(
                 *(
                     Reaction(
-                        r, self.guild, bot=self.bot, timezone=self.pytz_timezone
+                        r,
+                        self.guild,
+                        bot=self.bot,
+                        timezone=self.pytz_timezone,
+                        context=self.context,
                     ).flow()
                     for r in self.message.reactions
                 )
@@ -544,6 +788,27 @@ class MessageConstruct:
         if self.reactions:
             self.reactions = f'<div class="chatlog__reactions">{self.reactions}</div>'
 
+    async def build_components(self):
+        """Builds the HTML for the message's components.
+
+        Dropdown menus are numbered across the transcript, so components are
+        always built in transcript order.
+        """
+        if self.message.components:
+            comp_results = await asyncio.gather(
+                *(
+                    Component(
+                        c,
+                        self.guild,
+                        bot=self.bot,
+                        timezone=self.pytz_timezone,
+                        context=self.context,
+                    ).flow()
+                    for c in self.message.components
+                )
+            )
+            self.components += "".join(comp_results)
+
     async def build_message_template(self):
         """Builds the HTML for the message's template."""
         started = await self.generate_message_divider()
@@ -556,7 +821,7 @@ class MessageConstruct:
             message_body,
             [
                 ("MESSAGE_ID", str(self.message.id)),
-                ("MESSAGE_CONTENT", self.message.content, PARSE_MODE_NONE),
+                ("MESSAGE_CONTENT", self.content, PARSE_MODE_NONE),
                 ("EMBEDS", self.embeds, PARSE_MODE_NONE),
                 ("ATTACHMENTS", self.attachments, PARSE_MODE_NONE),
                 ("COMPONENTS", self.components, PARSE_MODE_NONE),
@@ -674,7 +939,7 @@ class MessageConstruct:
                     ("TIMESTAMP", str(self.message_created_at)),
                     ("DEFAULT_TIMESTAMP", str(default_timestamp), PARSE_MODE_NONE),
                     ("MESSAGE_ID", str(self.message.id)),
-                    ("MESSAGE_CONTENT", self.message.content, PARSE_MODE_NONE),
+                    ("MESSAGE_CONTENT", self.content, PARSE_MODE_NONE),
                     ("EMBEDS", self.embeds, PARSE_MODE_NONE),
                     ("ATTACHMENTS", self.attachments, PARSE_MODE_NONE),
                     ("COMPONENTS", self.components, PARSE_MODE_NONE),
@@ -812,27 +1077,21 @@ class MessageConstruct:
             timezone=self.pytz_timezone,
         )
 
-    @cache()
     async def _gather_member(
         self, author: discord_typings.Member | discord_typings.User
     ):
         """Gathers a member from the guild.
 
+        Members are read from the export's `MemberIndex`, which resolves them on
+        first use unless they were resolved ahead of rendering.
+
         Args:
             author (discord.Member | discord.User): The user to gather the member from.
 
         Returns:
             Optional[discord.Member]: The gathered member, or None if not found.
         """
-        member = self.guild.get_member(author.id)
-
-        if member:
-            return member
-
-        try:
-            return await self.guild.fetch_member(author.id)
-        except Exception:
-            return None
+        return await _member_index(self.context, self.guild).get(author.id)
 
     async def _gather_user_colour(
         self, author: discord_typings.Member | discord_typings.User
@@ -911,6 +1170,144 @@ class MessageConstruct:
         return local_time.strftime(self.time_format)
 
 
+@cache()
+async def _fetch_sticker(sticker: discord_typings.StickerItem):
+    """Fetches the full sticker behind a message sticker.
+
+    Args:
+        sticker (discord.StickerItem): The sticker attached to the message.
+
+    Returns:
+        discord.Sticker: The fetched sticker.
+    """
+    return await sticker.fetch()
+
+
+async def sticker_image(sticker: discord_typings.StickerItem) -> str:
+    """Returns the URL of the image shown for a sticker.
+
+    Lottie stickers (``.json``) cannot be shown as images, so their GIF copy on
+    the DiscordUtils CDN is used instead.
+
+    Args:
+        sticker (discord.StickerItem): The sticker attached to a message.
+
+    Returns:
+        str: The URL of the image.
+    """
+    sticker_image_url = sticker.url
+    if sticker_image_url.endswith(".json"):
+        sticker = await _fetch_sticker(sticker)
+        pack_id = getattr(sticker, "pack_id", "0")
+        sticker_image_url = f"https://cdn.jsdelivr.net/gh/mahtoid/DiscordUtils@master/stickers/{pack_id}/{sticker.id}.gif"
+    return sticker_image_url
+
+
+@timed("attachments")
+async def _process_asset(
+    attachment_handler: AttachmentHandler, attachment: discord_typings.Attachment
+) -> discord_typings.Attachment:
+    return await attachment_handler.process_asset(attachment)
+
+
+async def _build_message_body(mc: MessageConstruct) -> float:
+    start = perf_counter()
+    await mc.build_message_body()
+    return perf_counter() - start
+
+
+async def _assemble_message(mc: MessageConstruct, body: asyncio.Task | None) -> str:
+    seconds = 0.0
+    if body is not None:
+        seconds = await body
+    start = perf_counter()
+    content_html, _ = await mc.construct_message()
+
+    stats = mc.context.stats
+    if stats is not None:
+        seconds += perf_counter() - start
+        stats.record("messages", seconds, len(content_html))
+        stats.record_message(mc.message.id, seconds)
+    if mc.context.records is not None:
+        await mc.context.records.write(await mc.build_record())
+    return content_html
+
+
+def _render_options(
+    pytz_timezone, military_time, attachment_handler, translations
+) -> str:
+    """Describes the options that change how a message body renders."""
+    return json.dumps(
+        [
+            FRAGMENT_FORMAT,
+            str(pytz_timezone),
+            bool(military_time),
+            type(attachment_handler).__qualname__ if attachment_handler else None,
+            sorted((translations or {}).items()),
+        ],
+        default=str,
+    )
+
+
+def _fragment_key(message: discord_typings.Message, options: str) -> str:
+    """Builds the fragment cache key of a message body.
+
+    The key covers what a re-export can see change without an edit: reactions,
+    attachments and embeds (which Discord fills in after the message is sent).
+    Attachment URLs are keyed without their signature, which is renewed on
+    every fetch. The reply preview is left out, as it is built again on every
+    export.
+
+    Args:
+        message (discord.Message): The message.
+        options (str): The render options, as returned by `_render_options`.
+
+    Returns:
+        str: The key.
+    """
+    parts = [
+        message.id,
+        str(message.edited_at),
+        [(str(r.emoji), r.count) for r in message.reactions or ()],
+        [
+            (a.id, a.filename, a.size, normalize_url(a.url))
+            for a in message.attachments or ()
+        ],
+        [getattr(e, "url", None) for e in message.embeds or ()],
+        options,
+    ]
+    digest = hashlib.sha256(json.dumps(parts, default=str).encode()).hexdigest()
+    return f"{__name__}:fragment:{digest}"
+
+
+def _prefetch_assets(
+    message: discord_typings.Message,
+    attachment_handler: AttachmentHandler,
+    asset_tasks: dict[int, dict[int, asyncio.Task]],
+):
+    """Starts processing the attachments of an upcoming message.
+
+    Args:
+        message (discord.Message): The upcoming message.
+        attachment_handler (AttachmentHandler): The attachment handler to use.
+        asset_tasks (dict): The tasks started so far, keyed by message ID and then by
+            the ``id()`` of each attachment.
+    """
+    if message.id in asset_tasks or not _is_regular_message(message):
+        return
+    if message.attachments:
+        asset_tasks[message.id] = {
+            id(attachment): asyncio.ensure_future(
+                _process_asset(attachment_handler, attachment)
+            )
+            for attachment in message.attachments
+        }
+
+
+def _is_cached(fragments, key: str | None) -> bool:
+    return fragments is not None and key is not None and key in fragments
+
+
 async def gather_messages(
     messages: list[discord_typings.Message],
     guild: discord_typings.Guild,
@@ -919,6 +1316,8 @@ async def gather_messages(
     attachment_handler: AttachmentHandler | None,
     bot: discord_typings.Client | None = None,
     translations: dict | None = None,
+    concurrency: int = 1,
+    context: ExportContext | None = None,
 ) -> tuple[str, dict]:
     """Gathers all messages in a channel and returns the HTML and metadata.
 
@@ -930,52 +1329,312 @@ async def gather_messages(
         attachment_handler (Optional[AttachmentHandler]): The attachment handler to use.
         bot (Optional[discord.Client]): The bot instance.
         translations (dict): A dictionary of translations.
+        concurrency (int): How many messages to render at once. Defaults to 1.
+        context (Optional[ExportContext]): The export the messages belong to. When
+            omitted, a context is created for this call and closed at the end.
 
     Returns:
         Tuple[str, dict]: A tuple containing the HTML and metadata.
     """
-    message_html: str = ""
     meta_data: dict = {}
-    previous_message: discord_typings.Message | None = None
+    message_html = "".join(
+        [
+            chunk
+            async for chunk in stream_messages(
+                messages,
+                guild,
+                pytz_timezone,
+                military_time,
+                attachment_handler,
+                meta_data,
+                bot=bot,
+                translations=translations,
+                concurrency=concurrency,
+                context=context,
+            )
+        ]
+    )
+    return message_html, meta_data
+
 
-    message_dict = {message.id: message for message in messages}
+async def thread_starter(
+    first: discord_typings.Message, guild: discord_typings.Guild
+) -> discord_typings.Message:
+    """Returns the message a transcript starts with.
 
-    if (
-        messages
-        and "thread" in str(messages[0].channel.type)
-        and messages[0].reference
-        and messages[0].reference.channel_id
-        and messages[0].reference.message_id
+    The first message of a thread refers to the message the thread was started
+    from, in the parent channel, which is shown in its place.
+
+    Args:
+        first (discord.Message): The first message of the channel.
+        guild (discord.Guild): The guild the channel belongs to.
+
+    Returns:
+        discord.Message: The message the thread was started from, without its
+            reference, or ``first`` for other channels.
+    """
+    if not (
+        "thread" in str(first.channel.type)
+        and first.reference
+        and first.reference.channel_id
+        and first.reference.message_id
     ):
-        ref_channel_id = messages[0].reference.channel_id
-        ref_msg_id = messages[0].reference.message_id
-        channel = guild.get_channel(ref_channel_id)
+        return first
+
+    ref_channel_id = first.reference.channel_id
+    ref_msg_id = first.reference.message_id
+    channel = guild.get_channel(ref_channel_id)
+
+    if not channel:
+        channel = await guild.fetch_channel(ref_channel_id)
+
+    if hasattr(channel, "fetch_message"):
+        first = await channel.fetch_message(ref_msg_id)
+        first.reference = None
+    return first
+
+
+async def reply_target(
+    message: discord_typings.Message,
+    guild: discord_typings.Guild,
+    pytz_timezone,
+    military_time: bool,
+    attachment_handler: AttachmentHandler | None = None,
+    bot: discord_typings.Client | None = None,
+    translations: dict | None = None,
+    context: ExportContext | None = None,
+) -> MessageSnapshot:
+    """Takes a snapshot of a message of the transcript, as replies to it show it.
 
-        if not channel:
-            channel = await guild.fetch_channel(ref_channel_id)
+    The preview of a reply to a message of the transcript shows its rendered
+    content. A message rendered apart from the replies to it is remembered in this
+    form, so replies rendered later show the same preview. The body is restored
+    from the fragment cache of ``context`` when it holds it.
 
-        if hasattr(channel, "fetch_message"):
-            message = await channel.fetch_message(ref_msg_id)
-            messages[0] = message
-            messages[0].reference = None
+    Args:
+        message (discord.Message): The message.
+        guild (discord.Guild): The guild the channel belongs to.
+        pytz_timezone (str): The timezone to use for timestamps.
+        military_time (bool): Whether to use military time.
+        attachment_handler (Optional[AttachmentHandler]): The attachment handler the
+            transcript is rendered with. Defaults to None.
+        bot (Optional[discord.Client]): The bot instance. Defaults to None.
+        translations (dict): A dictionary of translations. Defaults to None.
+        context (Optional[ExportContext]): The export the message belongs to.
+            Defaults to a new one.
 
-    for message in messages:
-        mc = MessageConstruct(
+    Returns:
+        MessageSnapshot: A snapshot of the message, with its content rendered.
+    """
+    snapshot = MessageSnapshot.of(message)
+    if not _is_regular_message(message):
+        return snapshot
+
+    context = context or ExportContext()
+    fragment_key = None
+    if context.fragments is not None:
+        fragment_key = _fragment_key(
             message,
-            previous_message,
-            pytz_timezone,
-            military_time,
-            guild,
-            meta_data,
-            message_dict,
-            attachment_handler,
-            bot=bot,
-            translations=translations,
+            _render_options(
+                pytz_timezone, military_time, attachment_handler, translations
+            ),
         )
-        content_html, meta_data = await mc.construct_message()
+    mc = MessageConstruct(
+        message,
+        None,
+        pytz_timezone,
+        military_time,
+        guild,
+        {},
+        {},
+        attachment_handler,
+        bot=bot,
+        translations=translations,
+        context=context,
+        fragment_key=fragment_key,
+    )
+    if not mc._restore_body():
+        await mc.build_content()
+        await mc.build_sticker()
+    return snapshot.replace(content=mc.content)
+
+
+async def _iterate(messages: Iterable | AsyncIterable) -> AsyncIterator:
+    if isinstance(messages, AsyncIterable):
+        async for message in messages:
+            yield message
+    else:
+        for message in messages:
+            yield message
+
+
+async def stream_messages(
+    messages: list[discord_typings.Message] | AsyncIterable[discord_typings.Message],
+    guild: discord_typings.Guild,
+    pytz_timezone,
+    military_time,
+    attachment_handler: AttachmentHandler | None,
+    meta_data: dict,
+    bot: discord_typings.Client | None = None,
+    translations: dict | None = None,
+    concurrency: int = 1,
+    context: ExportContext | None = None,
+    window: int = 1000,
+    previous_message: discord_typings.Message | None = None,
+) -> AsyncIterator[str]:
+    """Renders the messages of a channel in order.
+
+    Up to ``concurrency`` message bodies (content, references, stickers, embeds,
+    attachments and reactions) are rendered at the same time. Components, message
+    grouping and metadata are then applied one message at a time, in order, so the
+    output is identical to rendering sequentially. When ``concurrency`` is above 1,
+    the attachments of the next ``concurrency`` messages are also processed ahead
+    of their bodies.
+
+    ``messages`` may also be an async iterable, such as a history iterator, in
+    which case each message is rendered as soon as it arrives. Only the last
+    ``window`` messages are then kept for reply lookups; replies to older messages
+    fetch them from the channel instead.
+
+    The members behind the authors, mentions and interactions of a list of
+    messages, and the replied-to messages missing from it, are fetched in bulk
+    before rendering starts. For messages from an async iterable, they are
+    fetched as they first appear.
+
+    The transcript metadata is accumulated into ``meta_data`` as messages are
+    rendered, so it is only complete once the iterator is exhausted.
+
+    When ``previous_message`` is set, the messages continue an earlier transcript
+    whose last message group was left open: the first message joins that group
+    or closes it, as if both had been rendered together.
 
-        message_html += content_html
-        previous_message = message
+    Args:
+        messages (List[discord.Message] | AsyncIterable[discord.Message]): The
+            messages to render, oldest first.
+        guild (discord.Guild): The guild the channel belongs to.
+        pytz_timezone (str): The timezone to use for timestamps.
+        military_time (bool): Whether to use military time.
+        attachment_handler (Optional[AttachmentHandler]): The attachment handler to use.
+        meta_data (dict): The dictionary to collect the transcript's metadata in.
+        bot (Optional[discord.Client]): The bot instance.
+        translations (dict): A dictionary of translations.
+        concurrency (int): How many message bodies to render at once. Defaults to 1.
+        context (Optional[ExportContext]): The export the messages belong to. When
+            omitted, a context is created for this call and closed at the end.
+        window (int): How many recent messages to keep for reply lookups when
+            ``messages`` is an async iterable. Defaults to 1000.
+        previous_message (Optional[discord.Message]): The last message of the earlier
+            transcript the messages are appended to. Only its ``type``, ``author.id``
+            and ``created_at`` are used. Defaults to None.
+
+    Yields:
+        str: The HTML of each message, followed by the closing tag of the last group.
+    """
+    continues = previous_message is not None
+
+    if isinstance(messages, AsyncIterable):
+        message_dict: dict = {}
+        referenced_ids = None
+    else:
+        message_dict = {message.id: message for message in messages}
+        referenced_ids = {
+            message.reference.message_id
+            for message in messages
+            if message.reference and message.reference.message_id
+        }
+        window = 0
+    source = _iterate(messages)
+
+    message_bodies: dict[int, tuple[MessageConstruct, asyncio.Task]] = {}
+    asset_tasks: dict[int, dict[int, asyncio.Task]] = {}
+    prefetch_distance = concurrency if concurrency > 1 else 0
+    if not isinstance(attachment_handler, AttachmentHandler):
+        prefetch_distance = 0
+    fragment_keys: dict[int, str] = {}
+    upcoming: deque[discord_typings.Message] = deque()
+    pending: deque[tuple[MessageConstruct, asyncio.Task | None]] = deque()
+    owns_context = context is None
+    if context is None:
+        context = ExportContext()
+
+    try:
+        if not isinstance(messages, AsyncIterable):
+            await asyncio.gather(
+                _member_index(context, guild).resolve(collect_user_ids(messages)),
+                context.references.resolve(_missing_references(messages, message_dict)),
+            )
 
-    message_html += "</div>"
-    return message_html, meta_data
+        fragments = context.fragments
+        options = _render_options(
+            pytz_timezone, military_time, attachment_handler, translations
+        )
+
+        first = await anext(source, None)
+        if first is not None and not continues:
+            first = await thread_starter(first, guild)
+
+        following = first
+        while following is not None or upcoming:
+            if following is not None:
+                upcoming.append(following)
+                if fragments is not None and _is_regular_message(following):
+                    fragment_keys[following.id] = _fragment_key(following, options)
+                if prefetch_distance and not _is_cached(
+                    fragments, fragment_keys.get(following.id)
+                ):
+                    _prefetch_assets(following, attachment_handler, asset_tasks)
+                following = await anext(source, None)
+                if following is not None and len(upcoming) <= prefetch_distance:
+                    continue
+
+            message = upcoming.popleft()
+            if window:
+                message_dict[message.id] = message
+                if len(message_dict) > window:
+                    oldest_id = next(iter(message_dict))
+                    del message_dict[oldest_id]
+                    message_bodies.pop(oldest_id, None)
+
+            mc = MessageConstruct(
+                message,
+                previous_message,
+                pytz_timezone,
+                military_time,
+                guild,
+                meta_data,
+                message_dict,
+                attachment_handler,
+                bot=bot,
+                translations=translations,
+                message_bodies=message_bodies,
+                context=context,
+                asset_tasks=asset_tasks,
+                fragment_key=fragment_keys.pop(message.id, None),
+            )
+            body = None
+            if mc.is_regular_message():
+                body = asyncio.ensure_future(_build_message_body(mc))
+                if referenced_ids is None or message.id in referenced_ids:
+                    message_bodies[message.id] = (mc, body)
+            pending.append((mc, body))
+            previous_message = message
+
+            if len(pending) >= max(concurrency, 1):
+                yield await _assemble_message(*pending.popleft())
+
+        while pending:
+            yield await _assemble_message(*pending.popleft())
+    finally:
+        for _, body in pending:
+            if body is not None:
+                body.cancel()
+        for tasks in asset_tasks.values():
+            for task in tasks.values():
+                task.cancel()
+        await source.aclose()
+        if isinstance(messages, AsyncIterable) and hasattr(messages, "aclose"):
+            await messages.aclose()
+        if owns_context:
+            await context.close()
+
+    yield "</div>"
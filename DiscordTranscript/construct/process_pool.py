@@ -0,0 +1,385 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor
+import io
+import json
+import multiprocessing
+import re
+from typing import TYPE_CHECKING
+
+from DiscordTranscript.construct.attachment_handler import AttachmentHandler
+from DiscordTranscript.construct.message import (
+    _is_regular_message,
+    _member_index,
+    _missing_references,
+    _process_asset,
+    reply_target,
+    sticker_image,
+    stream_messages,
+    thread_starter,
+)
+from DiscordTranscript.ext.context import ExportContext
+from DiscordTranscript.ext.export_state import ExportState
+from DiscordTranscript.ext.members import collect_user_ids
+from DiscordTranscript.ext.snapshot import (
+    ClientSnapshot,
+    ComponentSnapshot,
+    EmbedSnapshot,
+    GuildSnapshot,
+    MessageSnapshot,
+    StickerSnapshot,
+    UserSnapshot,
+)
+from DiscordTranscript.ext.writer import RecordWriter
+
+if TYPE_CHECKING:
+    import discord as discord_typings
+
+CHUNK_SIZE = 200
+START_METHOD = "spawn"
+
+REGEX_MEMBERS = re.compile(r"<@!?([0-9]+)>")
+
+_worker: dict = {}
+
+
+class RenderJob:
+    """A run of consecutive messages for a worker process to render.
+
+    Attributes:
+        messages (List[MessageSnapshot]): The messages, oldest first.
+        previous (Optional[ExportState]): Holds the message rendered before the
+            first one, whose group the first message may continue.
+        references (List[Tuple[MessageSnapshot, bool]]): The messages replied to
+            from this run that are not part of it, and whether each one is part of
+            the transcript, in which case its body is rendered before it is shown.
+        menu_div_id (int): The ID of the first dropdown menu of the run.
+    """
+
+    def __init__(
+        self,
+        messages: list[MessageSnapshot],
+        previous: ExportState | None,
+        references: list[tuple[MessageSnapshot, bool]],
+        menu_div_id: int,
+    ):
+        self.messages = messages
+        self.previous = previous
+        self.references = references
+        self.menu_div_id = menu_div_id
+
+
+def _init_worker(guild: GuildSnapshot, client: ClientSnapshot, options: tuple):
+    _worker["guild"] = guild
+    _worker["client"] = client
+    _worker["options"] = options
+
+
+def _render_job(job: RenderJob) -> tuple[str, dict, str]:
+    return asyncio.run(_render(job))
+
+
+async def _render(job: RenderJob) -> tuple[str, dict, str]:
+    guild = _worker["guild"]
+    client = _worker["client"]
+    pytz_timezone, military_time, translations, records = _worker["options"]
+    meta_data: dict = {}
+    lines = io.StringIO()
+
+    async with ExportContext() as context:
+        context.menu_div_id = job.menu_div_id
+        if records:
+            context.records = RecordWriter(lines)
+        for message, in_transcript in job.references:
+            if in_transcript:
+                message = await reply_target(
+                    message,
+                    guild,
+                    pytz_timezone,
+                    military_time,
+                    bot=client,
+                    translations=translations,
+                    context=context,
+                )
+            # The first message may be a thread's starter, from the parent channel.
+            context.references.remember(job.messages[-1].channel, message)
+
+        chunks = [
+            chunk
+            async for chunk in stream_messages(
+                job.messages,
+                guild,
+                pytz_timezone,
+                military_time,
+                None,
+                meta_data,
+                bot=client,
+                translations=translations,
+                context=context,
+                previous_message=job.previous.previous_message()
+                if job.previous is not None
+                else None,
+            )
+        ]
+    # The closing tag of the last group is written once, after the last run.
+    return "".join(chunks[:-1]), meta_data, lines.getvalue()
+
+
+def _count_menus(component: ComponentSnapshot) -> int:
+    count = 1 if component.kind == "select" else 0
+    count += sum(_count_menus(child) for child in component.children)
+    if component.accessory is not None:
+        count += _count_menus(component.accessory)
+    return count
+
+
+def _menu_count(message: MessageSnapshot) -> int:
+    """Counts the dropdown menus rendered for a message, which are numbered across the transcript."""
+    if not _is_regular_message(message):
+        return 0
+    return sum(
+        _count_menus(child)
+        for component in message.components
+        for child in component.children
+    )
+
+
+def _component_texts(component: ComponentSnapshot):
+    for name in ("content", "label", "placeholder"):
+        value = getattr(component, name, None)
+        if value:
+            yield str(value)
+    for option in getattr(component, "options", None) or []:
+        yield option.label
+        if option.description:
+            yield option.description
+    for child in component.children:
+        yield from _component_texts(child)
+    if component.accessory is not None:
+        yield from _component_texts(component.accessory)
+
+
+def _mentioned_ids(message: discord_typings.Message) -> list[int]:
+    """Collects the users mentioned in the text of a message, its embeds and components."""
+    texts = [message.content or ""]
+    for embed in message.embeds or []:
+        texts.append(json.dumps(EmbedSnapshot.of(embed).to_dict()))
+    for component in message.components or []:
+        snapshot = ComponentSnapshot.of(component)
+        if snapshot is not None:
+            texts.extend(_component_texts(snapshot))
+    return [int(user_id) for text in texts for user_id in REGEX_MEMBERS.findall(text)]
+
+
+async def _snapshot_message(
+    message: discord_typings.Message,
+    attachment_handler: AttachmentHandler | None,
+) -> MessageSnapshot:
+    """Takes a snapshot of a message, with its attachments processed and stickers resolved."""
+    if not _is_regular_message(message):
+        return MessageSnapshot.of(message)
+
+    attachments = None
+    if message.attachments and isinstance(attachment_handler, AttachmentHandler):
+        attachments = await asyncio.gather(
+            *(
+                _process_asset(attachment_handler, attachment)
+                for attachment in message.attachments
+            )
+        )
+    stickers = None
+    if message.stickers and hasattr(message.stickers[0], "url"):
+        stickers = [StickerSnapshot(await sticker_image(message.stickers[0]))]
+    return MessageSnapshot.of(message, attachments, stickers)
+
+
+async def stream_messages_in_processes(
+    messages: list[discord_typings.Message],
+    guild: discord_typings.Guild,
+    pytz_timezone,
+    military_time,
+    attachment_handler: AttachmentHandler | None,
+    meta_data: dict,
+    bot: discord_typings.Client | None = None,
+    translations: dict | None = None,
+    processes: int = 2,
+    context: ExportContext | None = None,
+    previous_message: discord_typings.Message | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> AsyncIterator[str]:
+    """Renders the messages of a channel in worker processes, in order.
+
+    Rendering markdown, mentions and templates keeps a core busy, which would
+    otherwise stall the event loop. Here, the messages are turned into picklable
+    `MessageSnapshot` objects and rendered ``chunk_size`` at a time by a pool of
+    ``processes`` worker processes, which need no Discord client.
+
+    Everything that needs the client is done here first: the members behind the
+    authors, mentions and interactions, the users mentioned who are not members,
+    the replied-to messages missing from ``messages`` and the thread starter
+    message are resolved up front, and the attachments and stickers of each chunk
+    are processed before the chunk is sent out. The output is the same as that of
+    `stream_messages`.
+
+    Args:
+        messages (List[discord.Message]): The messages to render, oldest first.
+        guild (discord.Guild): The guild the channel belongs to.
+        pytz_timezone (str): The timezone to use for timestamps.
+        military_time (bool): Whether to use military time.
+        attachment_handler (Optional[AttachmentHandler]): The attachment handler to use.
+        meta_data (dict): The dictionary to collect the transcript's metadata in.
+        bot (Optional[discord.Client]): The bot instance.
+        translations (dict): A dictionary of translations.
+        processes (int): How many worker processes to render with. Defaults to 2.
+        context (Optional[ExportContext]): The export the messages belong to. When
+            omitted, a context is created for this call and closed at the end.
+        previous_message (Optional[discord.Message]): The last message of the earlier
+            transcript the messages are appended to. Defaults to None.
+        chunk_size (int): How many messages each worker renders at a time. Defaults
+            to ``CHUNK_SIZE``.
+
+    Yields:
+        str: The HTML of each chunk of messages, followed by the closing tag of the
+            last group.
+    """
+    owns_context = context is None
+    if context is None:
+        context = ExportContext()
+    pool = None
+    in_flight: deque[asyncio.Future] = deque()
+
+    try:
+        messages = list(messages)
+        if messages and previous_message is None:
+            messages[0] = await thread_starter(messages[0], guild)
+        message_dict = {message.id: message for message in messages}
+        await context.references.resolve(_missing_references(messages, message_dict))
+
+        fetched = [
+            target
+            for message in messages
+            if message.reference and message.reference.message_id not in message_dict
+            for target in [
+                context.references.peek(message.channel, message.reference.message_id)
+            ]
+            if target is not None
+        ]
+
+        members = _member_index(context, guild)
+        user_ids = collect_user_ids([*messages, *fetched])
+        await members.resolve(user_ids)
+        resolved = {user_id: members.peek(user_id) for user_id in user_ids}
+        users = {}
+        for message in [*messages, *fetched]:
+            for user_id in _mentioned_ids(message):
+                member = guild.get_member(user_id) or members.peek(user_id)
+                if member is not None:
+                    resolved[user_id] = member
+                elif bot is not None and user_id not in users:
+                    user = bot.get_user(user_id)
+                    if user is not None:
+                        users[user_id] = UserSnapshot.of(user)
+
+        loop = asyncio.get_running_loop()
+        if messages:
+            pool = ProcessPoolExecutor(
+                max(processes, 1),
+                mp_context=multiprocessing.get_context(START_METHOD),
+                initializer=_init_worker,
+                initargs=(
+                    GuildSnapshot.of(guild, resolved),
+                    ClientSnapshot(users),
+                    (
+                        pytz_timezone,
+                        military_time,
+                        translations,
+                        context.records is not None,
+                    ),
+                ),
+            )
+
+        referenced_ids = {
+            message.reference.message_id
+            for message in messages
+            if message.reference and message.reference.message_id
+        }
+        snapshots: dict[int, MessageSnapshot] = {}
+        previous = None
+        if previous_message is not None:
+            previous = ExportState([])
+            previous.record_message(previous_message)
+        menu_div_id = 0
+
+        for start in range(0, len(messages), chunk_size):
+            chunk = messages[start : start + chunk_size]
+            chunk_snapshots = await asyncio.gather(
+                *(_snapshot_message(message, attachment_handler) for message in chunk)
+            )
+            chunk_ids = {message.id for message in chunk}
+
+            references = {}
+            for message in chunk:
+                reference = message.reference
+                target_id = reference.message_id if reference else None
+                if not target_id or target_id in chunk_ids or target_id in references:
+                    continue
+                if target_id in snapshots:
+                    references[target_id] = (snapshots[target_id], True)
+                elif target_id in message_dict:
+                    references[target_id] = (
+                        MessageSnapshot.of(message_dict[target_id]),
+                        True,
+                    )
+                else:
+                    target = context.references.peek(message.channel, target_id)
+                    if target is not None:
+                        references[target_id] = (MessageSnapshot.of(target), False)
+
+            job = RenderJob(
+                chunk_snapshots, previous, list(references.values()), menu_div_id
+            )
+            in_flight.append(loop.run_in_executor(pool, _render_job, job))
+
+            for snapshot in chunk_snapshots:
+                menu_div_id += _menu_count(snapshot)
+                if snapshot.id in referenced_ids:
+                    snapshots[snapshot.id] = snapshot
+            previous = ExportState([])
+            previous.record_message(chunk_snapshots[-1])
+
+            while len(in_flight) > max(processes, 1):
+                yield await _merge(await in_flight.popleft(), meta_data, context)
+
+        while in_flight:
+            yield await _merge(await in_flight.popleft(), meta_data, context)
+    finally:
+        for future in in_flight:
+            future.cancel()
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+        if owns_context:
+            await context.close()
+
+    yield "</div>"
+
+
+async def _merge(
+    result: tuple[str, dict, str], meta_data: dict, context: ExportContext
+) -> str:
+    """Adds the metadata of a rendered chunk to the transcript's metadata.
+
+    The records of the chunk, when the export writes them, are written here, so
+    they stay in transcript order.
+    """
+    html, chunk_meta_data, records = result
+    if records and context.records is not None:
+        await context.records.write_lines(records, records.count("\n"))
+    for user_id, data in chunk_meta_data.items():
+        if user_id in meta_data:
+            meta_data[user_id][4] += data[4]
+        else:
+            meta_data[user_id] = data
+    return html
@@ -0,0 +1,304 @@
+import asyncio
+import bisect
+import os
+from typing import TYPE_CHECKING, Optional
+
+from DiscordTranscript.construct.attachment_handler import AttachmentHandler
+from DiscordTranscript.construct.message import reply_target
+from DiscordTranscript.construct.transcript import TranscriptDAO
+from DiscordTranscript.ext.cache_backend import CacheBackend, DictCache
+from DiscordTranscript.ext.context import ExportContext
+from DiscordTranscript.ext.references import ReferenceIndex
+from DiscordTranscript.i18n import TRANSLATIONS
+
+if TYPE_CHECKING:
+    import discord as discord_typings
+
+EVENTS = (
+    "on_message",
+    "on_message_edit",
+    "on_message_delete",
+    "on_reaction_add",
+    "on_reaction_remove",
+    "on_reaction_clear",
+)
+
+
+class TranscriptRecorder:
+    """Records a channel into a transcript file from gateway events.
+
+    New messages are rendered as they arrive and appended to the file at
+    ``output_path``, which always holds a complete transcript. Edits, deletions
+    and reaction changes to messages already in the file mark it stale; the next
+    `flush` then renders it again from the recorded messages, reusing the bodies
+    of the unchanged ones from ``fragment_cache``. The channel history is never
+    fetched.
+
+    A recorder started on a transcript it can resume appends to it. The messages
+    written before the restart are not held again, so from then on changes to
+    written messages are recorded in ``messages`` but no longer render the file
+    again. Messages older than the restart are not added, and a message that
+    arrives after newer ones were written is appended at the end.
+
+    Attributes:
+        channel (discord.TextChannel): The channel being recorded.
+        output_path (str): The transcript file.
+        state_path (str): The file the state of the transcript is kept in.
+        messages (dict): The recorded messages, keyed by ID, oldest first.
+        stale (bool): Whether a message already in the file has changed.
+    """
+
+    def __init__(
+        self,
+        channel: "discord_typings.TextChannel",
+        output_path: str | os.PathLike,
+        tz_info="UTC",
+        bot: Optional["discord_typings.Client"] = None,
+        military_time: bool = True,
+        fancy_times: bool = True,
+        attachment_handler: AttachmentHandler | None = None,
+        language: str = "en",
+        concurrency: int = 1,
+        cache_backend: CacheBackend | None = None,
+        fragment_cache: CacheBackend | None = None,
+        state_path: str | os.PathLike | None = None,
+    ):
+        """Initializes the TranscriptRecorder.
+
+        Args:
+            channel (discord.TextChannel): The channel to record.
+            output_path (str | os.PathLike): The file to write the transcript to.
+            tz_info (str): The timezone to use for timestamps. Defaults to "UTC".
+            bot (Optional[discord.Client]): The bot instance. Defaults to None.
+            military_time (bool): Whether to use military time. Defaults to True.
+            fancy_times (bool): Whether to use fancy times. Defaults to True.
+            attachment_handler (Optional[AttachmentHandler]): The attachment handler to
+                use. Defaults to None.
+            language (str): The language to use for the transcript. Defaults to "en".
+            concurrency (int): How many messages to render at once. Defaults to 1.
+            cache_backend (Optional[CacheBackend]): A cache for member and sticker
+                lookups. Defaults to a cache private to the recorder.
+            fragment_cache (Optional[CacheBackend]): A cache for the rendered message
+                bodies. Defaults to a cache private to the recorder.
+            state_path (Optional[str | os.PathLike]): The file to keep the state of the
+                transcript in. Defaults to ``output_path`` with ``.state.json`` appended.
+        """
+        self.channel = channel
+        self.output_path = os.fspath(output_path)
+        self.state_path = (
+            os.fspath(state_path)
+            if state_path is not None
+            else f"{self.output_path}.state.json"
+        )
+        self.tz_info = tz_info
+        self.bot = bot
+        self.military_time = military_time
+        self.fancy_times = fancy_times
+        self.attachment_handler = attachment_handler
+        self.language = language
+        self.concurrency = concurrency
+        self.cache_backend = cache_backend if cache_backend is not None else DictCache()
+        self.fragment_cache = (
+            fragment_cache if fragment_cache is not None else DictCache()
+        )
+        self.messages: dict[int, discord_typings.Message] = {}
+        self._pending: list[int] = []
+        self._changes = 0
+        self._lock = asyncio.Lock()
+
+        state = self._transcript().resume_state()
+        self.stale = state is None
+        self._last_written = state.last_message_id if state is not None else None
+        self._resumed_from = self._last_written
+
+    def attach(self, bot):
+        """Registers the recorder's event listeners on a bot.
+
+        Args:
+            bot (discord.ext.commands.Bot): A bot supporting ``add_listener``.
+        """
+        for event in EVENTS:
+            bot.add_listener(getattr(self, event), event)
+
+    def detach(self, bot):
+        """Removes the listeners registered by `attach`.
+
+        Args:
+            bot (discord.ext.commands.Bot): The bot.
+        """
+        for event in EVENTS:
+            bot.remove_listener(getattr(self, event), event)
+
+    def _records(self, message: "discord_typings.Message") -> bool:
+        return getattr(message.channel, "id", None) == self.channel.id
+
+    def _written(self, message_id: int) -> bool:
+        return self._last_written is not None and message_id <= self._last_written
+
+    def _mark_stale(self):
+        # After a restart, rendering the file again would drop the messages
+        # written before it.
+        if self._resumed_from is None:
+            self.stale = True
+            self._changes += 1
+
+    def _changed(self, message: "discord_typings.Message"):
+        if message.id not in self.messages:
+            return
+        self.messages[message.id] = message
+        if self._written(message.id):
+            self._mark_stale()
+
+    async def on_message(self, message: "discord_typings.Message"):
+        """Records and renders a new message.
+
+        Args:
+            message (discord.Message): The message.
+        """
+        if (
+            not self._records(message)
+            or message.id in self.messages
+            or (self._resumed_from is not None and message.id <= self._resumed_from)
+        ):
+            return
+        self.messages[message.id] = message
+        if self._written(message.id) or (
+            self._pending and message.id < self._pending[-1]
+        ):
+            self.messages = dict(sorted(self.messages.items()))
+            self._mark_stale()
+        if not self.stale:
+            bisect.insort(self._pending, message.id)
+        await self.flush()
+
+    async def on_message_edit(
+        self, before: "discord_typings.Message", after: "discord_typings.Message"
+    ):
+        """Records an edit.
+
+        Args:
+            before (discord.Message): The message before the edit.
+            after (discord.Message): The message after the edit.
+        """
+        if self._records(after):
+            self._changed(after)
+
+    async def on_message_delete(self, message: "discord_typings.Message"):
+        """Removes a deleted message.
+
+        Args:
+            message (discord.Message): The message.
+        """
+        if not self._records(message) or message.id not in self.messages:
+            return
+        del self.messages[message.id]
+        if message.id in self._pending:
+            self._pending.remove(message.id)
+        else:
+            self._mark_stale()
+
+    async def on_reaction_add(self, reaction: "discord_typings.Reaction", user):
+        """Records a new reaction.
+
+        Args:
+            reaction (discord.Reaction): The reaction.
+            user (discord.User): The user who reacted.
+        """
+        if self._records(reaction.message):
+            self._changed(reaction.message)
+
+    async def on_reaction_remove(self, reaction: "discord_typings.Reaction", user):
+        """Records a removed reaction.
+
+        Args:
+            reaction (discord.Reaction): The reaction.
+            user (discord.User): The user whose reaction was removed.
+        """
+        if self._records(reaction.message):
+            self._changed(reaction.message)
+
+    async def on_reaction_clear(self, message: "discord_typings.Message", reactions):
+        """Records that every reaction was removed from a message.
+
+        Args:
+            message (discord.Message): The message.
+            reactions (List[discord.Reaction]): The removed reactions.
+        """
+        if self._records(message):
+            self._changed(message)
+
+    async def flush(self):
+        """Writes the recorded messages that are not in the file yet.
+
+        If a message already in the file has changed since, the transcript is
+        rendered again instead. Nothing is marked as written unless the file was
+        written.
+        """
+        async with self._lock:
+            pending = list(self._pending)
+            changes = self._changes
+            transcript = self._transcript()
+            if not self.stale and transcript.resume_state() is not None:
+                messages = [self.messages[message_id] for message_id in pending]
+            else:
+                messages = list(self.messages.values())
+
+            transcript.messages = messages
+            await transcript.build_transcript()
+
+            self._pending = [i for i in self._pending if i not in pending]
+            if self._changes == changes:
+                self.stale = False
+            if messages:
+                self._last_written = messages[-1].id
+
+            # Replies appended later show these messages as they were rendered.
+            references = ReferenceIndex(self.cache_backend)
+            async with ExportContext(
+                cache=self.cache_backend, fragments=self.fragment_cache
+            ) as context:
+                for message in messages:
+                    references.remember(
+                        self.channel,
+                        await reply_target(
+                            message,
+                            self.channel.guild,
+                            self.tz_info,
+                            self.military_time,
+                            self.attachment_handler,
+                            bot=self.bot,
+                            translations=TRANSLATIONS.get(
+                                self.language, TRANSLATIONS["en"]
+                            ),
+                            context=context,
+                        ),
+                    )
+
+    async def finalize(self) -> str:
+        """Brings the transcript file up to date, ready to be sent.
+
+        Returns:
+            str: The path of the transcript.
+        """
+        await self.flush()
+        return self.output_path
+
+    def _transcript(self) -> TranscriptDAO:
+        return TranscriptDAO(
+            channel=self.channel,
+            limit=None,
+            messages=None,
+            pytz_timezone=self.tz_info,
+            military_time=self.military_time,
+            fancy_times=self.fancy_times,
+            before=None,
+            after=None,
+            bot=self.bot,
+            attachment_handler=self.attachment_handler,
+            language=self.language,
+            output_path=self.output_path,
+            concurrency=self.concurrency,
+            cache_backend=self.cache_backend,
+            fragment_cache=self.fragment_cache,
+            state_path=self.state_path,
+        )
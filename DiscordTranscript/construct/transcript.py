@@ -1,16 +1,25 @@
 import datetime
 import html
+import os
 import re
+import shutil
+import tempfile
+import time
 import traceback
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Optional
 
 import pytz
 
-from DiscordTranscript.construct.assets.component import Component
 from DiscordTranscript.construct.attachment_handler import AttachmentHandler
-from DiscordTranscript.construct.message import gather_messages
-from DiscordTranscript.ext.cache import clear_cache
+from DiscordTranscript.construct.message import stream_messages
+from DiscordTranscript.construct.process_pool import stream_messages_in_processes
+from DiscordTranscript.ext.cache_backend import CacheBackend
+from DiscordTranscript.ext.context import ExportContext
+from DiscordTranscript.ext.discord_import import discord
 from DiscordTranscript.ext.discord_utils import DiscordUtils
+from DiscordTranscript.ext.downloader import DownloadScheduler
+from DiscordTranscript.ext.export_state import ExportState
+from DiscordTranscript.ext.history import fetch_history_sharded, stream_history
 from DiscordTranscript.ext.html_generator import (
     PARSE_MODE_HTML_SAFE,
     PARSE_MODE_NONE,
@@ -18,9 +27,13 @@ from DiscordTranscript.ext.html_generator import (
     channel_topic,
     fancy_time,
     fill_out,
+    fill_values,
     meta_data_temp,
     total,
 )
+from DiscordTranscript.ext.stats import ExportStats
+from DiscordTranscript.ext.template import get_template
+from DiscordTranscript.ext.writer import RecordWriter, TranscriptWriter
 
 try:
     from importlib.metadata import version
@@ -31,8 +44,12 @@ except Exception:
 from DiscordTranscript.i18n import TRANSLATIONS
 
 if TYPE_CHECKING:
+    from collections.abc import AsyncIterable, AsyncIterator
+
     import discord as discord_typings
 
+SPOOL_SIZE = 8 * 1024**2
+
 
 class TranscriptDAO:
     """A class to create a transcript of a Discord channel.
@@ -49,9 +66,40 @@ class TranscriptDAO:
         after (Optional[datetime.datetime]): The date to fetch messages after.
         attachment_handler (Optional[AttachmentHandler]): The attachment handler to use.
         bot (Optional[discord.Client]): The bot to use for fetching members.
+        fp (Optional[Any]): A file-like object or async writer to stream the transcript to.
+        output_path (Optional[str | os.PathLike]): A file path to stream the transcript to.
+        concurrency (int): How many messages to render at once.
+        cache_backend (Optional[CacheBackend]): A cache shared with other exports.
+        max_downloads (int): How many attachment downloads may run at once.
+        max_downloads_per_host (int): How many attachment downloads may run at once per host.
+        stats (Optional[ExportStats]): The per-stage timings of the export, when it is profiled.
+        history_shards (int): How many time windows of the channel history to fetch at once.
+        pipeline (bool): Whether messages are rendered while the history is still being fetched.
+        fragment_cache (Optional[CacheBackend]): The rendered message bodies shared with other
+            exports.
+        state_path (Optional[str | os.PathLike]): The file the incremental export state is
+            kept in.
+        processes (int): How many worker processes render the messages.
+        ndjson_fp (Optional[Any]): A file-like object or async writer to write the
+            structured record of each message to, as NDJSON.
+        ndjson_path (Optional[str | os.PathLike]): A file path to write the structured
+            records to.
+        state (Optional[ExportState]): The state of the transcript being appended to.
+        message_stream (Optional[AsyncIterable[discord.Message]]): The messages to render as
+            they arrive, oldest first, used instead of ``messages`` when set.
+        message_count (int): The number of messages rendered from ``message_stream``.
+        bytes_written (int): The number of bytes streamed to ``fp`` or ``output_path``.
+        context (Optional[ExportContext]): The state of the export in progress.
     """
 
-    html: str
+    html: str | None
+    bytes_written: int = 0
+    message_count: int = 0
+    message_stream: Optional["AsyncIterable[discord_typings.Message]"] = None
+    context: ExportContext | None = None
+    state: ExportState | None = None
+    _last_message: Optional["discord_typings.Message"] = None
+    _group_end: int = 0
 
     def __init__(
         self,
@@ -66,6 +114,21 @@ class TranscriptDAO:
         bot: Optional["discord_typings.Client"],
         attachment_handler: AttachmentHandler | None,
         language: str = "en",
+        fp: Any | None = None,
+        output_path: str | os.PathLike | None = None,
+        concurrency: int = 1,
+        cache_backend: CacheBackend | None = None,
+        max_downloads: int = 8,
+        max_downloads_per_host: int = 4,
+        profile: bool = False,
+        stats: ExportStats | None = None,
+        history_shards: int = 1,
+        pipeline: bool = False,
+        fragment_cache: CacheBackend | None = None,
+        state_path: str | os.PathLike | None = None,
+        processes: int = 1,
+        ndjson_fp: Any | None = None,
+        ndjson_path: str | os.PathLike | None = None,
     ):
         """Initializes the TranscriptDAO.
 
@@ -81,7 +144,50 @@ class TranscriptDAO:
             bot (Optional['discord.Client']): The bot to use for fetching members.
             attachment_handler (Optional[AttachmentHandler]): The attachment handler to use.
             language (str): The language to use for the transcript. Defaults to "en".
+            fp (Optional[Any]): A file-like object or async writer to stream the transcript to.
+                When set, the HTML is written as it is rendered and ``html`` is left as None.
+            output_path (Optional[str | os.PathLike]): A file path to stream the transcript to.
+                Takes precedence over ``fp``.
+            concurrency (int): How many messages to render at once. Defaults to 1.
+            cache_backend (Optional[CacheBackend]): A cache to keep member, sticker
+                and replied-to message lookups in across exports. Defaults to None (a cache
+                private to the export).
+            max_downloads (int): How many attachment downloads may run at once. Defaults to 8.
+            max_downloads_per_host (int): How many attachment downloads may run at once per
+                host. Defaults to 4.
+            profile (bool): Whether to collect per-stage timings into ``stats``.
+                Defaults to False.
+            stats (Optional[ExportStats]): Where to collect per-stage timings. Implies
+                ``profile``. Defaults to None.
+            history_shards (int): How many time windows of the channel history to fetch
+                at once when no ``limit`` is set. Defaults to 1 (a single iterator).
+            pipeline (bool): Whether to render messages while the history is still being
+                fetched, instead of fetching it all first. Only recent messages are kept
+                in memory. Defaults to False.
+            fragment_cache (Optional[CacheBackend]): A cache to keep the rendered body of
+                each message in, keyed by its ID, edit time and render options, so later
+                exports only render new or changed messages. Defaults to None.
+            state_path (Optional[str | os.PathLike]): A file to keep the export state in,
+                so that a later export of the channel appends the new messages to the
+                file at ``output_path`` instead of rendering it again. Defaults to None.
+            processes (int): How many worker processes to render the messages in, so
+                rendering does not hold up the event loop. Messages rendered as they
+                are fetched (``pipeline``) are always rendered in this process.
+                Defaults to 1 (rendered in this process, on the event loop).
+            ndjson_fp (Optional[Any]): A file-like object or async writer to write a
+                structured record of each message to, one JSON object per line, as the
+                message is rendered. Defaults to None.
+            ndjson_path (Optional[str | os.PathLike]): A file path to write the records
+                to. Takes precedence over ``ndjson_fp``. When the transcript is appended
+                to (``state_path``), the records of the new messages are appended too.
+                Defaults to None.
+
+        Raises:
+            ValueError: If ``state_path`` is set without ``output_path``.
         """
+        if state_path is not None and output_path is None:
+            raise ValueError("state_path requires output_path")
+
         self.channel = channel
         self.messages = messages
         self.limit = int(limit) if limit else None
@@ -93,28 +199,110 @@ class TranscriptDAO:
         self.attachment_handler = attachment_handler
         self.bot = bot
         self.language = language
+        self.fp = fp
+        self.output_path = output_path
+        self.concurrency = concurrency
+        self.cache_backend = cache_backend
+        self.max_downloads = max_downloads
+        self.max_downloads_per_host = max_downloads_per_host
+        if stats is None and profile:
+            stats = ExportStats()
+        self.stats = stats
+        self.history_shards = history_shards
+        self.pipeline = pipeline
+        self.fragment_cache = fragment_cache
+        self.state_path = state_path
+        self.processes = processes
+        self.ndjson_fp = ndjson_fp
+        self.ndjson_path = ndjson_path
 
     async def build_transcript(self) -> "TranscriptDAO":
         """Builds the transcript.
 
+        Caches, dropdown IDs and the HTTP session live in an `ExportContext` that
+        is private to this call, so several exports can run at the same time. Only
+        ``cache_backend`` and ``fragment_cache``, when given, are shared.
+
+        The structured records, when ``ndjson_fp`` or ``ndjson_path`` is set, are
+        written in the same pass as the HTML, from the same resolved members and
+        processed attachments.
+
         Returns:
             TranscriptDAO: The TranscriptDAO object.
         """
-        translations = TRANSLATIONS.get(self.language, TRANSLATIONS["en"])
-        message_html, meta_data = await gather_messages(
-            self.messages or [],
-            self.channel.guild,
-            self.pytz_timezone,
-            self.military_time,
-            self.attachment_handler,
-            bot=self.bot,
-            translations=translations,
-        )
-        await self.export_transcript(message_html, meta_data)
-        clear_cache()
-        Component.menu_div_id = 0
+        downloads = DownloadScheduler(self.max_downloads, self.max_downloads_per_host)
+        async with ExportContext(
+            cache=self.cache_backend,
+            downloads=downloads,
+            stats=self.stats,
+            fragments=self.fragment_cache,
+        ) as context:
+            self.context = context
+            start = time.perf_counter()
+            if self.ndjson_path is not None:
+                mode = "a" if self.state is not None else "w"
+                with open(self.ndjson_path, mode, encoding="utf-8", newline="") as fp:
+                    context.records = RecordWriter(fp)
+                    await self._build_transcript()
+            else:
+                if self.ndjson_fp is not None:
+                    context.records = RecordWriter(self.ndjson_fp)
+                await self._build_transcript()
+            if self.stats is not None:
+                self.stats.record(
+                    "transcript",
+                    time.perf_counter() - start,
+                    len(self.html) if self.html else self.bytes_written,
+                )
         return self
 
+    async def _build_transcript(self):
+        if self.state is not None:
+            await self.append_transcript()
+        elif self.output_path is not None:
+            with open(self.output_path, "w", encoding="utf-8", newline="") as fp:
+                await self.stream_transcript(fp)
+        elif self.fp is not None:
+            await self.stream_transcript(self.fp)
+        else:
+            meta_data: dict = {}
+            message_html = "".join(
+                [
+                    chunk
+                    async for chunk in self._render_messages(
+                        self._message_source(), meta_data
+                    )
+                ]
+            )
+            await self.export_transcript(message_html, meta_data)
+
+    def _message_source(
+        self,
+    ) -> "list[discord_typings.Message] | AsyncIterator[discord_typings.Message]":
+        if self.message_stream is None:
+            self._last_message = self.messages[-1] if self.messages else None
+            return self.messages or []
+        self.message_count = 0
+        return self._count_messages(self.message_stream)
+
+    def _total_messages(self) -> int:
+        earlier = self.state.message_count if self.state is not None else 0
+        if self.message_stream is None:
+            return earlier + len(self.messages or [])
+        return earlier + self.message_count
+
+    async def _count_messages(
+        self, messages: "AsyncIterable[discord_typings.Message]"
+    ) -> "AsyncIterator[discord_typings.Message]":
+        try:
+            async for message in messages:
+                self.message_count += 1
+                self._last_message = message
+                yield message
+        finally:
+            if hasattr(messages, "aclose"):
+                await messages.aclose()
+
     async def export_transcript(self, message_html: str, meta_data: dict):
         """Exports the transcript to HTML.
 
@@ -122,25 +310,241 @@ class TranscriptDAO:
             message_html (str): The HTML of the messages.
             meta_data (str): The metadata of the transcript.
         """
+        values = await self.build_transcript_values()
+        values.update(await self.build_participant_values(meta_data))
+        values["MESSAGES"] = message_html.strip()
+        self.html = get_template(total).render(values)
+
+    async def stream_transcript(self, fp):
+        """Renders the transcript straight into a file-like object or async writer.
+
+        The head of the base template is written first, then each message as it
+        is rendered, then the tail once the participants are known. Only one
+        message's HTML is held in memory at a time.
+
+        With a ``message_stream``, the message count in the head is only known once
+        the stream is exhausted, so the messages are first rendered into a
+        temporary file, which stays in memory up to ``SPOOL_SIZE`` characters.
+
+        Args:
+            fp: A writable text or binary stream, or an async writer.
+        """
+        writer = TranscriptWriter(fp)
+        head, tail = get_template(total).partition("MESSAGES")
+        messages = self._message_source()
+
+        if self.message_stream is None:
+            values = await self.build_transcript_values()
+            await writer.write(head.render(values))
+            messages_start = writer.bytes_written
+            meta_data = await self._stream_messages(messages, writer)
+            messages_end = self._group_end
+        else:
+            with tempfile.SpooledTemporaryFile(
+                SPOOL_SIZE, mode="w+", encoding="utf-8", newline=""
+            ) as spool:
+                meta_data = await self._stream_messages(
+                    messages, TranscriptWriter(spool)
+                )
+                values = await self.build_transcript_values()
+                await writer.write(head.render(values))
+                messages_start = writer.bytes_written
+                messages_end = messages_start + self._group_end
+                spool.seek(0)
+                while chunk := spool.read(SPOOL_SIZE):
+                    await writer.write(chunk)
+
+        values.update(await self.build_participant_values(meta_data))
+        await writer.write(tail.render(values))
+        self.bytes_written = writer.bytes_written
+        self.html = None
+
+        if self.state_path is not None:
+            state = ExportState(self._state_options(), channel_id=self.channel.id)
+            self._save_state(state, meta_data, messages_start, messages_end)
+
+    async def append_transcript(self):
+        """Appends the new messages to the transcript described by ``state``.
+
+        The new messages and the tail are first rendered into a temporary file,
+        which stays in memory up to ``SPOOL_SIZE`` bytes, so the transcript is left
+        untouched when rendering fails. The file at ``output_path`` is then
+        truncated where its messages end, before the closing tag of the last
+        message group, and the rendered part is copied there. The head, which
+        holds the message count, is then rewritten: in place when its length is
+        unchanged, otherwise by copying the file once behind the new head.
+        """
+        state = self.state
+        head, tail = get_template(total).partition("MESSAGES")
+        messages = self._message_source()
+
+        with tempfile.SpooledTemporaryFile(SPOOL_SIZE) as spool:
+            writer = TranscriptWriter(spool)
+            meta_data = await self._stream_messages(
+                messages,
+                writer,
+                meta_data=state.meta_data,
+                previous_message=state.previous_message(),
+                leading=state.messages_end == state.messages_start,
+            )
+            messages_end = state.messages_end + self._group_end
+
+            values = await self.build_transcript_values()
+            values.update(await self.build_participant_values(meta_data))
+            await writer.write(tail.render(values))
+            head_html = head.render(values).encode("utf-8")
+
+            spool.seek(0)
+            with open(self.output_path, "r+b") as fp:
+                fp.seek(state.messages_end)
+                fp.truncate()
+                shutil.copyfileobj(spool, fp, SPOOL_SIZE)
+                if len(head_html) == state.messages_start:
+                    fp.seek(0)
+                    fp.write(head_html)
+        if len(head_html) != state.messages_start:
+            self._replace_head(head_html, state.messages_start)
+
+        shift = len(head_html) - state.messages_start
+        self.bytes_written = os.path.getsize(self.output_path)
+        self.html = None
+        self._save_state(
+            state, meta_data, state.messages_start + shift, messages_end + shift
+        )
+
+    def _replace_head(self, head: bytes, old_size: int):
+        path = os.fspath(self.output_path)
+        temporary = f"{path}.tmp"
+        with open(path, "rb") as source, open(temporary, "wb") as target:
+            target.write(head)
+            source.seek(old_size)
+            shutil.copyfileobj(source, target, SPOOL_SIZE)
+        os.replace(temporary, path)
+
+    def _state_options(self) -> list:
+        return [
+            str(self.pytz_timezone),
+            bool(self.military_time),
+            bool(self.fancy_times),
+            self.language,
+            type(self.attachment_handler).__qualname__
+            if self.attachment_handler
+            else None,
+        ]
+
+    def resume_state(self) -> ExportState | None:
+        """Loads the state of the transcript to append to, if it can be resumed.
+
+        The state is ignored, and the transcript rendered again, when it was
+        written for another channel or with other options, or when the file at
+        ``output_path`` is shorter than the state expects.
+
+        Returns:
+            Optional[ExportState]: The state, also stored in ``state``.
+        """
+        self.state = None
+        if self.state_path is None:
+            return None
+
+        state = ExportState.load(self.state_path)
+        if (
+            state is None
+            or state.options != self._state_options()
+            or state.channel_id != self.channel.id
+            or not os.path.isfile(self.output_path)
+            or os.path.getsize(self.output_path) < state.messages_end
+        ):
+            return None
+        self.state = state
+        return state
+
+    def _save_state(
+        self,
+        state: ExportState,
+        meta_data: dict,
+        messages_start: int,
+        messages_end: int,
+    ):
+        state.message_count = self._total_messages()
+        state.meta_data = meta_data
+        state.messages_start = messages_start
+        state.messages_end = messages_end
+        if self._last_message is not None:
+            state.record_message(self._last_message)
+        state.save(self.state_path)
+
+    async def _stream_messages(
+        self,
+        messages,
+        writer: TranscriptWriter,
+        meta_data: dict | None = None,
+        previous_message: Optional["discord_typings.Message"] = None,
+        leading: bool = True,
+    ) -> dict:
+        meta_data = meta_data if meta_data is not None else {}
+        self._group_end = writer.bytes_written
+        async for chunk in self._render_messages(messages, meta_data, previous_message):
+            if leading:
+                chunk = chunk.lstrip()
+                leading = not chunk
+            self._group_end = writer.bytes_written
+            await writer.write(chunk)
+        return meta_data
+
+    def _render_messages(
+        self,
+        messages,
+        meta_data: dict,
+        previous_message: Optional["discord_typings.Message"] = None,
+    ) -> "AsyncIterator[str]":
         translations = TRANSLATIONS.get(self.language, TRANSLATIONS["en"])
+        if self.processes > 1 and self.message_stream is None:
+            return stream_messages_in_processes(
+                messages,
+                self.channel.guild,
+                self.pytz_timezone,
+                self.military_time,
+                self.attachment_handler,
+                meta_data,
+                bot=self.bot,
+                translations=translations,
+                processes=self.processes,
+                context=self.context,
+                previous_message=previous_message,
+            )
+        return stream_messages(
+            messages,
+            self.channel.guild,
+            self.pytz_timezone,
+            self.military_time,
+            self.attachment_handler,
+            meta_data,
+            bot=self.bot,
+            translations=translations,
+            concurrency=self.concurrency,
+            context=self.context,
+            previous_message=previous_message,
+        )
 
-        guild_icon = (
+    def _guild_icon(self):
+        return (
             self.channel.guild.icon
             if (self.channel.guild.icon and len(self.channel.guild.icon) > 2)
             else DiscordUtils.default_avatar
         )
 
-        guild_name = html.escape(self.channel.guild.name)
+    async def build_participant_values(self, meta_data: dict) -> dict[str, str]:
+        """Builds the template values that depend on the message participants.
 
+        Args:
+            meta_data (dict): The metadata of the transcript.
+
+        Returns:
+            dict: The ``META_DATA`` and ``MESSAGE_PARTICIPANTS`` values.
+        """
+        translations = TRANSLATIONS.get(self.language, TRANSLATIONS["en"])
+        guild_icon = self._guild_icon()
         timezone = pytz.timezone(self.pytz_timezone)
-        if self.military_time:
-            time_now = datetime.datetime.now(timezone).strftime(
-                "%e %B %Y at %H:%M:%S (%Z)"
-            )
-        else:
-            time_now = datetime.datetime.now(timezone).strftime(
-                "%e %B %Y at %I:%M:%S %p (%Z)"
-            )
 
         meta_data_html: str = ""
         for data in meta_data:
@@ -199,6 +603,38 @@ class TranscriptDAO:
                 timezone=self.pytz_timezone,
             )
 
+        return await fill_values(
+            self.channel.guild,
+            [
+                ("META_DATA", meta_data_html, PARSE_MODE_NONE),
+                ("MESSAGE_PARTICIPANTS", str(len(meta_data)), PARSE_MODE_NONE),
+            ],
+            bot=self.bot,
+            timezone=self.pytz_timezone,
+        )
+
+    async def build_transcript_values(self) -> dict[str, str]:
+        """Builds the base template values that do not depend on the messages' HTML.
+
+        Returns:
+            dict: The parsed values, keyed by placeholder name.
+        """
+        translations = TRANSLATIONS.get(self.language, TRANSLATIONS["en"])
+
+        guild_icon = self._guild_icon()
+
+        guild_name = html.escape(self.channel.guild.name)
+
+        timezone = pytz.timezone(self.pytz_timezone)
+        if self.military_time:
+            time_now = datetime.datetime.now(timezone).strftime(
+                "%e %B %Y at %H:%M:%S (%Z)"
+            )
+        else:
+            time_now = datetime.datetime.now(timezone).strftime(
+                "%e %B %Y at %I:%M:%S %p (%Z)"
+            )
+
         if self.military_time:
             channel_creation_time = self.channel.created_at.astimezone(
                 timezone
@@ -263,23 +699,19 @@ class TranscriptDAO:
                 timezone=self.pytz_timezone,
             )
 
-        self.html = await fill_out(
+        return await fill_values(
             self.channel.guild,
-            total,
             [
                 ("SERVER_NAME", f"{guild_name}"),
                 ("GUILD_ID", str(self.channel.guild.id), PARSE_MODE_NONE),
                 ("SERVER_AVATAR_URL", str(guild_icon), PARSE_MODE_NONE),
                 ("CHANNEL_NAME", f"{self.channel.name}"),
-                ("MESSAGE_COUNT", str(len(self.messages or []))),
-                ("MESSAGES", message_html, PARSE_MODE_NONE),
-                ("META_DATA", meta_data_html, PARSE_MODE_NONE),
+                ("MESSAGE_COUNT", str(self._total_messages())),
                 ("DATE_TIME", str(time_now)),
                 ("SUBJECT", subject, PARSE_MODE_NONE),
                 ("CHANNEL_CREATED_AT", str(channel_creation_time), PARSE_MODE_NONE),
                 ("CHANNEL_TOPIC", str(channel_topic_html), PARSE_MODE_NONE),
                 ("CHANNEL_ID", str(self.channel.id), PARSE_MODE_NONE),
-                ("MESSAGE_PARTICIPANTS", str(len(meta_data)), PARSE_MODE_NONE),
                 ("FANCY_TIME", _fancy_time, PARSE_MODE_NONE),
                 ("SERVER_NAME_SAFE", f"{guild_name}", PARSE_MODE_HTML_SAFE),
                 (
@@ -333,18 +765,50 @@ class Transcript(TranscriptDAO):
         Returns:
             TranscriptDAO: The TranscriptDAO object.
         """
-        if not self.messages:
-            self.messages = [
-                message
-                async for message in self.channel.history(
-                    limit=self.limit,
-                    before=self.before,
-                    after=self.after,
+        state = self.resume_state()
+        if state is not None and state.last_message_id is not None:
+            if self.messages:
+                # Only the supplied messages newer than the transcript are appended.
+                self.messages = [
+                    message
+                    for message in self.messages
+                    if message.id > state.last_message_id
+                ]
+            else:
+                self.after = discord.Object(id=state.last_message_id)
+
+        if not self.messages and (
+            self.pipeline and (self.limit is None or self.after is not None)
+        ):
+            self.message_stream = stream_history(
+                self.channel,
+                self.limit,
+                self.before,
+                self.after,
+                self.history_shards,
+            )
+        elif not self.messages:
+            start = time.perf_counter()
+            if self.history_shards > 1 and self.limit is None:
+                self.messages = await fetch_history_sharded(
+                    self.channel, self.history_shards, self.before, self.after
                 )
-            ]
-
-        if self.after is None:
-            self.messages.reverse()
+                if self.after is None:
+                    self.messages.reverse()
+            else:
+                self.messages = [
+                    message
+                    async for message in self.channel.history(
+                        limit=self.limit,
+                        before=self.before,
+                        after=self.after,
+                    )
+                ]
+            if self.stats is not None:
+                self.stats.record("history", time.perf_counter() - start)
+
+        if self.after is None and self.message_stream is None:
+            self.messages = self.messages[::-1]
 
         try:
             return await super().build_transcript()
@@ -0,0 +1,200 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit
+
+DISCORD_CDN_HOSTS = ("cdn.discordapp.com", "media.discordapp.net")
+
+
+def normalize_url(url: str) -> str:
+    """Strips the parts of a URL that change between fetches of the same asset.
+
+    Discord CDN links carry signed ``ex``/``is``/``hm`` query parameters that are
+    renewed every time the message is fetched, while the path already identifies
+    the file.
+
+    Args:
+        url (str): The URL of the asset.
+
+    Returns:
+        str: The URL to key the asset by.
+    """
+    parts = urlsplit(url)
+    if parts.hostname in DISCORD_CDN_HOSTS:
+        return urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+    return url
+
+
+class AssetCache:
+    """A size-bounded cache of processed assets on disk.
+
+    Each asset is written to its own file, named after a hash of its URL and the
+    settings used to process it. A SQLite index next to the files records the
+    MIME type, size and last use of every asset; the least recently used assets
+    are deleted once the cache grows past ``max_size``.
+
+    Attributes:
+        directory (str): The directory holding the files and the index.
+        max_size (int): The largest total size of the cached files, in bytes.
+    """
+
+    def __init__(self, directory: str | os.PathLike, max_size: int = 512 * 1024**2):
+        """Initializes the AssetCache.
+
+        Args:
+            directory (str | os.PathLike): The directory to keep the cache in. It is
+                created if needed.
+            max_size (int): The largest total size of the cached files, in bytes.
+                Defaults to 512 MiB.
+
+        Raises:
+            ValueError: If ``max_size`` is not positive.
+        """
+        if max_size <= 0:
+            raise ValueError("max_size must be positive")
+
+        self.directory = os.fspath(directory)
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(
+            os.path.join(self.directory, "index.sqlite3"), check_same_thread=False
+        )
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS assets ("
+            "key TEXT PRIMARY KEY, content_type TEXT, "
+            "size INTEGER NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS assets_last_used ON assets (last_used)"
+        )
+        self._db.commit()
+
+    @staticmethod
+    def make_key(url: str, *settings) -> str:
+        """Builds the key of an asset.
+
+        Args:
+            url (str): The URL of the asset.
+            *settings: The settings the asset was processed with.
+
+        Returns:
+            str: The key of the asset.
+        """
+        parts = [normalize_url(url), *map(repr, settings)]
+        return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> tuple[bytes, str | None] | None:
+        """Reads an asset from the cache.
+
+        Args:
+            key (str): The key of the asset.
+
+        Returns:
+            Optional[Tuple[bytes, Optional[str]]]: The asset and its MIME type, or None
+                if it is not cached.
+        """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_type FROM assets WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            try:
+                with open(self._path(key), "rb") as f:
+                    data = f.read()
+            except OSError:
+                self._db.execute("DELETE FROM assets WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+
+            self._db.execute(
+                "UPDATE assets SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self._db.commit()
+            return data, row[0]
+
+    def set(self, key: str, data: bytes, content_type: str | None):
+        """Writes an asset to the cache, evicting old assets if needed.
+
+        Assets larger than ``max_size`` are not cached.
+
+        Args:
+            key (str): The key of the asset.
+            data (bytes): The processed asset.
+            content_type (Optional[str]): The MIME type of the asset.
+        """
+        if len(data) > self.max_size:
+            return
+
+        path = self._path(key)
+        with self._lock:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, path)
+
+            self._db.execute(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?)",
+                (key, content_type, len(data), time.time()),
+            )
+            self._evict()
+            self._db.commit()
+
+    def _evict(self):
+        (total,) = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM assets"
+        ).fetchone()
+        if total <= self.max_size:
+            return
+
+        rows = self._db.execute(
+            "SELECT key, size FROM assets ORDER BY last_used"
+        ).fetchall()
+        for key, size in rows:
+            if total <= self.max_size:
+                break
+            self._db.execute("DELETE FROM assets WHERE key = ?", (key,))
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+            total -= size
+
+    @property
+    def size(self) -> int:
+        """int: The total size of the cached files, in bytes."""
+        with self._lock:
+            (total,) = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM assets"
+            ).fetchone()
+        return total
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM assets").fetchone()
+        return count
+
+    def clear(self):
+        """Deletes every cached asset."""
+        with self._lock:
+            for (key,) in self._db.execute("SELECT key FROM assets").fetchall():
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._db.execute("DELETE FROM assets")
+            self._db.commit()
+
+    def close(self):
+        """Closes the index."""
+        with self._lock:
+            self._db.close()
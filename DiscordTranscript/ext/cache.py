@@ -1,14 +1,36 @@
 from functools import wraps
 from typing import Any
 
-_internal_cache: dict = {}
+from DiscordTranscript.ext.cache_backend import CacheBackend, DictCache
+from DiscordTranscript.ext.context import ExportContext
+
+_internal_cache = DictCache()
+
+
+def _get_cache(args: tuple[Any, ...]) -> CacheBackend:
+    """Returns the cache of the export a call belongs to.
+
+    The export is found through the ``context`` attribute of the first argument,
+    then the export running in the current task. Calls made outside an export
+    share the module-level cache.
+
+    Args:
+        args (tuple): The positional arguments of the call.
+
+    Returns:
+        CacheBackend: The cache to use.
+    """
+    context = getattr(args[0], "context", None) if args else None
+    if not isinstance(context, ExportContext):
+        context = ExportContext.current()
+    return _internal_cache if context is None else context.cache
 
 
 def _wrap_and_store_coroutine(cache, key, coro):
     """Wrap a coroutine and store its result in the cache.
 
     Args:
-        cache (dict): The cache to store the result in.
+        cache (CacheBackend): The cache to store the result in.
         key (str): The key to store the result under.
         coro (coroutine): The coroutine to wrap.
 
@@ -18,7 +40,7 @@ def _wrap_and_store_coroutine(cache, key, coro):
 
     async def func():
         value = await coro
-        cache[key] = value
+        cache.set(key, value)
         return value
 
     return func()
@@ -41,7 +63,7 @@ def _wrap_new_coroutine(value):
 
 
 def clear_cache():
-    """Clear the internal cache."""
+    """Clear the cache shared by calls made outside an export."""
     _internal_cache.clear()
 
 
@@ -69,11 +91,12 @@ def cache():
         def wrapper(*args, **kwargs):
             """The wrapper function for the decorator."""
             key = _make_key(args, kwargs)
+            store = _get_cache(args)
             try:
-                value = _internal_cache[key]
+                value = store.get(key)
             except KeyError:
                 value = func(*args, **kwargs)
-                return _wrap_and_store_coroutine(_internal_cache, key, value)
+                return _wrap_and_store_coroutine(store, key, value)
             else:
                 return _wrap_new_coroutine(value)
 
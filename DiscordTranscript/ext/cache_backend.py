@@ -0,0 +1,303 @@
+from collections import OrderedDict
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any
+
+
+class CacheStats:
+    """Counters describing how a cache backend has been used.
+
+    Attributes:
+        hits (int): The number of lookups that found a value.
+        misses (int): The number of lookups that found nothing.
+        evictions (int): The number of entries dropped for size or age.
+    """
+
+    __slots__ = ("evictions", "hits", "misses")
+
+    def __init__(self):
+        """Initializes the CacheStats."""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """float: The share of lookups that found a value, between 0 and 1."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def reset(self):
+        """Sets every counter back to zero."""
+        self.hits = self.misses = self.evictions = 0
+
+    def __repr__(self) -> str:
+        return f"<CacheStats hits={self.hits} misses={self.misses} evictions={self.evictions}>"
+
+
+class CacheBackend:
+    """The storage used by the ``cache()`` decorator.
+
+    Subclasses implement ``get``, ``set``, ``clear`` and ``__len__``, and
+    record hits, misses and evictions in ``stats``. They can also implement
+    ``__contains__`` to check for a key without counting a lookup.
+
+    Attributes:
+        stats (CacheStats): The hit, miss and eviction counters.
+    """
+
+    def __init__(self):
+        """Initializes the CacheBackend."""
+        self.stats = CacheStats()
+
+    def get(self, key: str) -> Any:
+        """Looks up a value.
+
+        Args:
+            key (str): The key to look up.
+
+        Returns:
+            Any: The stored value.
+
+        Raises:
+            KeyError: If no value is stored under ``key``.
+        """
+        raise NotImplementedError
+
+    def set(self, key: str, value: Any):
+        """Stores a value.
+
+        Args:
+            key (str): The key to store the value under.
+            value (Any): The value to store.
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        """Drops every stored value."""
+        raise NotImplementedError
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            self.get(key)
+        except KeyError:
+            return False
+        return True
+
+    def __getitem__(self, key: str) -> Any:
+        return self.get(key)
+
+    def __setitem__(self, key: str, value: Any):
+        self.set(key, value)
+
+
+class DictCache(CacheBackend):
+    """An unbounded cache backed by a dict."""
+
+    def __init__(self):
+        """Initializes the DictCache."""
+        super().__init__()
+        self._data: dict[str, Any] = {}
+
+    def get(self, key: str) -> Any:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self.stats.misses += 1
+            raise
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        self._data[key] = value
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class LRUCache(CacheBackend):
+    """A bounded cache that drops the least recently used entries.
+
+    Entries can also be given a time to live, after which they are dropped on
+    their next lookup. Share one instance between exports to keep lookups warm.
+
+    Attributes:
+        maxsize (Optional[int]): The largest number of entries kept, or None for no limit.
+        ttl (Optional[float]): How many seconds an entry stays valid, or None for no limit.
+    """
+
+    def __init__(self, maxsize: int | None = 1024, ttl: float | None = None):
+        """Initializes the LRUCache.
+
+        Args:
+            maxsize (Optional[int]): The largest number of entries kept. Defaults to 1024.
+            ttl (Optional[float]): How many seconds an entry stays valid. Defaults to None.
+
+        Raises:
+            ValueError: If ``maxsize`` or ``ttl`` is not positive.
+        """
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        if ttl is not None and ttl <= 0:
+            raise ValueError("ttl must be positive")
+
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict[str, tuple[float | None, Any]] = OrderedDict()
+
+    def get(self, key: str) -> Any:
+        try:
+            expires_at, value = self._data[key]
+        except KeyError:
+            self.stats.misses += 1
+            raise
+
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            self.stats.evictions += 1
+            self.stats.misses += 1
+            raise KeyError(key)
+
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: str, value: Any):
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        if self.maxsize is not None:
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key: str) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and (entry[0] is None or entry[0] > time.monotonic())
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class DiskCache(CacheBackend):
+    """A cache kept in a SQLite file, so it outlives the process.
+
+    Values are stored as JSON, so only JSON-serialisable values (such as the
+    rendered message fragments of ``fragment_cache``) can be kept. Lookups do
+    not write to the file: the time each entry was last used is written with
+    the next ``set``, or on ``close``.
+
+    Attributes:
+        path (str): The path of the SQLite file.
+        maxsize (Optional[int]): The largest number of entries kept, or None for no limit.
+    """
+
+    def __init__(self, path: str | os.PathLike, maxsize: int | None = None):
+        """Initializes the DiskCache.
+
+        Args:
+            path (str | os.PathLike): The SQLite file to keep the cache in. It is
+                created if needed.
+            maxsize (Optional[int]): The largest number of entries kept; the least
+                recently used are dropped first. Defaults to None (no limit).
+
+        Raises:
+            ValueError: If ``maxsize`` is not positive.
+        """
+        if maxsize is not None and maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+
+        super().__init__()
+        self.path = os.fspath(path)
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._used: dict[str, float] = {}
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._db.execute(
+            "CREATE INDEX IF NOT EXISTS entries_last_used ON entries (last_used)"
+        )
+        self._db.commit()
+
+    def get(self, key: str) -> Any:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.stats.misses += 1
+                raise KeyError(key)
+            self._used[key] = time.time()
+        self.stats.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any):
+        data = json.dumps(value)
+        with self._lock:
+            self._write_used()
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                (key, data, time.time()),
+            )
+            if self.maxsize is not None:
+                evicted = self._db.execute(
+                    "DELETE FROM entries WHERE key IN (SELECT key FROM entries "
+                    "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.maxsize,),
+                ).rowcount
+                self.stats.evictions += evicted
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._used.clear()
+            self._db.execute("DELETE FROM entries")
+            self._db.commit()
+
+    def close(self):
+        """Writes the pending use times and closes the SQLite file."""
+        with self._lock:
+            self._write_used()
+            self._db.commit()
+            self._db.close()
+
+    def _write_used(self):
+        # Called with the lock held; the caller commits.
+        if self._used:
+            self._db.executemany(
+                "UPDATE entries SET last_used = ? WHERE key = ?",
+                [(used, key) for key, used in self._used.items()],
+            )
+            self._used.clear()
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT 1 FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()
+        return count
@@ -0,0 +1,138 @@
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Optional
+
+import aiohttp
+
+from DiscordTranscript.ext.cache_backend import CacheBackend, DictCache
+from DiscordTranscript.ext.downloader import DownloadScheduler
+from DiscordTranscript.ext.references import ReferenceIndex
+
+if TYPE_CHECKING:
+    from DiscordTranscript.ext.members import MemberIndex
+    from DiscordTranscript.ext.stats import ExportStats
+    from DiscordTranscript.ext.writer import RecordWriter
+
+_current_context: ContextVar[Optional["ExportContext"]] = ContextVar(
+    "export_context", default=None
+)
+
+
+class ExportContext:
+    """The state owned by a single transcript export.
+
+    Each export gets its own context, so several exports can run at once on the
+    same event loop without sharing memoised lookups or dropdown IDs.
+
+    Attributes:
+        cache (CacheBackend): The results of ``cache()``-decorated calls made during the export.
+        menu_div_id (int): The ID of the next dropdown menu.
+        session (Optional[aiohttp.ClientSession]): The HTTP session shared by the export.
+        downloads (DownloadScheduler): The scheduler of the export's downloads.
+        stats (Optional[ExportStats]): The timings of the export, when it is profiled.
+        members (Optional[MemberIndex]): The members resolved for the exported guild.
+        references (ReferenceIndex): The replied-to messages fetched from the channel.
+        fragments (Optional[CacheBackend]): The rendered message bodies kept across exports.
+        records (Optional[RecordWriter]): Where the structured record of each rendered
+            message is written, when the export writes them.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession | None = None,
+        cache: CacheBackend | None = None,
+        downloads: DownloadScheduler | None = None,
+        stats: Optional["ExportStats"] = None,
+        fragments: CacheBackend | None = None,
+    ):
+        """Initializes the ExportContext.
+
+        Args:
+            session (Optional[aiohttp.ClientSession]): An HTTP session to share. When
+                omitted, one is opened on first use and closed with the context.
+            cache (Optional[CacheBackend]): A cache to share with other exports. It is
+                left untouched when the context closes. When omitted, the context uses
+                a private cache that is cleared on close.
+            downloads (Optional[DownloadScheduler]): The scheduler to download assets
+                with. Defaults to a scheduler with the default limits.
+            stats (Optional[ExportStats]): Where to collect the export's timings.
+                Defaults to None (not profiled).
+            fragments (Optional[CacheBackend]): Where to keep the rendered bodies of
+                messages for later exports. Defaults to None (bodies are not kept).
+        """
+        self.cache = cache if cache is not None else DictCache()
+        self._owns_cache = cache is None
+        self.menu_div_id = 0
+        self.session = session
+        self._owns_session = False
+        self.downloads = downloads if downloads is not None else DownloadScheduler()
+        self.stats = stats
+        self.members: MemberIndex | None = None
+        self.references = ReferenceIndex(self.cache)
+        self.fragments = fragments
+        self.records: RecordWriter | None = None
+        self._tokens = []
+
+    @staticmethod
+    def current() -> Optional["ExportContext"]:
+        """Returns the context of the export running in the current task.
+
+        Returns:
+            Optional[ExportContext]: The active context, or None outside an export.
+        """
+        return _current_context.get()
+
+    def next_menu_div_id(self) -> int:
+        """Reserves an ID for a dropdown menu.
+
+        Returns:
+            int: The reserved ID.
+        """
+        menu_div_id = self.menu_div_id
+        self.menu_div_id += 1
+        return menu_div_id
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """Returns the shared HTTP session, opening it if needed.
+
+        Returns:
+            aiohttp.ClientSession: The shared HTTP session.
+        """
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+            self._owns_session = True
+        return self.session
+
+    async def fetch(
+        self, url: str, session: aiohttp.ClientSession | None = None
+    ) -> tuple[int, bytes]:
+        """Downloads a URL within the export's download limits.
+
+        Args:
+            url (str): The URL to download.
+            session (Optional[aiohttp.ClientSession]): The session to download with.
+                Defaults to the export's session.
+
+        Returns:
+            Tuple[int, bytes]: The HTTP status and, when it is 200, the response body.
+        """
+        if session is None:
+            session = await self.get_session()
+        return await self.downloads.fetch(session, url)
+
+    async def close(self):
+        """Releases the private cache and closes the HTTP session if the context opened it."""
+        self.downloads.close()
+        if self._owns_cache:
+            self.cache.clear()
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+            self._owns_session = False
+
+    async def __aenter__(self) -> "ExportContext":
+        self._tokens.append(_current_context.set(self))
+        return self
+
+    async def __aexit__(self, *exc_info):
+        _current_context.reset(self._tokens.pop())
+        await self.close()
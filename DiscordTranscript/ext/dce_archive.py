@@ -0,0 +1,443 @@
+from collections.abc import Iterator
+import itertools
+import json
+import mimetypes
+import re
+from typing import IO, Any
+
+from DiscordTranscript.ext.discord_import import discord
+from DiscordTranscript.ext.payload import emoji_text, parse_time
+from DiscordTranscript.ext.snapshot import (
+    AttachmentSnapshot,
+    ChannelSnapshot,
+    ColourSnapshot,
+    ComponentSnapshot,
+    EmbedFieldSnapshot,
+    EmbedProxySnapshot,
+    EmbedSnapshot,
+    GuildSnapshot,
+    InteractionSnapshot,
+    MessageSnapshot,
+    ReactionSnapshot,
+    ReferenceSnapshot,
+    RoleSnapshot,
+    StickerSnapshot,
+    UserSnapshot,
+)
+
+CHUNK_SIZE = 1 << 16
+
+# The top-level keys of a DiscordChatExporter JSON export.
+ARCHIVE_KEYS = ("guild", "channel", "dateRange", "exportedAt", "messages")
+
+# DiscordChatExporter names message types, channel types and button styles
+# after the API enums; these map them back to what the renderers compare.
+MESSAGE_TYPES = {
+    "Default": discord.MessageType.default.value,
+    "RecipientAdd": discord.MessageType.recipient_add.value,
+    "RecipientRemove": discord.MessageType.recipient_remove.value,
+    "Call": discord.MessageType.call.value,
+    "ChannelNameChange": discord.MessageType.channel_name_change.value,
+    "ChannelIconChange": discord.MessageType.channel_icon_change.value,
+    "ChannelPinnedMessage": discord.MessageType.pins_add.value,
+    "GuildMemberJoin": discord.MessageType.new_member.value,
+    "ThreadCreated": discord.MessageType.thread_created.value,
+    "Reply": discord.MessageType.reply.value,
+}
+
+CHANNEL_TYPES = {
+    "GuildTextChat": "text",
+    "DirectTextChat": "private",
+    "DirectGroupTextChat": "group",
+    "GuildCategory": "category",
+    "GuildNews": "news",
+    "GuildVoiceChat": "voice",
+    "GuildNewsThread": "news_thread",
+    "GuildPublicThread": "public_thread",
+    "GuildPrivateThread": "private_thread",
+    "GuildStageVoice": "stage_voice",
+    "GuildDirectory": "directory",
+    "GuildForum": "forum",
+}
+
+BUTTON_STYLES = {"Primary", "Secondary", "Success", "Danger", "Link", "Premium"}
+
+_WHITESPACE = re.compile(r"\s*")
+_FIRST_KEY = re.compile(r'\s*\{\s*"(\w+)"')
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Decodes JSON values from a file a chunk at a time.
+
+    Only the text after the last decoded value is kept, so memory stays bounded
+    by the largest value rather than the size of the file.
+    """
+
+    def __init__(self, file: IO[str], chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r}, found {char or 'EOF'!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number or literal at the end of the buffer may go on in the
+            # next chunk.
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_archive(
+    file: IO[str], chunk_size: int = CHUNK_SIZE
+) -> Iterator[tuple[str, Any]]:
+    """Reads a DiscordChatExporter JSON export incrementally.
+
+    Args:
+        file (IO[str]): The export, opened in text mode.
+        chunk_size (int): How many characters to read at once.
+
+    Yields:
+        Tuple[str, Any]: ``("messages", message)`` for each message, in file order,
+            and ``(key, value)`` for every other top-level key.
+
+    Raises:
+        ValueError: If the file is not a JSON object.
+    """
+    reader = _Reader(file, chunk_size)
+    reader.expect("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        key = reader.value()
+        reader.expect(":")
+        if key == "messages" and reader.peek() == "[":
+            reader.expect("[")
+            if reader.peek() != "]":
+                while True:
+                    yield key, reader.value()
+                    if reader.expect(",]") == "]":
+                        break
+            else:
+                reader.expect("]")
+        else:
+            yield key, reader.value()
+        if reader.expect(",}") == "}":
+            return
+
+
+def read_archive(
+    file: IO[str], chunk_size: int = CHUNK_SIZE
+) -> tuple[dict, Iterator[dict]]:
+    """Reads the header of a DiscordChatExporter JSON export.
+
+    The guild and the channel come before the messages in these exports, so they
+    are read first; the messages are read as the returned iterator is consumed.
+
+    Args:
+        file (IO[str]): The export, opened in text mode.
+        chunk_size (int): How many characters to read at once.
+
+    Returns:
+        Tuple[dict, Iterator[dict]]: The top-level keys before the messages, and
+            the messages.
+    """
+    items = iter_archive(file, chunk_size)
+    header = {}
+    for key, value in items:
+        if key == "messages":
+            rest = (value for key, value in items if key == "messages")
+            return header, itertools.chain([value], rest)
+        header[key] = value
+    return header, iter(())
+
+
+def is_archive(file: IO[str]) -> bool:
+    """Tells a DiscordChatExporter JSON export from other JSON files.
+
+    The file is rewound afterwards.
+
+    Args:
+        file (IO[str]): The file, opened in text mode.
+
+    Returns:
+        bool: Whether the first key of the file is one of an export.
+    """
+    match = _FIRST_KEY.match(file.read(1024))
+    file.seek(0)
+    return bool(match) and match[1] in ARCHIVE_KEYS
+
+
+def _id(value: Any) -> int | None:
+    return int(value) if value else None
+
+
+def _colour(value: str | None) -> ColourSnapshot | None:
+    return ColourSnapshot(int(value[1:], 16)) if value else None
+
+
+def _emoji(data: dict | None) -> str | None:
+    if not data:
+        return None
+    return emoji_text(
+        {
+            "id": data.get("id"),
+            "name": data.get("name"),
+            "animated": data.get("isAnimated"),
+        }
+    )
+
+
+def user_from_archive(data: dict) -> UserSnapshot:
+    """Takes a snapshot of an exported user.
+
+    Args:
+        data (dict): The user, as DiscordChatExporter writes authors and mentions.
+
+    Returns:
+        UserSnapshot: The snapshot, coloured after the highest of its roles.
+    """
+    user_id = int(data["id"])
+    roles = sorted(data.get("roles") or (), key=lambda role: role.get("position", 0))
+    top_role = roles[-1] if roles else None
+    return UserSnapshot(
+        id=user_id,
+        name=data.get("name") or "",
+        discriminator=str(data.get("discriminator") or "0"),
+        display_name=data.get("nickname") or data.get("name") or "",
+        display_avatar=data.get("avatarUrl"),
+        bot=bool(data.get("isBot")),
+        verified_bot=False,
+        created_at=discord.utils.snowflake_time(user_id),
+        colour=str(data["color"]).lower() if data.get("color") else None,
+        top_role=RoleSnapshot(
+            int(top_role["id"]),
+            top_role.get("name") or "",
+            _colour(top_role.get("color")) or ColourSnapshot(0),
+        )
+        if top_role
+        else None,
+    )
+
+
+def channel_from_archive(data: dict) -> ChannelSnapshot:
+    """Takes a snapshot of an exported channel.
+
+    Args:
+        data (dict): The ``channel`` of the export.
+
+    Returns:
+        ChannelSnapshot: The snapshot.
+    """
+    return ChannelSnapshot(
+        _id(data.get("id")),
+        data.get("name") or "",
+        CHANNEL_TYPES.get(data.get("type"), "text"),
+        data.get("topic") or None,
+    )
+
+
+def guild_from_archive(header: dict) -> GuildSnapshot:
+    """Takes a snapshot of the guild of an export.
+
+    Exports only name the guild, so its members and roles start empty; the
+    channel of the export is its only channel.
+
+    Args:
+        header (dict): The top-level keys of the export, as read by ``read_archive``.
+
+    Returns:
+        GuildSnapshot: The snapshot.
+    """
+    guild = header.get("guild") or {}
+    channel = channel_from_archive(header.get("channel") or {})
+    return GuildSnapshot(
+        _id(guild.get("id")) or 0,
+        guild.get("name") or "",
+        guild.get("iconUrl"),
+        channels={channel.id: channel},
+    )
+
+
+def _proxy(data: dict | None) -> EmbedProxySnapshot | None:
+    if not data:
+        return None
+    return EmbedProxySnapshot(
+        name=data.get("name"),
+        text=data.get("text"),
+        url=data.get("url"),
+        proxy_url=data.get("url"),
+        icon_url=data.get("iconUrl"),
+        width=data.get("width"),
+        height=data.get("height"),
+    )
+
+
+def embed_from_archive(data: dict) -> EmbedSnapshot:
+    """Takes a snapshot of an exported embed.
+
+    Args:
+        data (dict): The embed.
+
+    Returns:
+        EmbedSnapshot: The snapshot.
+    """
+    images = data.get("images") or ()
+    return EmbedSnapshot(
+        type="rich",
+        title=data.get("title") or None,
+        description=data.get("description") or None,
+        url=data.get("url"),
+        colour=_colour(data.get("color")),
+        timestamp=parse_time(data.get("timestamp")),
+        fields=[
+            EmbedFieldSnapshot(
+                field.get("name"), field.get("value"), bool(field.get("isInline"))
+            )
+            for field in data.get("fields") or ()
+        ],
+        author=_proxy(data.get("author")),
+        footer=_proxy(data.get("footer")),
+        image=_proxy(data.get("image") or (images[0] if images else None)),
+        thumbnail=_proxy(data.get("thumbnail")),
+        video=_proxy(data.get("video")),
+        provider=None,
+    )
+
+
+def component_from_archive(data: dict) -> ComponentSnapshot | None:
+    """Takes a snapshot of an exported component.
+
+    Args:
+        data (dict): The component.
+
+    Returns:
+        Optional[ComponentSnapshot]: The snapshot of an action row or a button, or
+            None for other components, which exports do not describe.
+    """
+    kind = data.get("type")
+    if kind == "ActionRow":
+        return ComponentSnapshot(
+            "action_row",
+            children=[
+                child
+                for child in map(component_from_archive, data.get("components") or ())
+                if child is not None
+            ],
+        )
+    if kind == "Button":
+        style = data.get("style")
+        return ComponentSnapshot(
+            "button",
+            url=data.get("url") or None,
+            label=data.get("label"),
+            style=f"ButtonStyle.{(style if style in BUTTON_STYLES else 'Secondary').lower()}",
+            emoji=_emoji(data.get("emoji")),
+            disabled=bool(data.get("isDisabled")),
+        )
+    return None
+
+
+def message_from_archive(data: dict, channel: ChannelSnapshot) -> MessageSnapshot:
+    """Takes a snapshot of an exported message.
+
+    DiscordChatExporter writes message content with mentions and custom emojis
+    already replaced by their names, so it renders as written.
+
+    Args:
+        data (dict): The message.
+        channel (ChannelSnapshot): The channel of the export.
+
+    Returns:
+        MessageSnapshot: The snapshot.
+    """
+    message_id = int(data["id"])
+    reference = data.get("reference")
+    interaction = data.get("interaction")
+    return MessageSnapshot(
+        id=message_id,
+        type_value=MESSAGE_TYPES.get(data.get("type"), 0),
+        content=data.get("content") or "",
+        created_at=parse_time(data.get("timestamp"))
+        or discord.utils.snowflake_time(message_id),
+        edited_at=parse_time(data.get("timestampEdited")),
+        author=user_from_archive(data["author"]),
+        channel=channel,
+        reference=ReferenceSnapshot(
+            _id(reference.get("messageId")), _id(reference.get("channelId"))
+        )
+        if reference
+        else None,
+        mentions=[user_from_archive(user) for user in data.get("mentions") or ()],
+        attachments=[
+            AttachmentSnapshot(
+                _id(attachment.get("id")),
+                attachment.get("fileName") or "",
+                attachment.get("fileSizeBytes") or 0,
+                attachment["url"],
+                attachment["url"],
+                mimetypes.guess_type(attachment.get("fileName") or "")[0],
+            )
+            for attachment in data.get("attachments") or ()
+        ],
+        embeds=[embed_from_archive(embed) for embed in data.get("embeds") or ()],
+        stickers=[
+            StickerSnapshot(sticker["sourceUrl"])
+            for sticker in data.get("stickers") or ()
+            if sticker.get("sourceUrl")
+        ],
+        reactions=[
+            ReactionSnapshot(
+                _emoji(reaction.get("emoji")) or "", reaction.get("count", 0)
+            )
+            for reaction in data.get("reactions") or ()
+        ],
+        components=[
+            component
+            for component in map(component_from_archive, data.get("components") or ())
+            if component is not None
+        ],
+        interaction=InteractionSnapshot(
+            _id(interaction.get("id")),
+            interaction.get("name"),
+            user_from_archive(interaction["user"]),
+        )
+        if interaction and interaction.get("user")
+        else None,
+    )
@@ -0,0 +1,67 @@
+import asyncio
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+import aiohttp
+
+
+class DownloadScheduler:
+    """Schedules the HTTP downloads of an export.
+
+    Downloads are capped globally and per host, and a URL that is requested
+    again while it is still downloading is fetched only once.
+
+    Attributes:
+        limit (int): The largest number of downloads in flight.
+        per_host_limit (int): The largest number of downloads in flight to one host.
+    """
+
+    def __init__(self, limit: int = 8, per_host_limit: int = 4):
+        """Initializes the DownloadScheduler.
+
+        Args:
+            limit (int): The largest number of downloads in flight. Defaults to 8.
+            per_host_limit (int): The largest number of downloads in flight to one
+                host. Defaults to 4.
+        """
+        self.limit = max(limit, 1)
+        self.per_host_limit = max(per_host_limit, 1)
+        self._semaphore = asyncio.Semaphore(self.limit)
+        self._host_semaphores: defaultdict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(self.per_host_limit)
+        )
+        self._in_flight: dict[str, asyncio.Task] = {}
+
+    async def fetch(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> tuple[int, bytes]:
+        """Downloads a URL, sharing the download with callers asking for the same URL.
+
+        Args:
+            session (aiohttp.ClientSession): The session to download with.
+            url (str): The URL to download.
+
+        Returns:
+            Tuple[int, bytes]: The HTTP status and, when it is 200, the response body.
+        """
+        task = self._in_flight.get(url)
+        if task is None:
+            task = asyncio.ensure_future(self._download(session, url))
+            self._in_flight[url] = task
+            task.add_done_callback(lambda _: self._in_flight.pop(url, None))
+        return await asyncio.shield(task)
+
+    async def _download(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> tuple[int, bytes]:
+        async with self._semaphore, self._host_semaphores[urlsplit(url).netloc]:
+            async with session.get(url) as res:
+                if res.status != 200:
+                    return res.status, b""
+                return res.status, await res.read()
+
+    def close(self):
+        """Cancels the downloads still in flight."""
+        for task in list(self._in_flight.values()):
+            task.cancel()
+        self._in_flight.clear()
@@ -1,41 +1,51 @@
-import asyncio
+import os
 import unicodedata
 
 import aiohttp
 import emoji
 from grapheme import graphemes
 
-from DiscordTranscript.ext.cache import cache
+from DiscordTranscript.ext.stats import timed
 
+# The release the bundled index lists the assets of; see scripts/update_twemoji_index.py.
+twemoji_version = "v16.0.1"
 cdn_fmt = (
-    "https://cdn.jsdelivr.net/gh/jdecked/twemoji@latest/assets/72x72/{codepoint}.png"
+    f"https://cdn.jsdelivr.net/gh/jdecked/twemoji@{twemoji_version}/assets/72x72/"
+    "{codepoint}.png"
 )
+index_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), "twemoji.txt")
+
+
+def load_codepoints() -> frozenset:
+    """Loads the bundled index of Twemoji asset names.
+
+    Returns:
+        frozenset: The codepoint sequences that have a Twemoji image.
+    """
+    with open(index_path, encoding="utf-8") as f:
+        return frozenset(
+            line.strip() for line in f if line.strip() and not line.startswith("#")
+        )
+
+
+twemoji_codepoints = load_codepoints()
 
 
-@cache()
 async def valid_src(src: str, session: aiohttp.ClientSession | None = None) -> bool:
-    """Checks if a URL is valid.
+    """Checks if a Twemoji URL points to an existing image.
+
+    The check is done against the bundled Twemoji index, without any network
+    access.
 
     Args:
         src (str): The URL to check.
-        session (Optional[aiohttp.ClientSession]): Shared HTTP session.
+        session (Optional[aiohttp.ClientSession]): Unused, kept for compatibility.
 
     Returns:
         bool: Whether the URL is valid.
     """
-    close_session = False
-    if session is None:
-        session = aiohttp.ClientSession()
-        close_session = True
-
-    try:
-        async with session.get(src) as resp:
-            return resp.status == 200
-    except (aiohttp.ClientConnectorError, aiohttp.ClientError):
-        return False
-    finally:
-        if close_session:
-            await session.close()
+    name = src.rsplit("/", 1)[-1]
+    return name.endswith(".png") and name[:-4] in twemoji_codepoints
 
 
 def valid_category(char: str) -> bool:
@@ -72,7 +82,7 @@ async def convert(char: str, session: aiohttp.ClientSession | None = None) -> st
 
     Args:
         char (str): The character to convert.
-        session (Optional[aiohttp.ClientSession]): Shared HTTP session.
+        session (Optional[aiohttp.ClientSession]): Unused, kept for compatibility.
 
     Returns:
         str: The HTML for the emoji image.
@@ -91,40 +101,30 @@ async def convert(char: str, session: aiohttp.ClientSession | None = None) -> st
                 .title()
             )
 
-    src = cdn_fmt.format(codepoint=await codepoint([f"{ord(c):x}" for c in char]))
+    codes = [f"{ord(c):x}" for c in char]
+    code = await codepoint(codes)
+    if code not in twemoji_codepoints:
+        # A few ZWJ sequences are named without their variation selectors.
+        code = "-".join(c for c in codes if c != "fe0f")
 
-    if await valid_src(src, session=session):
+    if code in twemoji_codepoints:
+        src = cdn_fmt.format(codepoint=code)
         return f'<img class="emoji emoji--small" src="{src}" alt="{char}" title="{name}" aria-label="Emoji: {name}">'
     else:
         return char
 
 
+@timed("emoji")
 async def convert_emoji(
     string: str, session: aiohttp.ClientSession | None = None
 ) -> str:
-    """Converts a string of emojis to a string of emoji images concurrently.
+    """Converts a string of emojis to a string of emoji images.
 
     Args:
         string (str): The string to convert.
-        session (Optional[aiohttp.ClientSession]): Shared HTTP session.
+        session (Optional[aiohttp.ClientSession]): Unused, kept for compatibility.
 
     Returns:
         str: The converted string.
     """
-    grapheme_list = list(graphemes(string))
-    if not grapheme_list:
-        return ""
-
-    close_session = False
-    if session is None:
-        session = aiohttp.ClientSession()
-        close_session = True
-
-    try:
-        results = await asyncio.gather(
-            *(convert(ch, session=session) for ch in grapheme_list)
-        )
-        return "".join(results)
-    finally:
-        if close_session:
-            await session.close()
+    return "".join([await convert(ch) for ch in graphemes(string)])
@@ -0,0 +1,202 @@
+import datetime
+import json
+import os
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any
+
+from DiscordTranscript.ext.discord_import import discord
+
+if TYPE_CHECKING:
+    import discord as discord_typings
+
+STATE_FORMAT = 1
+
+
+def _dump_value(value: Any) -> Any:
+    if isinstance(value, datetime.datetime):
+        return {"datetime": value.isoformat()}
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _load_value(value: Any) -> Any:
+    if isinstance(value, dict) and "datetime" in value:
+        return datetime.datetime.fromisoformat(value["datetime"])
+    return value
+
+
+class ExportState:
+    """What an incremental export needs to append to an earlier transcript.
+
+    The state describes a transcript file: where its messages start and end,
+    the participants counted so far and the last message rendered, whose group
+    is left open so that new messages from the same author continue it.
+
+    Attributes:
+        options (list): The export options the transcript was rendered with.
+        channel_id (Optional[int]): The ID of the exported channel.
+        last_message_id (Optional[int]): The ID of the last message rendered.
+        message_count (int): The number of messages in the transcript.
+        meta_data (dict): The participant metadata, keyed by user ID.
+        last_author_id (Optional[int]): The author of the last message.
+        last_created_at (Optional[datetime.datetime]): When the last message was sent.
+        last_type (Optional[int]): The type of the last message.
+        messages_start (int): The byte offset where the messages start.
+        messages_end (int): The byte offset where the messages end, before the
+            closing tag of the last message group.
+    """
+
+    def __init__(
+        self,
+        options: list,
+        channel_id: int | None = None,
+        last_message_id: int | None = None,
+        message_count: int = 0,
+        meta_data: dict | None = None,
+        last_author_id: int | None = None,
+        last_created_at: datetime.datetime | None = None,
+        last_type: int | None = None,
+        messages_start: int = 0,
+        messages_end: int = 0,
+    ):
+        """Initializes the ExportState.
+
+        Args:
+            options (list): The export options the transcript was rendered with.
+            channel_id (Optional[int]): The ID of the exported channel.
+            last_message_id (Optional[int]): The ID of the last message rendered.
+            message_count (int): The number of messages in the transcript.
+            meta_data (Optional[dict]): The participant metadata, keyed by user ID.
+            last_author_id (Optional[int]): The author of the last message.
+            last_created_at (Optional[datetime.datetime]): When the last message was
+                sent.
+            last_type (Optional[int]): The type of the last message.
+            messages_start (int): The byte offset where the messages start.
+            messages_end (int): The byte offset where the messages end.
+        """
+        self.options = options
+        self.channel_id = channel_id
+        self.last_message_id = last_message_id
+        self.message_count = message_count
+        self.meta_data = meta_data if meta_data is not None else {}
+        self.last_author_id = last_author_id
+        self.last_created_at = last_created_at
+        self.last_type = last_type
+        self.messages_start = messages_start
+        self.messages_end = messages_end
+
+    def record_message(self, message: "discord_typings.Message"):
+        """Records the last message rendered into the transcript.
+
+        Args:
+            message (discord.Message): The message.
+        """
+        message_type = getattr(message.type, "value", None)
+        self.last_message_id = message.id
+        self.last_author_id = message.author.id
+        self.last_created_at = message.created_at
+        self.last_type = message_type if isinstance(message_type, int) else None
+
+    def previous_message(self) -> SimpleNamespace | None:
+        """Stands in for the last message when rendering the messages after it.
+
+        Returns:
+            Optional[SimpleNamespace]: An object with the ``id``, ``type``,
+                ``author.id`` and ``created_at`` of the last message, or None if
+                the transcript has no messages.
+        """
+        if self.last_message_id is None:
+            return None
+
+        message_type = None
+        if self.last_type is not None:
+            try:
+                message_type = discord.MessageType(self.last_type)
+            except (TypeError, ValueError):
+                pass
+        return SimpleNamespace(
+            id=self.last_message_id,
+            type=message_type,
+            author=SimpleNamespace(id=self.last_author_id),
+            created_at=self.last_created_at,
+        )
+
+    def to_dict(self) -> dict:
+        """Returns the state as JSON-serialisable data."""
+        return {
+            "format": STATE_FORMAT,
+            "options": self.options,
+            "channel_id": self.channel_id,
+            "last_message_id": self.last_message_id,
+            "message_count": self.message_count,
+            "meta_data": [
+                [user_id, [_dump_value(value) for value in values]]
+                for user_id, values in self.meta_data.items()
+            ],
+            "last_author_id": self.last_author_id,
+            "last_created_at": _dump_value(self.last_created_at),
+            "last_type": self.last_type,
+            "messages_start": self.messages_start,
+            "messages_end": self.messages_end,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "ExportState":
+        """Reads a state returned by `to_dict`.
+
+        Args:
+            data (dict): The data.
+
+        Returns:
+            ExportState: The state.
+
+        Raises:
+            ValueError: If the data was written by another version of the format.
+        """
+        if data.get("format") != STATE_FORMAT:
+            raise ValueError("unsupported export state format")
+        return cls(
+            options=data["options"],
+            channel_id=data["channel_id"],
+            last_message_id=data["last_message_id"],
+            message_count=data["message_count"],
+            meta_data={
+                int(user_id): [_load_value(value) for value in values]
+                for user_id, values in data["meta_data"]
+            },
+            last_author_id=data["last_author_id"],
+            last_created_at=_load_value(data["last_created_at"]),
+            last_type=data["last_type"],
+            messages_start=data["messages_start"],
+            messages_end=data["messages_end"],
+        )
+
+    @classmethod
+    def load(cls, path: str | os.PathLike) -> "ExportState | None":
+        """Reads a state file.
+
+        Args:
+            path (str | os.PathLike): The file.
+
+        Returns:
+            Optional[ExportState]: The state, or None if the file is missing or
+                unreadable.
+        """
+        try:
+            with open(path, encoding="utf-8") as fp:
+                return cls.from_dict(json.load(fp))
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
+
+    def save(self, path: str | os.PathLike):
+        """Writes the state to a file, replacing it atomically.
+
+        Args:
+            path (str | os.PathLike): The file.
+        """
+        path = os.fspath(path)
+        temporary = f"{path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as fp:
+            json.dump(self.to_dict(), fp)
+        os.replace(temporary, path)
@@ -0,0 +1,188 @@
+import asyncio
+from collections.abc import AsyncIterator
+import datetime
+
+from DiscordTranscript.ext.discord_import import discord
+from DiscordTranscript.ext.stats import stage_timer
+
+DISCORD_EPOCH = 1420070400000
+QUEUE_SIZE = 500
+
+_DONE = object()
+
+
+def to_snowflake(value, high: bool = False) -> int | None:
+    """Converts a history bound to a snowflake.
+
+    Args:
+        value (Optional[datetime.datetime | discord.abc.Snowflake]): The bound.
+        high (bool): Whether a date should map to the last snowflake of its
+            millisecond rather than the first. Naive dates are read as local time,
+            as discord.py does. Defaults to False.
+
+    Returns:
+        Optional[int]: The snowflake, or None when there is no bound.
+    """
+    if value is None:
+        return None
+    if isinstance(value, datetime.datetime):
+        millis = int(value.timestamp() * 1000 - DISCORD_EPOCH)
+        return (millis << 22) + (2**22 - 1 if high else 0)
+    return int(value.id)
+
+
+def snowflake_windows(
+    after_id: int, before_id: int, count: int
+) -> list[tuple[int, int]]:
+    """Splits the open range ``(after_id, before_id)`` into consecutive windows.
+
+    Args:
+        after_id (int): The exclusive lower bound.
+        before_id (int): The exclusive upper bound.
+        count (int): How many windows to make.
+
+    Returns:
+        List[Tuple[int, int]]: The exclusive ``(after, before)`` bounds of each
+            window, oldest first. Together they cover the range exactly once.
+    """
+    span = before_id - after_id
+    count = max(1, min(count, span - 1))
+    edges = [after_id + span * n // count for n in range(count)] + [before_id - 1]
+    return [(edges[n], edges[n + 1] + 1) for n in range(count)]
+
+
+def _window_history(channel, after_id: int, before_id: int):
+    return channel.history(
+        limit=None,
+        after=discord.Object(id=after_id),
+        before=discord.Object(id=before_id),
+        oldest_first=True,
+    )
+
+
+async def _fetch_window(channel, after_id: int, before_id: int) -> list:
+    return [message async for message in _window_history(channel, after_id, before_id)]
+
+
+def _history_bounds(channel, before, after) -> tuple[int, int]:
+    before_id = to_snowflake(before)
+    if before_id is None:
+        before_id = (
+            to_snowflake(datetime.datetime.now(datetime.timezone.utc), high=True) + 1
+        )
+    after_id = to_snowflake(after, high=True)
+    if after_id is None:
+        channel_id = getattr(channel, "id", None)
+        after_id = channel_id - 1 if isinstance(channel_id, int) else 0
+    return after_id, before_id
+
+
+async def fetch_history_sharded(
+    channel,
+    shards: int,
+    before: datetime.datetime | None = None,
+    after: datetime.datetime | None = None,
+) -> list:
+    """Fetches a channel's history through several windows paged at the same time.
+
+    The ``(after, before)`` range is split into ``shards`` windows of equal
+    duration, derived from message snowflakes, and each window is paged by its
+    own history iterator.
+
+    Args:
+        channel (discord.abc.Messageable): The channel to fetch.
+        shards (int): How many windows to fetch concurrently.
+        before (Optional[datetime.datetime]): Only fetch messages before this date.
+            Defaults to now.
+        after (Optional[datetime.datetime]): Only fetch messages after this date.
+            Defaults to the creation of the channel.
+
+    Returns:
+        List[discord.Message]: The messages, oldest first.
+    """
+    after_id, before_id = _history_bounds(channel, before, after)
+    if before_id - after_id <= 1:
+        return []
+
+    windows = await asyncio.gather(
+        *(
+            _fetch_window(channel, window_after, window_before)
+            for window_after, window_before in snowflake_windows(
+                after_id, before_id, shards
+            )
+        )
+    )
+    return [message for window in windows for message in window]
+
+
+async def _produce(history, queue: asyncio.Queue):
+    try:
+        with stage_timer("history"):
+            async for message in history:
+                await queue.put(message)
+    except Exception as error:
+        await queue.put(error)
+    else:
+        await queue.put(_DONE)
+
+
+async def stream_history(
+    channel,
+    limit: int | None = None,
+    before: datetime.datetime | None = None,
+    after: datetime.datetime | None = None,
+    shards: int = 1,
+    queue_size: int = QUEUE_SIZE,
+) -> AsyncIterator:
+    """Yields a channel's history, oldest first, while later pages are still fetched.
+
+    Pages are fetched by a background task into a bounded queue, so fetching
+    stops once ``queue_size`` messages are waiting and resumes as they are
+    consumed. With ``shards`` above 1 and no ``limit``, each time window of
+    :func:`fetch_history_sharded` gets its own task and queue; the windows are
+    fetched at the same time and yielded one after the other.
+
+    ``limit`` keeps the oldest messages of the range, so it is only meaningful
+    together with ``after``.
+
+    Args:
+        channel (discord.abc.Messageable): The channel to fetch.
+        limit (Optional[int]): The maximum number of messages to fetch.
+        before (Optional[datetime.datetime]): Only fetch messages before this date.
+        after (Optional[datetime.datetime]): Only fetch messages after this date.
+        shards (int): How many time windows to fetch at once. Defaults to 1.
+        queue_size (int): How many fetched messages may wait to be consumed.
+            Defaults to 500.
+
+    Yields:
+        discord.Message: The messages, oldest first.
+    """
+    if shards > 1 and limit is None:
+        after_id, before_id = _history_bounds(channel, before, after)
+        if before_id - after_id <= 1:
+            return
+        histories = [
+            _window_history(channel, window_after, window_before)
+            for window_after, window_before in snowflake_windows(
+                after_id, before_id, shards
+            )
+        ]
+    else:
+        histories = [
+            channel.history(limit=limit, before=before, after=after, oldest_first=True)
+        ]
+
+    queues = [asyncio.Queue(max(queue_size // len(histories), 1)) for _ in histories]
+    producers = [
+        asyncio.ensure_future(_produce(history, queue))
+        for history, queue in zip(histories, queues, strict=True)
+    ]
+    try:
+        for queue in queues:
+            while (item := await queue.get()) is not _DONE:
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+    finally:
+        for producer in producers:
+            producer.cancel()
@@ -1,7 +1,10 @@
 import html
 import json
 import os
+import re
 
+from DiscordTranscript.ext.stats import timed
+from DiscordTranscript.ext.template import get_template, register_template
 from DiscordTranscript.parse.markdown import ParseMarkdown
 from DiscordTranscript.parse.mention import ParseMention
 
@@ -18,7 +21,40 @@ PARSE_MODE_REFERENCE = 5
 PARSE_MODE_EMOJI = 6
 PARSE_MODE_HTML_SAFE = 7
 
+# Letters, digits and the separators of IDs, colours and timestamps. A leading
+# "#" run or "1. " would start a heading or a list, so those are excluded.
+PLAIN_TEXT_PATTERN = re.compile(r"(?!#+(?:\s|$)|\d+\.\s)[A-Za-z0-9#][A-Za-z0-9 #:,.-]*")
+
+PLAIN_TEXT_MODES = frozenset(
+    (
+        PARSE_MODE_NO_MARKDOWN,
+        PARSE_MODE_MARKDOWN,
+        PARSE_MODE_EMBED,
+        PARSE_MODE_SPECIAL_EMBED,
+        PARSE_MODE_REFERENCE,
+        PARSE_MODE_EMOJI,
+    )
+)
+
+
+def is_plain_text(value) -> bool:
+    """Checks whether a value reads the same before and after mention and markdown parsing.
+
+    Such values contain no markup, mention or emoji trigger characters, and
+    nothing to escape, so they can be used as they are.
 
+    Args:
+        value: The value to check.
+
+    Returns:
+        bool: Whether the parsers would leave the value unchanged.
+    """
+    return isinstance(value, str) and (
+        not value or PLAIN_TEXT_PATTERN.fullmatch(value) is not None
+    )
+
+
+@timed("fill_out")
 async def fill_out(
     guild,
     base,
@@ -40,6 +76,35 @@ async def fill_out(
     Returns:
         str: The filled out HTML template.
     """
+    values = await fill_values(
+        guild, replacements, placeholders=placeholders, bot=bot, timezone=timezone
+    )
+    return get_template(base).render(values)
+
+
+async def fill_values(
+    guild,
+    replacements,
+    placeholders: dict | None = None,
+    bot=None,
+    timezone: str = "UTC",
+) -> dict[str, str]:
+    """Parses the given replacements into template values.
+
+    When a key is given more than once, the first replacement wins. Plain values
+    such as IDs, colours and timestamps skip the mention and markdown parsers.
+
+    Args:
+        guild (discord.Guild): The guild the message is in.
+        replacements (list): A list of replacements to make.
+        placeholders (dict, optional): A dictionary of placeholders to use. Defaults to None.
+        bot (Optional[discord.Client]): The bot instance. Defaults to None.
+        timezone (str): The timezone to use. Defaults to "UTC".
+
+    Returns:
+        dict: The parsed values, keyed by placeholder name.
+    """
+    values: dict[str, str] = {}
     for r in replacements:
         if len(r) == 2:
             k, v = r
@@ -47,6 +112,14 @@ async def fill_out(
 
         k, v, mode = r
 
+        if (
+            mode in PLAIN_TEXT_MODES
+            and not (placeholders and mode == PARSE_MODE_MARKDOWN)
+            and is_plain_text(v)
+        ):
+            values.setdefault(k, v.strip())
+            continue
+
         if mode != PARSE_MODE_NONE:
             v = await ParseMention(v, guild, bot=bot, timezone=timezone).flow()
         if mode == PARSE_MODE_MARKDOWN:
@@ -66,14 +139,16 @@ async def fill_out(
 
             v = json.dumps(v, ensure_ascii=False)[1:-1]
 
-        base = base.replace("{{" + k + "}}", str(v or "").strip())
+        values.setdefault(k, str(v or "").strip())
 
-    return base
+    return values
 
 
 def read_file(filename: str, minify: bool = False) -> str:
     with open(filename, encoding="utf-8") as f:
-        return f.read()
+        source = f.read()
+    register_template(source)
+    return source
 
 
 start_message = read_file(dir_path + "/html/message/start.html")
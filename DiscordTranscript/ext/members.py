@@ -0,0 +1,161 @@
+import asyncio
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from DiscordTranscript.ext.cache_backend import CacheBackend, DictCache
+from DiscordTranscript.ext.stats import timed
+
+if TYPE_CHECKING:
+    import discord as discord_typings
+
+QUERY_BATCH_SIZE = 100
+
+
+def collect_user_ids(messages: Iterable["discord_typings.Message"]) -> list[int]:
+    """Collects the users a set of messages shows member details for.
+
+    Args:
+        messages (Iterable[discord.Message]): The messages.
+
+    Returns:
+        List[int]: The IDs of the distinct authors, mentioned users and users who
+            ran an interaction, in order of first appearance.
+    """
+    user_ids: dict[int, None] = {}
+    for message in messages:
+        users = [message.author]
+        mentions = getattr(message, "mentions", None)
+        if isinstance(mentions, list):
+            users.extend(mentions)
+        interaction = getattr(message, "interaction_metadata", None) or getattr(
+            message, "interaction", None
+        )
+        if interaction is not None:
+            users.append(getattr(interaction, "user", None))
+
+        for user in users:
+            user_id = getattr(user, "id", None)
+            if isinstance(user_id, int):
+                user_ids[user_id] = None
+    return list(user_ids)
+
+
+class MemberIndex:
+    """The members of a guild, resolved in bulk and looked up by user ID.
+
+    Members missing from the guild's member cache are requested through
+    ``Guild.query_members`` in batches of ``QUERY_BATCH_SIZE`` IDs. When that is
+    not available (no gateway connection or no members intent), they are fetched
+    one by one instead, ``limit`` at a time. Users who are not members are
+    remembered as None.
+
+    Attributes:
+        guild (discord.Guild): The guild the members belong to.
+        store (CacheBackend): Where the resolved members are kept.
+        limit (int): The largest number of members fetched one by one at once.
+    """
+
+    def __init__(
+        self,
+        guild: "discord_typings.Guild",
+        store: CacheBackend | None = None,
+        limit: int = 8,
+    ):
+        """Initializes the MemberIndex.
+
+        Args:
+            guild (discord.Guild): The guild the members belong to.
+            store (Optional[CacheBackend]): Where to keep the resolved members, such as
+                the cache of the export. Defaults to a private cache.
+            limit (int): The largest number of members fetched one by one at once.
+                Defaults to 8.
+        """
+        self.guild = guild
+        self.store = store if store is not None else DictCache()
+        self.limit = max(limit, 1)
+        self._prefix = f"{__name__}:{getattr(guild, 'id', None)}:"
+
+    def __contains__(self, user_id: int) -> bool:
+        try:
+            self.store.get(self._prefix + str(user_id))
+        except KeyError:
+            return False
+        return True
+
+    def peek(self, user_id: int) -> "discord_typings.Member | None":
+        """Looks a member up without resolving it.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Optional[discord.Member]: The member, or None if the user is not a member
+                or was not resolved yet.
+        """
+        try:
+            return self.store.get(self._prefix + str(user_id))
+        except KeyError:
+            return None
+
+    async def get(self, user_id: int) -> "discord_typings.Member | None":
+        """Looks a member up, resolving it first if needed.
+
+        Args:
+            user_id (int): The ID of the user.
+
+        Returns:
+            Optional[discord.Member]: The member, or None if the user is not a member.
+        """
+        if user_id not in self:
+            await self.resolve([user_id])
+        return self.peek(user_id)
+
+    @timed("members")
+    async def resolve(self, user_ids: Iterable[int]):
+        """Resolves the members that are not in the index yet.
+
+        Args:
+            user_ids (Iterable[int]): The IDs of the users.
+        """
+        missing = []
+        for user_id in dict.fromkeys(user_ids):
+            if user_id in self:
+                continue
+            member = self.guild.get_member(user_id)
+            if member:
+                self.store.set(self._prefix + str(user_id), member)
+            else:
+                missing.append(user_id)
+
+        for start in range(0, len(missing), QUERY_BATCH_SIZE):
+            batch = missing[start : start + QUERY_BATCH_SIZE]
+            found = await self._query(batch)
+            for user_id in batch:
+                self.store.set(self._prefix + str(user_id), found.get(user_id))
+
+    async def _query(
+        self, user_ids: list[int]
+    ) -> dict[int, "discord_typings.Member | None"]:
+        try:
+            members = await self.guild.query_members(
+                user_ids=user_ids, limit=len(user_ids)
+            )
+        except Exception:
+            pass
+        else:
+            return {member.id: member for member in members}
+
+        semaphore = asyncio.Semaphore(self.limit)
+        members = await asyncio.gather(
+            *(self._fetch(user_id, semaphore) for user_id in user_ids)
+        )
+        return dict(zip(user_ids, members, strict=True))
+
+    async def _fetch(
+        self, user_id: int, semaphore: asyncio.Semaphore
+    ) -> "discord_typings.Member | None":
+        async with semaphore:
+            try:
+                return await self.guild.fetch_member(user_id)
+            except Exception:
+                return None
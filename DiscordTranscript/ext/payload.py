@@ -0,0 +1,304 @@
+import datetime
+import re
+from typing import Any
+
+from DiscordTranscript.ext.discord_import import discord
+from DiscordTranscript.ext.snapshot import (
+    AttachmentSnapshot,
+    ChannelSnapshot,
+    ColourSnapshot,
+    ComponentSnapshot,
+    EmbedFieldSnapshot,
+    EmbedProxySnapshot,
+    EmbedSnapshot,
+    InteractionSnapshot,
+    MessageSnapshot,
+    ReactionSnapshot,
+    ReferenceSnapshot,
+    SelectOptionSnapshot,
+    StickerSnapshot,
+    UserSnapshot,
+)
+
+CDN = "https://cdn.discordapp.com"
+
+VERIFIED_BOT_FLAG = 1 << 16
+
+BUTTON_STYLES = {
+    1: "primary",
+    2: "secondary",
+    3: "success",
+    4: "danger",
+    5: "link",
+    6: "premium",
+}
+
+# Component types, as numbered by the API.
+COMPONENT_TYPES = {
+    1: "action_row",
+    2: "button",
+    3: "select",
+    5: "select",
+    6: "select",
+    7: "select",
+    8: "select",
+    9: "section",
+    10: "text_display",
+    11: "thumbnail",
+    14: "separator",
+    17: "container",
+}
+
+STICKER_EXTENSIONS = {1: "png", 2: "png", 3: "json", 4: "gif"}
+
+_FRACTION = re.compile(r"\.(\d+)")
+
+
+def _id(value: Any) -> int | None:
+    return int(value) if value is not None else None
+
+
+def parse_time(value: str | None) -> datetime.datetime | None:
+    """Parses an API timestamp.
+
+    Args:
+        value (Optional[str]): The timestamp, in ISO 8601 format.
+
+    Returns:
+        Optional[datetime.datetime]: The time, or None if ``value`` is empty.
+    """
+    if not value:
+        return None
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    # Older Pythons only parse microseconds, not the ticks .NET exporters write.
+    value = _FRACTION.sub(lambda match: f".{match[1][:6]:0<6}", value, count=1)
+    return datetime.datetime.fromisoformat(value)
+
+
+def emoji_text(data: dict | None) -> str | None:
+    """Returns an emoji payload as the text Discord writes it in messages.
+
+    Args:
+        data (Optional[dict]): The emoji payload.
+
+    Returns:
+        Optional[str]: ``<:name:id>`` for custom emojis (``<a:name:id>`` when
+            animated), the emoji itself otherwise, or None if there is none.
+    """
+    if not data:
+        return None
+    if data.get("id"):
+        prefix = "a" if data.get("animated") else ""
+        return f"<{prefix}:{data.get('name') or '_'}:{data['id']}>"
+    return data.get("name")
+
+
+def user_from_payload(data: dict, member: dict | None = None) -> UserSnapshot:
+    """Takes a snapshot of a user payload.
+
+    Args:
+        data (dict): The user payload.
+        member (Optional[dict]): The partial member payload sent with the user, whose
+            nickname is used as the display name. Defaults to None.
+
+    Returns:
+        UserSnapshot: The snapshot.
+    """
+    user_id = int(data["id"])
+    discriminator = str(data.get("discriminator") or "0")
+    avatar = data.get("avatar")
+    if avatar:
+        extension = "gif" if avatar.startswith("a_") else "png"
+        display_avatar = f"{CDN}/avatars/{user_id}/{avatar}.{extension}?size=1024"
+    else:
+        index = (user_id >> 22) % 6 if discriminator == "0" else int(discriminator) % 5
+        display_avatar = f"{CDN}/embed/avatars/{index}.png"
+    return UserSnapshot(
+        id=user_id,
+        name=data["username"],
+        discriminator=discriminator,
+        display_name=(member or {}).get("nick")
+        or data.get("global_name")
+        or data["username"],
+        display_avatar=display_avatar,
+        bot=bool(data.get("bot")),
+        verified_bot=bool((data.get("public_flags") or 0) & VERIFIED_BOT_FLAG),
+        created_at=discord.utils.snowflake_time(user_id),
+    )
+
+
+def _proxy(data: dict | None) -> EmbedProxySnapshot | None:
+    if not data:
+        return None
+    return EmbedProxySnapshot(
+        **{name: data.get(name) for name in EmbedProxySnapshot.__slots__}
+    )
+
+
+def embed_from_payload(data: dict) -> EmbedSnapshot:
+    """Takes a snapshot of an embed payload.
+
+    Args:
+        data (dict): The embed payload.
+
+    Returns:
+        EmbedSnapshot: The snapshot.
+    """
+    colour = data.get("color")
+    return EmbedSnapshot(
+        type=data.get("type"),
+        title=data.get("title"),
+        description=data.get("description"),
+        url=data.get("url"),
+        colour=ColourSnapshot(colour) if colour is not None else None,
+        timestamp=parse_time(data.get("timestamp")),
+        fields=[
+            EmbedFieldSnapshot(
+                field.get("name"), field.get("value"), bool(field.get("inline"))
+            )
+            for field in data.get("fields") or ()
+        ],
+        author=_proxy(data.get("author")),
+        footer=_proxy(data.get("footer")),
+        image=_proxy(data.get("image")),
+        thumbnail=_proxy(data.get("thumbnail")),
+        video=_proxy(data.get("video")),
+        provider=_proxy(data.get("provider")),
+    )
+
+
+def component_from_payload(data: dict) -> ComponentSnapshot | None:
+    """Takes a snapshot of a component payload.
+
+    Args:
+        data (dict): The component payload.
+
+    Returns:
+        Optional[ComponentSnapshot]: The snapshot, or None for components the
+            renderer does not know.
+    """
+    kind = COMPONENT_TYPES.get(data.get("type"))
+    if kind is None:
+        return None
+
+    fields: dict[str, Any] = {}
+    if kind == "button":
+        fields = {
+            "url": data.get("url"),
+            "label": data.get("label"),
+            "style": f"ButtonStyle.{BUTTON_STYLES.get(data.get('style'), 'secondary')}",
+            "emoji": emoji_text(data.get("emoji")),
+            "disabled": bool(data.get("disabled")),
+        }
+    elif kind == "select":
+        fields = {
+            "placeholder": data.get("placeholder"),
+            "options": [
+                SelectOptionSnapshot(
+                    str(option.get("label")),
+                    option.get("description"),
+                    emoji_text(option.get("emoji")),
+                )
+                for option in data.get("options") or ()
+            ],
+            "disabled": bool(data.get("disabled")),
+        }
+    elif kind == "text_display":
+        fields = {"content": str(data.get("content") or "")}
+    elif kind == "thumbnail":
+        fields = {"media_url": (data.get("media") or {}).get("url")}
+    elif kind == "container":
+        colour = data.get("accent_color")
+        fields = {
+            "accent_color": str(ColourSnapshot(colour)) if colour is not None else None
+        }
+
+    accessory = data.get("accessory")
+    return ComponentSnapshot(
+        kind,
+        children=[
+            child
+            for child in map(component_from_payload, data.get("components") or ())
+            if child is not None
+        ],
+        accessory=component_from_payload(accessory) if accessory else None,
+        **fields,
+    )
+
+
+def _interaction(data: dict | None) -> InteractionSnapshot | None:
+    if not data or not data.get("user"):
+        return None
+    return InteractionSnapshot(
+        int(data["id"]), data.get("name"), user_from_payload(data["user"])
+    )
+
+
+def message_from_payload(
+    data: dict, channel: ChannelSnapshot | None = None
+) -> MessageSnapshot:
+    """Takes a snapshot of a message payload.
+
+    Archived messages are often kept as the JSON the API returns, such as the
+    output of ``GET /channels/{channel.id}/messages``. Their snapshots render
+    without a client.
+
+    Args:
+        data (dict): The message payload.
+        channel (Optional[ChannelSnapshot]): The channel of the message. Defaults to
+            a channel known only by the ``channel_id`` of the payload.
+
+    Returns:
+        MessageSnapshot: The snapshot.
+    """
+    if channel is None:
+        channel = ChannelSnapshot(_id(data.get("channel_id")), "", "text")
+    reference = data.get("message_reference")
+    return MessageSnapshot(
+        id=int(data["id"]),
+        type_value=data.get("type", 0),
+        content=data.get("content") or "",
+        created_at=parse_time(data.get("timestamp"))
+        or discord.utils.snowflake_time(int(data["id"])),
+        edited_at=parse_time(data.get("edited_timestamp")),
+        author=user_from_payload(data["author"], data.get("member")),
+        channel=channel,
+        reference=ReferenceSnapshot(
+            _id(reference.get("message_id")), _id(reference.get("channel_id"))
+        )
+        if reference
+        else None,
+        mentions=[user_from_payload(user) for user in data.get("mentions") or ()],
+        attachments=[
+            AttachmentSnapshot(
+                _id(attachment.get("id")),
+                attachment["filename"],
+                attachment.get("size", 0),
+                attachment["url"],
+                attachment.get("proxy_url") or attachment["url"],
+                attachment.get("content_type"),
+            )
+            for attachment in data.get("attachments") or ()
+        ],
+        embeds=[embed_from_payload(embed) for embed in data.get("embeds") or ()],
+        stickers=[
+            StickerSnapshot(
+                f"{CDN}/stickers/{sticker['id']}."
+                f"{STICKER_EXTENSIONS.get(sticker.get('format_type'), 'png')}"
+            )
+            for sticker in data.get("sticker_items") or ()
+        ],
+        reactions=[
+            ReactionSnapshot(emoji_text(reaction.get("emoji")) or "", reaction["count"])
+            for reaction in data.get("reactions") or ()
+        ],
+        components=[
+            component
+            for component in map(component_from_payload, data.get("components") or ())
+            if component is not None
+        ],
+        interaction=_interaction(data.get("interaction")),
+        interaction_metadata=_interaction(data.get("interaction_metadata")),
+        webhook_id=_id(data.get("webhook_id")),
+    )
@@ -0,0 +1,119 @@
+import asyncio
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from DiscordTranscript.ext.cache_backend import CacheBackend, DictCache
+
+if TYPE_CHECKING:
+    import discord as discord_typings
+
+
+class ReferenceIndex:
+    """The messages replied to from outside the exported messages.
+
+    Fetched messages are kept in ``store``, as are the messages Discord reports
+    as deleted (stored as None), so a cache shared across exports skips them on
+    re-exports and in other channels. Other errors are not remembered.
+
+    Attributes:
+        store (CacheBackend): Where the fetched messages are kept.
+        limit (int): The largest number of messages fetched at once.
+    """
+
+    def __init__(self, store: CacheBackend | None = None, limit: int = 8):
+        """Initializes the ReferenceIndex.
+
+        Args:
+            store (Optional[CacheBackend]): Where to keep the fetched messages, such as
+                the cache of the export. Defaults to a private cache.
+            limit (int): The largest number of messages fetched at once. Defaults to 8.
+        """
+        self.store = store if store is not None else DictCache()
+        self.limit = max(limit, 1)
+
+    @staticmethod
+    def _key(channel, message_id: int) -> str:
+        return f"{__name__}:{getattr(channel, 'id', None)}:{message_id}"
+
+    def remember(self, channel, message: "discord_typings.Message"):
+        """Stores a message that is already known, so it is never fetched.
+
+        Args:
+            channel (discord.abc.Messageable): The channel the message is in.
+            message (discord.Message): The message.
+        """
+        self.store.set(self._key(channel, message.id), message)
+
+    def peek(self, channel, message_id: int) -> "discord_typings.Message | None":
+        """Looks a message up without fetching it.
+
+        Args:
+            channel (discord.abc.Messageable): The channel the message is in.
+            message_id (int): The ID of the message.
+
+        Returns:
+            Optional[discord.Message]: The message, or None if it was deleted or is
+                not known yet.
+        """
+        try:
+            return self.store.get(self._key(channel, message_id))
+        except KeyError:
+            return None
+
+    async def get(self, channel, message_id: int) -> "discord_typings.Message | None":
+        """Returns a message of a channel, fetching it if it is not known yet.
+
+        Args:
+            channel (discord.abc.Messageable): The channel the message is in.
+            message_id (int): The ID of the message.
+
+        Returns:
+            Optional[discord.Message]: The message, or None if it was deleted.
+
+        Raises:
+            Exception: Any error of ``fetch_message`` other than ``NotFound``.
+        """
+        key = self._key(channel, message_id)
+        try:
+            return self.store.get(key)
+        except KeyError:
+            pass
+
+        try:
+            message = await channel.fetch_message(message_id)
+        except Exception as e:
+            if type(e).__name__ != "NotFound":
+                raise
+            message = None
+        self.store.set(key, message)
+        return message
+
+    async def resolve(self, references: Iterable[tuple[object, int]]):
+        """Fetches the messages that are not known yet, ``limit`` at a time.
+
+        Errors are ignored here; the affected messages are fetched again by
+        `get`.
+
+        Args:
+            references (Iterable[Tuple[discord.abc.Messageable, int]]): The channels
+                and IDs of the messages.
+        """
+        semaphore = asyncio.Semaphore(self.limit)
+
+        async def fetch(channel, message_id: int):
+            async with semaphore:
+                try:
+                    await self.get(channel, message_id)
+                except Exception:
+                    pass
+
+        pending = {}
+        for channel, message_id in references:
+            key = self._key(channel, message_id)
+            if key in pending:
+                continue
+            try:
+                self.store.get(key)
+            except KeyError:
+                pending[key] = fetch(channel, message_id)
+        await asyncio.gather(*pending.values())
@@ -0,0 +1,996 @@
+import datetime
+from types import SimpleNamespace
+from typing import TYPE_CHECKING, Any, ClassVar
+
+from DiscordTranscript.ext.discord_import import discord
+
+if TYPE_CHECKING:
+    import discord as discord_typings
+
+# The component classes the renderer tells apart, in the order it checks them.
+COMPONENT_KINDS = (
+    ("Button", "button"),
+    ("SelectMenu", "select"),
+    ("SectionComponent", "section"),
+    ("TextDisplay", "text_display"),
+    ("ThumbnailComponent", "thumbnail"),
+    ("SeparatorComponent", "separator"),
+    ("Container", "container"),
+    ("ActionRow", "action_row"),
+)
+
+
+class NotFound(Exception):  # noqa: N818 - matched by name, like discord.NotFound
+    """Raised when a message is looked up in a snapshot of a channel."""
+
+
+def component_kind(component) -> str | None:
+    """Tells which kind of component an object is.
+
+    Args:
+        component (discord.Component | ComponentSnapshot): The component.
+
+    Returns:
+        Optional[str]: The kind, such as ``"button"`` or ``"action_row"``, or None
+            for components the renderer does not know.
+    """
+    if isinstance(component, ComponentSnapshot):
+        return component.kind
+    for class_name, kind in COMPONENT_KINDS:
+        cls = getattr(discord, class_name, None)
+        if cls is not None and isinstance(component, cls):
+            return kind
+    return None
+
+
+def _str_or_none(value: Any) -> str | None:
+    return str(value) if value else None
+
+
+def _int_or_none(value: Any) -> int | None:
+    return value if isinstance(value, int) else None
+
+
+def _enum_value(value: Any) -> int | None:
+    return _int_or_none(getattr(value, "value", value))
+
+
+def _set_or_none(value: Any) -> Any:
+    """Returns None for the ``Embed.Empty`` sentinel of older libraries."""
+    empty = getattr(discord.Embed, "Empty", None)
+    if value is None or (empty is not None and value is empty):
+        return None
+    return value
+
+
+def _dump(value: Any) -> Any:
+    if isinstance(value, Snapshot):
+        return value.to_dict()
+    if isinstance(value, tuple):
+        return [_dump(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _dump(item) for key, item in value.items()}
+    if isinstance(value, datetime.datetime):
+        return value.isoformat()
+    return value
+
+
+def _load(kind: str, value: Any) -> Any:
+    if value is None:
+        return None
+    if kind == "datetime":
+        return datetime.datetime.fromisoformat(value)
+    return globals()[kind].from_dict(value)
+
+
+class Snapshot:
+    """The base of the snapshot classes.
+
+    A snapshot holds the parts of a Discord object that the renderers read, as
+    plain values in ``__slots__``. It has no connection state, so it can be
+    pickled, sent to another process or kept in a cache, and renders the same
+    whichever library (discord.py, nextcord or disnake) it was taken from.
+
+    Snapshots are immutable: each attribute is set once, when the snapshot is
+    created, and `replace` returns a changed copy.
+    """
+
+    __slots__ = ()
+
+    # The fields holding snapshots or datetimes, by the name of their type. A list
+    # of one name marks a tuple of them, and {"values": name} a dict of them keyed
+    # by ID.
+    _types: ClassVar[dict[str, Any]] = {}
+
+    def __setattr__(self, name: str, value: Any):
+        try:
+            getattr(self, name)
+        except AttributeError:
+            object.__setattr__(self, name, value)
+            return
+        raise AttributeError(f"{type(self).__name__}.{name} cannot be changed")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__}.{name} cannot be deleted")
+
+    @classmethod
+    def field_names(cls) -> tuple[str, ...]:
+        """Returns the names of the snapshot's fields, in order.
+
+        Returns:
+            Tuple[str, ...]: The names.
+        """
+        return tuple(
+            name
+            for klass in reversed(cls.__mro__)
+            for name in getattr(klass, "__slots__", ())
+        )
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self.field_names()
+        )
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        values = ", ".join(
+            f"{name}={getattr(self, name)!r}" for name in self.field_names()
+        )
+        return f"{type(self).__name__}({values})"
+
+    def replace(self, **changes):
+        """Returns a copy of the snapshot with some fields changed.
+
+        Args:
+            **changes: The new values, keyed by field name.
+
+        Returns:
+            Snapshot: The copy.
+        """
+        values = {name: getattr(self, name) for name in self.field_names()}
+        values.update(changes)
+        return type(self)(**values)
+
+    def to_dict(self) -> dict:
+        """Returns the snapshot as JSON-compatible values.
+
+        Returns:
+            dict: The fields of the snapshot, with nested snapshots as dicts and
+                datetimes in ISO 8601 format.
+        """
+        return {name: _dump(getattr(self, name)) for name in self.field_names()}
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Creates a snapshot from the output of `to_dict`.
+
+        Args:
+            data (dict): The fields of the snapshot. Missing fields are None.
+
+        Returns:
+            Snapshot: The snapshot.
+        """
+        values = {}
+        for name in cls.field_names():
+            value = data.get(name)
+            kind = cls._types.get(name)
+            if isinstance(kind, list):
+                value = tuple(_load(kind[0], item) for item in value or ())
+            elif isinstance(kind, dict):
+                value = {
+                    int(key): _load(kind["values"], item)
+                    for key, item in (value or {}).items()
+                }
+            elif kind is not None:
+                value = _load(kind, value)
+            values[name] = value
+        return cls(**values)
+
+
+class ColourSnapshot(Snapshot):
+    """A colour, as read by the renderers."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: int):
+        self.value = value
+
+    @property
+    def r(self) -> int:
+        return (self.value >> 16) & 0xFF
+
+    @property
+    def g(self) -> int:
+        return (self.value >> 8) & 0xFF
+
+    @property
+    def b(self) -> int:
+        return self.value & 0xFF
+
+    def __str__(self) -> str:
+        return f"#{self.value:06x}"
+
+    @classmethod
+    def of(cls, colour) -> "ColourSnapshot":
+        if isinstance(colour, cls):
+            return colour
+        value = getattr(colour, "value", colour)
+        return cls(value if isinstance(value, int) else 0)
+
+
+class RoleSnapshot(Snapshot):
+    """The parts of a role the renderers read."""
+
+    __slots__ = ("id", "name", "color", "icon")
+    _types = {"color": "ColourSnapshot"}
+
+    def __init__(
+        self, id: int, name: str, color: ColourSnapshot, icon: str | None = None
+    ):
+        self.id = id
+        self.name = name
+        self.color = color
+        self.icon = icon
+
+    @property
+    def colour(self) -> ColourSnapshot:
+        return self.color
+
+    @classmethod
+    def of(cls, role: "discord_typings.Role") -> "RoleSnapshot":
+        if isinstance(role, cls):
+            return role
+        return cls(
+            role.id,
+            str(role.name),
+            ColourSnapshot.of(getattr(role, "color", 0)),
+            _str_or_none(getattr(role, "icon", None)),
+        )
+
+
+class UserSnapshot(Snapshot):
+    """The parts of a user or member the renderers read."""
+
+    __slots__ = (
+        "id",
+        "name",
+        "discriminator",
+        "display_name",
+        "display_avatar",
+        "bot",
+        "verified_bot",
+        "created_at",
+        "joined_at",
+        "colour",
+        "display_icon",
+        "top_role",
+    )
+    _types = {
+        "created_at": "datetime",
+        "joined_at": "datetime",
+        "top_role": "RoleSnapshot",
+    }
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        discriminator: str,
+        display_name: str,
+        display_avatar: str | None,
+        bot: bool,
+        verified_bot: bool,
+        created_at: datetime.datetime | None,
+        joined_at: datetime.datetime | None = None,
+        colour: str | None = None,
+        display_icon: str | None = None,
+        top_role: RoleSnapshot | None = None,
+    ):
+        self.id = id
+        self.name = name
+        self.discriminator = discriminator
+        self.display_name = display_name
+        self.display_avatar = display_avatar
+        self.bot = bot
+        self.verified_bot = verified_bot
+        self.created_at = created_at
+        self.joined_at = joined_at
+        self.colour = colour
+        self.display_icon = display_icon
+        self.top_role = top_role
+
+    @property
+    def public_flags(self) -> SimpleNamespace:
+        return SimpleNamespace(verified_bot=self.verified_bot)
+
+    @classmethod
+    def of(cls, user) -> "UserSnapshot":
+        if isinstance(user, cls):
+            return user
+        top_role = getattr(user, "top_role", None)
+        return cls(
+            user.id,
+            str(user.name),
+            str(user.discriminator),
+            str(user.display_name),
+            _str_or_none(user.display_avatar),
+            bool(user.bot),
+            bool(getattr(getattr(user, "public_flags", None), "verified_bot", False)),
+            user.created_at,
+            getattr(user, "joined_at", None),
+            _str_or_none(getattr(user, "colour", None)),
+            _str_or_none(getattr(user, "display_icon", None)),
+            RoleSnapshot.of(top_role) if top_role is not None else None,
+        )
+
+
+class ChannelSnapshot(Snapshot):
+    """The parts of a channel the renderers read.
+
+    Messages cannot be fetched from a snapshot: `fetch_message` reports every
+    message as deleted.
+    """
+
+    __slots__ = ("id", "name", "type", "topic")
+
+    def __init__(self, id: int, name: str, type: str, topic: str | None = None):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.topic = topic
+
+    async def fetch_message(self, message_id: int):
+        raise NotFound(message_id)
+
+    @classmethod
+    def of(cls, channel) -> "ChannelSnapshot":
+        if isinstance(channel, cls):
+            return channel
+        return cls(
+            channel.id,
+            str(getattr(channel, "name", "")),
+            str(channel.type),
+            _str_or_none(getattr(channel, "topic", None)),
+        )
+
+
+class AttachmentSnapshot(Snapshot):
+    """The parts of an attachment the renderers read."""
+
+    __slots__ = ("id", "filename", "size", "url", "proxy_url", "content_type")
+
+    def __init__(
+        self,
+        id: int | None,
+        filename: str,
+        size: int,
+        url: str,
+        proxy_url: str,
+        content_type: str | None,
+    ):
+        self.id = id
+        self.filename = filename
+        self.size = size
+        self.url = url
+        self.proxy_url = proxy_url
+        self.content_type = content_type
+
+    @classmethod
+    def of(cls, attachment) -> "AttachmentSnapshot":
+        if isinstance(attachment, cls):
+            return attachment
+        return cls(
+            _int_or_none(getattr(attachment, "id", None)),
+            attachment.filename,
+            attachment.size,
+            attachment.url,
+            attachment.proxy_url,
+            attachment.content_type,
+        )
+
+
+class ReactionSnapshot(Snapshot):
+    """A reaction, with its emoji as the text the renderers read."""
+
+    __slots__ = ("emoji", "count")
+
+    def __init__(self, emoji: str, count: int):
+        self.emoji = emoji
+        self.count = count
+
+    @classmethod
+    def of(cls, reaction) -> "ReactionSnapshot":
+        if isinstance(reaction, cls):
+            return reaction
+        return cls(str(reaction.emoji), reaction.count)
+
+
+class StickerSnapshot(Snapshot):
+    """A sticker, with the URL of its image."""
+
+    __slots__ = ("url",)
+
+    def __init__(self, url: str):
+        self.url = url
+
+
+class InteractionSnapshot(Snapshot):
+    """The command a message answers."""
+
+    __slots__ = ("id", "name", "user")
+    _types = {"user": "UserSnapshot"}
+
+    def __init__(self, id: int, name: str | None, user: UserSnapshot):
+        self.id = id
+        self.name = name
+        self.user = user
+
+    @classmethod
+    def of(cls, interaction) -> "InteractionSnapshot | None":
+        if not interaction:
+            return None
+        if isinstance(interaction, cls):
+            return interaction
+        return cls(
+            interaction.id,
+            getattr(interaction, "name", None),
+            UserSnapshot.of(interaction.user),
+        )
+
+
+class ReferenceSnapshot(Snapshot):
+    """The message a message replies to."""
+
+    __slots__ = ("message_id", "channel_id")
+
+    def __init__(self, message_id: int | None, channel_id: int | None):
+        self.message_id = message_id
+        self.channel_id = channel_id
+
+
+class SelectOptionSnapshot(Snapshot):
+    """An option of a select menu."""
+
+    __slots__ = ("label", "description", "emoji")
+
+    def __init__(self, label: str, description: str | None, emoji: str | None):
+        self.label = label
+        self.description = description
+        self.emoji = emoji
+
+
+class ComponentSnapshot(Snapshot):
+    """A message component and its children.
+
+    Only the fields of its kind are set; the others are None.
+
+    Attributes:
+        kind (str): The kind of component, as returned by `component_kind`.
+    """
+
+    __slots__ = (
+        "kind",
+        "children",
+        "accessory",
+        "url",
+        "label",
+        "style",
+        "emoji",
+        "disabled",
+        "placeholder",
+        "options",
+        "content",
+        "media_url",
+        "accent_color",
+    )
+    _types = {
+        "children": ["ComponentSnapshot"],
+        "accessory": "ComponentSnapshot",
+        "options": ["SelectOptionSnapshot"],
+    }
+
+    def __init__(
+        self,
+        kind: str,
+        children: tuple["ComponentSnapshot", ...] | list | None = None,
+        accessory: "ComponentSnapshot | None" = None,
+        url: str | None = None,
+        label: str | None = None,
+        style: str | None = None,
+        emoji: str | None = None,
+        disabled: bool | None = None,
+        placeholder: str | None = None,
+        options: tuple[SelectOptionSnapshot, ...] | list | None = None,
+        content: str | None = None,
+        media_url: str | None = None,
+        accent_color: str | None = None,
+    ):
+        self.kind = kind
+        self.children = tuple(children or ())
+        self.accessory = accessory
+        self.url = url
+        self.label = label
+        self.style = style
+        self.emoji = emoji
+        self.disabled = disabled
+        self.placeholder = placeholder
+        self.options = tuple(options or ())
+        self.content = content
+        self.media_url = media_url
+        self.accent_color = accent_color
+
+    @property
+    def media(self) -> SimpleNamespace:
+        return SimpleNamespace(url=self.media_url)
+
+    @classmethod
+    def of(cls, component) -> "ComponentSnapshot | None":
+        if isinstance(component, cls):
+            return component
+        kind = component_kind(component)
+        if kind is None:
+            return None
+
+        fields: dict[str, Any] = {}
+        if kind == "button":
+            fields = {
+                "url": _str_or_none(component.url),
+                "label": _str_or_none(component.label),
+                "style": str(component.style),
+                "emoji": _str_or_none(component.emoji),
+                "disabled": bool(component.disabled),
+            }
+        elif kind == "select":
+            fields = {
+                "placeholder": component.placeholder,
+                "options": [
+                    SelectOptionSnapshot(
+                        str(option.label),
+                        _str_or_none(option.description),
+                        _str_or_none(option.emoji),
+                    )
+                    for option in component.options
+                ],
+                "disabled": bool(component.disabled),
+            }
+        elif kind == "text_display":
+            fields = {"content": str(component.content)}
+        elif kind == "thumbnail":
+            fields = {"media_url": str(component.media.url)}
+        elif kind == "container":
+            fields = {"accent_color": _str_or_none(component.accent_color)}
+
+        accessory = getattr(component, "accessory", None)
+        return cls(
+            kind,
+            children=[
+                child
+                for child in map(cls.of, getattr(component, "children", None) or [])
+                if child is not None
+            ],
+            accessory=cls.of(accessory) if accessory is not None else None,
+            **fields,
+        )
+
+
+class EmbedProxySnapshot(Snapshot):
+    """The author, footer, image, thumbnail, video or provider of an embed.
+
+    Only the fields of its part are set; the others are None.
+    """
+
+    __slots__ = (
+        "name",
+        "text",
+        "url",
+        "proxy_url",
+        "icon_url",
+        "width",
+        "height",
+    )
+
+    def __init__(
+        self,
+        name: str | None = None,
+        text: str | None = None,
+        url: str | None = None,
+        proxy_url: str | None = None,
+        icon_url: str | None = None,
+        width: int | None = None,
+        height: int | None = None,
+    ):
+        self.name = name
+        self.text = text
+        self.url = url
+        self.proxy_url = proxy_url
+        self.icon_url = icon_url
+        self.width = width
+        self.height = height
+
+    @classmethod
+    def of(cls, proxy) -> "EmbedProxySnapshot | None":
+        """Takes a snapshot of a part of an embed.
+
+        Args:
+            proxy (discord.embeds.EmbedProxy): The part, which is falsy when the
+                embed does not have it.
+
+        Returns:
+            Optional[EmbedProxySnapshot]: The snapshot, or None if the part is not set.
+        """
+        if not proxy:
+            return None
+        if isinstance(proxy, cls):
+            return proxy
+        return cls(
+            **{name: _set_or_none(getattr(proxy, name, None)) for name in cls.__slots__}
+        )
+
+
+class EmbedFieldSnapshot(Snapshot):
+    """A field of an embed."""
+
+    __slots__ = ("name", "value", "inline")
+
+    def __init__(self, name: str | None, value: str | None, inline: bool):
+        self.name = name
+        self.value = value
+        self.inline = inline
+
+
+class EmbedSnapshot(Snapshot):
+    """The parts of an embed the renderers read.
+
+    Fields an embed leaves unset are None, including the ``Embed.Empty`` values of
+    older libraries.
+    """
+
+    __slots__ = (
+        "type",
+        "title",
+        "description",
+        "url",
+        "colour",
+        "timestamp",
+        "fields",
+        "author",
+        "footer",
+        "image",
+        "thumbnail",
+        "video",
+        "provider",
+    )
+    _types = {
+        "colour": "ColourSnapshot",
+        "timestamp": "datetime",
+        "fields": ["EmbedFieldSnapshot"],
+        "author": "EmbedProxySnapshot",
+        "footer": "EmbedProxySnapshot",
+        "image": "EmbedProxySnapshot",
+        "thumbnail": "EmbedProxySnapshot",
+        "video": "EmbedProxySnapshot",
+        "provider": "EmbedProxySnapshot",
+    }
+
+    def __init__(
+        self,
+        type: str | None = None,
+        title: str | None = None,
+        description: str | None = None,
+        url: str | None = None,
+        colour: ColourSnapshot | None = None,
+        timestamp: datetime.datetime | None = None,
+        fields: tuple[EmbedFieldSnapshot, ...] | list | None = None,
+        author: EmbedProxySnapshot | None = None,
+        footer: EmbedProxySnapshot | None = None,
+        image: EmbedProxySnapshot | None = None,
+        thumbnail: EmbedProxySnapshot | None = None,
+        video: EmbedProxySnapshot | None = None,
+        provider: EmbedProxySnapshot | None = None,
+    ):
+        self.type = type
+        self.title = title
+        self.description = description
+        self.url = url
+        self.colour = colour
+        self.timestamp = timestamp
+        self.fields = tuple(fields or ())
+        self.author = author
+        self.footer = footer
+        self.image = image
+        self.thumbnail = thumbnail
+        self.video = video
+        self.provider = provider
+
+    @property
+    def color(self) -> ColourSnapshot | None:
+        return self.colour
+
+    @classmethod
+    def of(cls, embed: "discord_typings.Embed") -> "EmbedSnapshot":
+        if isinstance(embed, cls):
+            return embed
+        colour = _set_or_none(getattr(embed, "colour", None))
+        return cls(
+            type=_set_or_none(getattr(embed, "type", None)),
+            title=_set_or_none(getattr(embed, "title", None)),
+            description=_set_or_none(getattr(embed, "description", None)),
+            url=_set_or_none(getattr(embed, "url", None)),
+            colour=ColourSnapshot.of(colour) if colour else None,
+            timestamp=_set_or_none(getattr(embed, "timestamp", None)),
+            fields=[
+                EmbedFieldSnapshot(
+                    _set_or_none(field.name),
+                    _set_or_none(field.value),
+                    bool(field.inline),
+                )
+                for field in getattr(embed, "fields", None) or ()
+            ],
+            **{
+                name: EmbedProxySnapshot.of(getattr(embed, name, None))
+                for name in (
+                    "author",
+                    "footer",
+                    "image",
+                    "thumbnail",
+                    "video",
+                    "provider",
+                )
+            },
+        )
+
+
+class MessageSnapshot(Snapshot):
+    """The parts of a message the renderers read.
+
+    Unlike a ``discord.Message``, a snapshot holds no connection state, so it can
+    be pickled and rendered in another process, and rendering it leaves it as it
+    was.
+    """
+
+    __slots__ = (
+        "id",
+        "type_value",
+        "content",
+        "created_at",
+        "edited_at",
+        "author",
+        "channel",
+        "reference",
+        "mentions",
+        "attachments",
+        "embeds",
+        "stickers",
+        "reactions",
+        "components",
+        "interaction",
+        "interaction_metadata",
+        "webhook_id",
+    )
+    _types = {
+        "created_at": "datetime",
+        "edited_at": "datetime",
+        "author": "UserSnapshot",
+        "channel": "ChannelSnapshot",
+        "reference": "ReferenceSnapshot",
+        "mentions": ["UserSnapshot"],
+        "attachments": ["AttachmentSnapshot"],
+        "embeds": ["EmbedSnapshot"],
+        "stickers": ["StickerSnapshot"],
+        "reactions": ["ReactionSnapshot"],
+        "components": ["ComponentSnapshot"],
+        "interaction": "InteractionSnapshot",
+        "interaction_metadata": "InteractionSnapshot",
+    }
+
+    def __init__(
+        self,
+        id: int,
+        type_value: int | None,
+        content: str,
+        created_at: datetime.datetime,
+        edited_at: datetime.datetime | None,
+        author: UserSnapshot,
+        channel: ChannelSnapshot,
+        reference: ReferenceSnapshot | None = None,
+        mentions: tuple[UserSnapshot, ...] | list | None = None,
+        attachments: tuple[AttachmentSnapshot, ...] | list | None = None,
+        embeds: tuple[EmbedSnapshot, ...] | list | None = None,
+        stickers: tuple[StickerSnapshot, ...] | list | None = None,
+        reactions: tuple[ReactionSnapshot, ...] | list | None = None,
+        components: tuple[ComponentSnapshot, ...] | list | None = None,
+        interaction: InteractionSnapshot | None = None,
+        interaction_metadata: InteractionSnapshot | None = None,
+        webhook_id: int | None = None,
+    ):
+        self.id = id
+        self.type_value = type_value
+        self.content = content
+        self.created_at = created_at
+        self.edited_at = edited_at
+        self.author = author
+        self.channel = channel
+        self.reference = reference
+        self.mentions = tuple(mentions or ())
+        self.attachments = tuple(attachments or ())
+        self.embeds = tuple(embeds or ())
+        self.stickers = tuple(stickers or ())
+        self.reactions = tuple(reactions or ())
+        self.components = tuple(components or ())
+        self.interaction = interaction
+        self.interaction_metadata = interaction_metadata
+        self.webhook_id = webhook_id
+
+    @property
+    def type(self):
+        """discord.MessageType: The type of the message."""
+        try:
+            return discord.MessageType(self.type_value)
+        except (TypeError, ValueError):
+            return self.type_value
+
+    @classmethod
+    def of(
+        cls,
+        message: "discord_typings.Message",
+        attachments: list | None = None,
+        stickers: list[StickerSnapshot] | None = None,
+    ) -> "MessageSnapshot":
+        """Takes a snapshot of a message.
+
+        Args:
+            message (discord.Message): The message, from discord.py, nextcord or
+                disnake. A snapshot is returned as is.
+            attachments (Optional[list]): The attachments to keep instead of the
+                message's own, such as the output of an attachment handler.
+            stickers (Optional[List[StickerSnapshot]]): The stickers to keep instead
+                of the message's own.
+
+        Returns:
+            MessageSnapshot: The snapshot.
+        """
+        if isinstance(message, cls) and attachments is None and stickers is None:
+            return message
+        reference = message.reference
+        mentions = getattr(message, "mentions", None)
+        return cls(
+            id=message.id,
+            type_value=message.type_value
+            if isinstance(message, cls)
+            else _enum_value(message.type),
+            content=message.content,
+            created_at=message.created_at,
+            edited_at=message.edited_at,
+            author=UserSnapshot.of(message.author),
+            channel=ChannelSnapshot.of(message.channel),
+            reference=ReferenceSnapshot(
+                reference.message_id, getattr(reference, "channel_id", None)
+            )
+            if reference
+            else None,
+            mentions=[UserSnapshot.of(user) for user in mentions]
+            if isinstance(mentions, (list, tuple))
+            else [],
+            attachments=[
+                AttachmentSnapshot.of(attachment)
+                for attachment in (
+                    message.attachments if attachments is None else attachments
+                )
+            ],
+            embeds=[EmbedSnapshot.of(embed) for embed in message.embeds],
+            stickers=stickers
+            if stickers is not None
+            else [
+                StickerSnapshot(str(sticker.url))
+                for sticker in message.stickers
+                if hasattr(sticker, "url")
+            ],
+            reactions=[ReactionSnapshot.of(reaction) for reaction in message.reactions],
+            components=[
+                component
+                for component in map(ComponentSnapshot.of, message.components)
+                if component is not None
+            ],
+            interaction=InteractionSnapshot.of(getattr(message, "interaction", None)),
+            interaction_metadata=InteractionSnapshot.of(
+                getattr(message, "interaction_metadata", None)
+            ),
+            webhook_id=_int_or_none(getattr(message, "webhook_id", None)),
+        )
+
+
+class GuildSnapshot(Snapshot):
+    """A guild with the members, roles and channels a transcript refers to.
+
+    Only the members resolved when the snapshot was taken are known; there is
+    nothing to fetch or query.
+    """
+
+    __slots__ = ("id", "name", "icon", "members", "roles", "channels")
+    _types = {
+        "members": {"values": "UserSnapshot"},
+        "roles": {"values": "RoleSnapshot"},
+        "channels": {"values": "ChannelSnapshot"},
+    }
+
+    def __init__(
+        self,
+        id: int,
+        name: str,
+        icon: str | None,
+        members: dict[int, UserSnapshot] | None = None,
+        roles: dict[int, RoleSnapshot] | None = None,
+        channels: dict[int, ChannelSnapshot] | None = None,
+    ):
+        self.id = id
+        self.name = name
+        self.icon = icon
+        self.members = members or {}
+        self.roles = roles or {}
+        self.channels = channels or {}
+
+    def get_member(self, user_id: int) -> UserSnapshot | None:
+        return self.members.get(user_id)
+
+    def get_role(self, role_id: int) -> RoleSnapshot | None:
+        return self.roles.get(role_id)
+
+    def get_channel(self, channel_id: int) -> ChannelSnapshot | None:
+        return self.channels.get(channel_id)
+
+    async def fetch_member(self, user_id: int):
+        return None
+
+    async def query_members(self, user_ids: list[int], limit: int = 0) -> list:
+        return []
+
+    async def fetch_channel(self, channel_id: int):
+        raise NotFound(channel_id)
+
+    @classmethod
+    def of(cls, guild, members: dict) -> "GuildSnapshot":
+        """Takes a snapshot of a guild.
+
+        Args:
+            guild (discord.Guild): The guild.
+            members (dict): The members to keep, keyed by user ID.
+
+        Returns:
+            GuildSnapshot: The snapshot.
+        """
+        return cls(
+            guild.id,
+            str(guild.name),
+            _str_or_none(guild.icon),
+            {
+                user_id: UserSnapshot.of(member)
+                for user_id, member in members.items()
+                if member is not None
+            },
+            {role.id: RoleSnapshot.of(role) for role in _listed(guild, "roles")},
+            {
+                channel.id: ChannelSnapshot.of(channel)
+                for channel in _listed(guild, "channels")
+            },
+        )
+
+
+class ClientSnapshot(Snapshot):
+    """The users a transcript mentions who are not members of the guild."""
+
+    __slots__ = ("users",)
+    _types = {"users": {"values": "UserSnapshot"}}
+
+    def __init__(self, users: dict[int, UserSnapshot] | None = None):
+        self.users = users or {}
+
+    def get_user(self, user_id: int) -> UserSnapshot | None:
+        return self.users.get(user_id)
+
+
+def _listed(guild, name: str) -> list:
+    values = getattr(guild, name, None)
+    return list(values) if isinstance(values, (list, tuple)) else []
@@ -0,0 +1,183 @@
+import contextlib
+from functools import wraps
+import heapq
+import time
+
+from DiscordTranscript.ext.context import ExportContext
+
+
+class StageStats:
+    """The totals of one stage of an export.
+
+    Stage times are inclusive: a stage that calls another counts the inner
+    stage's time too. With ``concurrency`` above 1, the times of overlapping
+    calls are summed and can exceed the wall time of the export.
+
+    Attributes:
+        calls (int): How many times the stage ran.
+        seconds (float): The total wall time spent in the stage.
+        bytes (int): The total length, in characters, of the text the stage produced.
+    """
+
+    __slots__ = ("bytes", "calls", "seconds")
+
+    def __init__(self):
+        """Initializes the StageStats."""
+        self.calls = 0
+        self.seconds = 0.0
+        self.bytes = 0
+
+    def as_dict(self) -> dict:
+        """Returns the totals as a dictionary.
+
+        Returns:
+            dict: The ``calls``, ``seconds`` and ``bytes`` of the stage.
+        """
+        return {"calls": self.calls, "seconds": self.seconds, "bytes": self.bytes}
+
+    def __repr__(self) -> str:
+        return f"<StageStats calls={self.calls} seconds={self.seconds:.4f} bytes={self.bytes}>"
+
+
+class ExportStats:
+    """Per-stage timings of an export, collected when profiling is enabled.
+
+    Attributes:
+        stages (dict): The totals of each stage, keyed by stage name.
+        slowest (int): How many of the slowest messages are kept.
+    """
+
+    def __init__(self, slowest: int = 10):
+        """Initializes the ExportStats.
+
+        Args:
+            slowest (int): How many of the slowest messages to keep. Defaults to 10.
+        """
+        self.stages: dict[str, StageStats] = {}
+        self.slowest = slowest
+        self._slowest_messages: list[tuple[float, int]] = []
+
+    def record(self, stage: str, seconds: float, produced: int = 0):
+        """Adds one run of a stage.
+
+        Args:
+            stage (str): The name of the stage.
+            seconds (float): The wall time of the run.
+            produced (int): The length of the text the run produced. Defaults to 0.
+        """
+        totals = self.stages.get(stage)
+        if totals is None:
+            totals = self.stages[stage] = StageStats()
+        totals.calls += 1
+        totals.seconds += seconds
+        totals.bytes += produced
+
+    def record_message(self, message_id: int, seconds: float):
+        """Adds the render time of a message.
+
+        Args:
+            message_id (int): The ID of the message.
+            seconds (float): The time spent rendering the message.
+        """
+        if self.slowest <= 0:
+            return
+        entry = (seconds, message_id)
+        if len(self._slowest_messages) < self.slowest:
+            heapq.heappush(self._slowest_messages, entry)
+        else:
+            heapq.heappushpop(self._slowest_messages, entry)
+
+    @property
+    def slowest_messages(self) -> list[tuple[int, float]]:
+        """List[Tuple[int, float]]: The slowest messages as ``(message_id, seconds)``, slowest first."""
+        return [
+            (message_id, seconds)
+            for seconds, message_id in sorted(self._slowest_messages, reverse=True)
+        ]
+
+    @contextlib.contextmanager
+    def measure(self, stage: str):
+        """Times the enclosed block as one run of a stage.
+
+        Args:
+            stage (str): The name of the stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def as_dict(self) -> dict:
+        """Returns the collected timings as plain data.
+
+        Returns:
+            dict: The ``stages`` totals and the ``slowest_messages``.
+        """
+        return {
+            "stages": {name: totals.as_dict() for name, totals in self.stages.items()},
+            "slowest_messages": [
+                {"message_id": message_id, "seconds": seconds}
+                for message_id, seconds in self.slowest_messages
+            ],
+        }
+
+    def __repr__(self) -> str:
+        return f"<ExportStats stages={self.stages!r}>"
+
+
+def current_stats() -> ExportStats | None:
+    """Returns the stats of the export running in the current task.
+
+    Returns:
+        Optional[ExportStats]: The stats, or None outside an export or when the
+            export is not profiled.
+    """
+    context = ExportContext.current()
+    return None if context is None else context.stats
+
+
+def stage_timer(stage: str):
+    """Times the enclosed block as one run of a stage of the current export.
+
+    Does nothing when the export is not profiled.
+
+    Args:
+        stage (str): The name of the stage.
+
+    Returns:
+        ContextManager: The timer.
+    """
+    stats = current_stats()
+    return contextlib.nullcontext() if stats is None else stats.measure(stage)
+
+
+def timed(stage: str):
+    """A decorator to time a coroutine function as a stage of the current export.
+
+    Calls made outside a profiled export are not timed. When the coroutine
+    returns a string, its length is counted as the bytes the stage produced.
+
+    Args:
+        stage (str): The name of the stage.
+    """
+
+    def decorator(func):
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            stats = current_stats()
+            if stats is None:
+                return await func(*args, **kwargs)
+
+            start = time.perf_counter()
+            result = await func(*args, **kwargs)
+            stats.record(
+                stage,
+                time.perf_counter() - start,
+                len(result) if isinstance(result, str) else 0,
+            )
+            return result
+
+        return wrapper
+
+    return decorator
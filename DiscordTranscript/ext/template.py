@@ -0,0 +1,111 @@
+import re
+
+PLACEHOLDER_PATTERN = re.compile(r"\{\{([A-Za-z0-9_]+)\}\}")
+
+_compiled_templates: dict[str, "Template"] = {}
+
+
+class Template:
+    """An HTML template pre-split into literal and placeholder segments.
+
+    Attributes:
+        source (str): The raw template text.
+        literals (list): The literal text between placeholders.
+        slots (list): The placeholder names, in order of appearance.
+    """
+
+    __slots__ = ("literals", "slots", "source")
+
+    def __init__(self, source: str):
+        """Initializes the Template.
+
+        Args:
+            source (str): The raw template text.
+        """
+        parts = PLACEHOLDER_PATTERN.split(source)
+        self.source = source
+        self.literals = parts[0::2]
+        self.slots = parts[1::2]
+
+    def partition(self, slot: str) -> tuple["Template", "Template"]:
+        """Splits the template around the first occurrence of a placeholder.
+
+        Args:
+            slot (str): The placeholder name to split on.
+
+        Returns:
+            Tuple[Template, Template]: The templates before and after the placeholder.
+
+        Raises:
+            ValueError: If the placeholder is not in the template.
+        """
+        index = self.slots.index(slot)
+        head = [self.literals[0]]
+        for i in range(index):
+            head.append("{{" + self.slots[i] + "}}")
+            head.append(self.literals[i + 1])
+        head_source = "".join(head)
+        tail_source = self.source[len(head_source) + len(slot) + 4 :]
+        return Template(head_source), Template(tail_source)
+
+    def render(self, values: dict[str, str]) -> str:
+        """Renders the template in a single pass.
+
+        Placeholders without a value are left untouched.
+
+        Args:
+            values (dict): The placeholder values, keyed by placeholder name.
+
+        Returns:
+            str: The rendered template.
+        """
+        return "".join(self.iter_render(values))
+
+    def iter_render(self, values: dict[str, str]):
+        """Yields the rendered template segment by segment.
+
+        Args:
+            values (dict): The placeholder values, keyed by placeholder name.
+
+        Yields:
+            str: The next rendered segment.
+        """
+        literals = self.literals
+        yield literals[0]
+        for index, slot in enumerate(self.slots, start=1):
+            value = values.get(slot)
+            yield "{{" + slot + "}}" if value is None else value
+            yield literals[index]
+
+
+def register_template(source: str) -> Template:
+    """Compiles a template and keeps it for later lookups.
+
+    Args:
+        source (str): The raw template text.
+
+    Returns:
+        Template: The compiled template.
+    """
+    template = _compiled_templates.get(source)
+    if template is None:
+        template = _compiled_templates[source] = Template(source)
+    return template
+
+
+def get_template(source: str) -> Template:
+    """Returns the compiled form of a template.
+
+    Templates registered at import time are looked up; any other string is
+    compiled on the fly without being kept.
+
+    Args:
+        source (str): The raw template text.
+
+    Returns:
+        Template: The compiled template.
+    """
+    template = _compiled_templates.get(source)
+    if template is None:
+        template = Template(source)
+    return template
@@ -0,0 +1,84 @@
+import asyncio
+import inspect
+import io
+import json
+
+
+class TranscriptWriter:
+    """Writes transcript chunks to a file-like object or an async writer.
+
+    Text streams receive ``str`` chunks; binary streams and
+    ``asyncio.StreamWriter`` receive UTF-8 encoded bytes. Awaitable results of
+    ``write`` (e.g. aiofiles) are awaited.
+
+    Attributes:
+        fp: The object the transcript is written to.
+        binary (bool): Whether ``fp`` expects bytes.
+        bytes_written (int): The number of encoded bytes written so far.
+    """
+
+    def __init__(self, fp):
+        """Initializes the TranscriptWriter.
+
+        Args:
+            fp: A writable text or binary stream, or an async writer.
+        """
+        self.fp = fp
+        self.binary = isinstance(
+            fp, (io.RawIOBase, io.BufferedIOBase, asyncio.StreamWriter)
+        ) or "b" in str(getattr(fp, "mode", ""))
+        self.bytes_written = 0
+
+    async def write(self, chunk: str):
+        """Writes a chunk of the transcript.
+
+        Args:
+            chunk (str): The HTML to write.
+        """
+        if not chunk:
+            return
+
+        data = chunk.encode("utf-8")
+        self.bytes_written += len(data)
+
+        result = self.fp.write(data if self.binary else chunk)
+        if inspect.isawaitable(result):
+            await result
+        if isinstance(self.fp, asyncio.StreamWriter):
+            await self.fp.drain()
+
+
+class RecordWriter:
+    """Writes the structured records of messages as NDJSON, one per line.
+
+    Attributes:
+        writer (TranscriptWriter): The writer the lines are written with.
+        count (int): The number of records written so far.
+    """
+
+    def __init__(self, fp):
+        """Initializes the RecordWriter.
+
+        Args:
+            fp: A writable text or binary stream, or an async writer.
+        """
+        self.writer = TranscriptWriter(fp)
+        self.count = 0
+
+    async def write(self, record: dict):
+        """Writes a record as a line of JSON.
+
+        Args:
+            record (dict): The record.
+        """
+        await self.write_lines(json.dumps(record, ensure_ascii=False) + "\n", 1)
+
+    async def write_lines(self, lines: str, count: int):
+        """Writes records already encoded as NDJSON, such as by another process.
+
+        Args:
+            lines (str): The lines, each ending with a newline.
+            count (int): How many records the lines hold.
+        """
+        await self.writer.write(lines)
+        self.count += count
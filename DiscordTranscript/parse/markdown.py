@@ -3,6 +3,7 @@ import re
 from typing import overload
 
 from DiscordTranscript.ext.emoji_convert import convert_emoji
+from DiscordTranscript.ext.stats import timed
 
 
 class ParseMarkdown:
@@ -70,9 +71,15 @@ class ParseMarkdown:
 
     def restore_links(self):
         """Restores the links from placeholders."""
-        for placeholder, tag in self.links_placeholders.items():
-            self.content = self.content.replace(placeholder, tag)
+        if not self.links_placeholders:
+            return
+        self.content = re.sub(
+            r"%LINK-(?:FULL|START|END)-\d+%",
+            lambda m: self.links_placeholders.get(m.group(0), m.group(0)),
+            self.content,
+        )
 
+    @timed("markdown")
     async def standard_message_flow(self):
         """The standard flow for parsing a message.
 
@@ -90,6 +97,7 @@ class ParseMarkdown:
         self.restore_links()
         return self.content
 
+    @timed("markdown")
     async def link_embed_flow(self):
         """The flow for parsing a link embed.
 
@@ -100,6 +108,7 @@ class ParseMarkdown:
         await self.parse_emoji()
         self.restore_links()
 
+    @timed("markdown")
     async def standard_embed_flow(self):
         """The standard flow for parsing an embed.
 
@@ -116,6 +125,7 @@ class ParseMarkdown:
         self.restore_links()
         return self.content
 
+    @timed("markdown")
     async def special_embed_flow(self):
         """The flow for parsing a special embed.
 
@@ -131,6 +141,7 @@ class ParseMarkdown:
         self.restore_links()
         return self.content
 
+    @timed("markdown")
     async def message_reference_flow(self):
         """The flow for parsing a message reference.
 
@@ -145,6 +156,7 @@ class ParseMarkdown:
 
         return self.content
 
+    @timed("markdown")
     async def special_emoji_flow(self):
         """The flow for parsing a special emoji.
 
@@ -183,27 +195,40 @@ class ParseMarkdown:
 
         for x in holder:
             p, r = x
-            match = re.search(p, self.content)
-            while match is not None:
-                emoji_id = match.group(1)
-                self.content = self.content.replace(
-                    self.content[match.start() : match.end()], r % emoji_id
-                )
-                match = re.search(p, self.content)
+            self.content = re.sub(p, lambda m: r % m.group(1), self.content)
 
     def strip_preserve(self):
         """Strips the preserve tags from the content."""
-        p = r'<div class="chatlog__markdown-preserve">(.*)</div>'
-        r = "%s"
+        start_tag = '<div class="chatlog__markdown-preserve">'
+        end_tag = "</div>"
+        if start_tag not in self.content:
+            return
 
-        pattern = re.compile(p)
-        match = re.search(pattern, self.content)
-        while match is not None:
-            affected_text = match.group(1)
-            self.content = self.content.replace(
-                self.content[match.start() : match.end()], r % affected_text
-            )
-            match = re.search(pattern, self.content)
+        lines = self.content.split("\n")
+        for index, line in enumerate(lines):
+            starts = [m.start() for m in re.finditer(re.escape(start_tag), line)]
+            ends = [m.start() for m in re.finditer(end_tag, line)]
+
+            # Each pass of the greedy pattern unwraps the first remaining start
+            # tag together with the last remaining end tag of the line.
+            cuts = []
+            for start, end in zip(starts, reversed(ends), strict=False):
+                if start + len(start_tag) > end:
+                    break
+                cuts.append((start, len(start_tag)))
+                cuts.append((end, len(end_tag)))
+            if not cuts:
+                continue
+
+            parts = []
+            position = 0
+            for cut, length in sorted(cuts):
+                parts.append(line[position:cut])
+                position = cut + length
+            parts.append(line[position:])
+            lines[index] = "".join(parts)
+
+        self.content = "\n".join(lines)
 
     def order_list_markdown_to_html(self):
         """Converts a markdown ordered list to HTML."""
@@ -398,75 +423,74 @@ class ParseMarkdown:
             "js",
             "html",
         ]
-        self.content = re.sub(r"\n", "<br>", self.content)
+        self.content = self.content.replace("\n", "<br>")
 
-        pattern = re.compile(r"```(.*?)```")
-        match = re.search(pattern, self.content)
-        while match is not None:
-            language_class = "nohighlight"
-            affected_text = match.group(1)
+        def replace_spans(pattern: str, render) -> None:
+            rendered = {}
+
+            def replace(match: re.Match[str]) -> str:
+                # Identical spans share a single placeholder.
+                span = match.group(0)
+                if span not in rendered:
+                    rendered[span] = render(match.group(1))
+                return rendered[span]
 
+            self.content = re.sub(pattern, replace, self.content)
+
+        def code_block(affected_text: str) -> str:
+            language_class = "nohighlight"
             for language in markdown_languages:
                 if affected_text.lower().startswith(language):
                     language_class = f"language-{language}"
                     _, _, affected_text = affected_text.partition("<br>")
 
-            second_pattern = re.compile(r"^<br>|<br>$")
-            second_match = re.search(second_pattern, affected_text)
-            while second_match is not None:
-                affected_text = re.sub(r"^<br>|<br>$", "", affected_text)
-                second_match = re.search(second_pattern, affected_text)
-            affected_text = re.sub("  ", "&nbsp;&nbsp;", affected_text)
+            affected_text = re.sub(r"^(?:<br>)+|(?:<br>)+$", "", affected_text)
+            affected_text = affected_text.replace("  ", "&nbsp;&nbsp;")
 
             self.code_blocks_content.append(affected_text)
             if not reference:
-                self.content = self.content.replace(
-                    self.content[match.start() : match.end()],
-                    '<div class="pre pre--multiline %s">%s</div>'
-                    % (language_class, f"%s{len(self.code_blocks_content)}"),
+                return '<div class="pre pre--multiline %s">%s</div>' % (
+                    language_class,
+                    f"%s{len(self.code_blocks_content)}",
                 )
-            else:
-                self.content = self.content.replace(
-                    self.content[match.start() : match.end()],
-                    '<span class="pre pre-inline">%s</span>'
-                    % f"%s{len(self.code_blocks_content)}",
-                )
-
-            match = re.search(pattern, self.content)
-
-        pattern = re.compile(r"``(.*?)``")
-        match = re.search(pattern, self.content)
-        while match is not None:
-            affected_text = match.group(1)
+            return '<span class="pre pre-inline">%s</span>' % (
+                f"%s{len(self.code_blocks_content)}"
+            )
 
+        def inline_code(affected_text: str) -> str:
             self.code_blocks_content.append(affected_text)
-            self.content = self.content.replace(
-                self.content[match.start() : match.end()],
-                '<code class="inline">%s</code>' % f"%s{len(self.code_blocks_content)}",
+            return '<code class="inline">%s</code>' % (
+                f"%s{len(self.code_blocks_content)}"
             )
-            match = re.search(pattern, self.content)
-
-        pattern = re.compile(r"`(.*?)`")
-        match = re.search(pattern, self.content)
-        while match is not None:
-            affected_text = match.group(1)
 
+        def inline_span(affected_text: str) -> str:
             self.code_blocks_content.append(affected_text)
-            self.content = self.content.replace(
-                self.content[match.start() : match.end()],
-                '<span class="pre pre-inline">%s</span>'
-                % f"%s{len(self.code_blocks_content)}",
+            return '<span class="pre pre-inline">%s</span>' % (
+                f"%s{len(self.code_blocks_content)}"
             )
-            match = re.search(pattern, self.content)
 
-        self.content = re.sub(r"<br>", "\n", self.content)
+        replace_spans(r"```(.*?)```", code_block)
+        replace_spans(r"``(.*?)``", inline_code)
+        replace_spans(r"`(.*?)`", inline_span)
+
+        self.content = self.content.replace("<br>", "\n")
 
     def reverse_code_block_markdown(self):
         """Reverses the code block markdown parsing."""
-        for x in range(len(self.code_blocks_content)):
-            self.content = self.content.replace(
-                f"%s{x + 1}", self.code_blocks_content[x]
-            )
+        if not self.code_blocks_content:
+            return
+
+        def replace(match: re.Match[str]) -> str:
+            digits = match.group(1)
+            if digits.startswith("0"):
+                return match.group(0)
+            for end in range(len(digits), 0, -1):
+                index = int(digits[:end])
+                if index <= len(self.code_blocks_content):
+                    return self.code_blocks_content[index - 1] + digits[end:]
+            return match.group(0)
+
+        self.content = re.sub(r"%s(\d+)", replace, self.content)
 
     def reverse_tenor_placeholders(self):
         """Reverses the tenor placeholders."""
@@ -476,9 +500,7 @@ class ParseMarkdown:
     def parse_masked_links(self):
         """Parses masked links (e.g. [text](url))."""
 
-        pattern = re.compile(r"\[(.+?)]\((.+?)\)")
-        match = re.search(pattern, self.content)
-        while match is not None:
+        def replace_link(match: re.Match[str]) -> str:
             affected_text = match.group(1)
             affected_url = match.group(2)
             if affected_url.startswith("<") and affected_url.endswith(">"):
@@ -489,12 +511,9 @@ class ParseMarkdown:
             start_ph, end_ph = self.add_link_placeholder(
                 start_tag=start_tag, end_tag=end_tag
             )
+            return f"{start_ph}{affected_text}{end_ph}"
 
-            self.content = self.content.replace(
-                self.content[match.start() : match.end()],
-                f"{start_ph}{affected_text}{end_ph}",
-            )
-            match = re.search(pattern, self.content)
+        self.content = re.sub(r"\[(.+?)]\((.+?)\)", replace_link, self.content)
 
     @staticmethod
     def order_list_html_to_markdown(content):
@@ -549,31 +568,16 @@ class ParseMarkdown:
 
         for x in holders:
             p, r = x
+            content = re.sub(p, lambda m: r % html.escape(m.group(1)), content)
 
-            pattern = re.compile(p)
-            match = re.search(pattern, content)
-            while match is not None:
-                affected_text = match.group(1)
-                content = content.replace(
-                    content[match.start() : match.end()], r % html.escape(affected_text)
-                )
-                match = re.search(pattern, content)
-
-        pattern = re.compile(r'<a href="(.*?)".*?>(.*?)</a>')
-        match = re.search(pattern, content)
-        while match is not None:
+        def replace_link(match: re.Match[str]) -> str:
             affected_url = match.group(1)
             affected_text = match.group(2)
             if affected_url != affected_text:
-                content = content.replace(
-                    content[match.start() : match.end()],
-                    "[%s](%s)" % (affected_text, affected_url),
-                )
-            else:
-                content = content.replace(
-                    content[match.start() : match.end()], "%s" % affected_url
-                )
-            match = re.search(pattern, content)
+                return "[%s](%s)" % (affected_text, affected_url)
+            return "%s" % affected_url
+
+        content = re.sub(r'<a href="(.*?)".*?>(.*?)</a>', replace_link, content)
 
         return content.lstrip().rstrip()
 
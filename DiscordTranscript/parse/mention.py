@@ -5,12 +5,21 @@ from typing import TYPE_CHECKING, Optional
 
 import pytz
 
+from DiscordTranscript.ext.context import ExportContext
+from DiscordTranscript.ext.stats import timed
 from DiscordTranscript.parse.markdown import ParseMarkdown
 
 if TYPE_CHECKING:
     import discord as discord_typings
 
 
+def _resolved_member(guild, member_id: int):
+    context = ExportContext.current()
+    if context is None or context.members is None or context.members.guild is not guild:
+        return None
+    return context.members.peek(member_id)
+
+
 class ParseMention:
     """A class to parse mentions in a message.
 
@@ -42,6 +51,21 @@ class ParseMention:
     )
     REGEX_SLASH_COMMAND = r"&lt;\/([\w]+ ?[\w]*):[0-9]+&gt;"
 
+    MENTION_KINDS = (
+        ("channel", REGEX_CHANNELS),
+        ("channel", REGEX_CHANNELS_2),
+        ("member", REGEX_MEMBERS),
+        ("member", REGEX_MEMBERS_2),
+        ("everyone", REGEX_EVERYONE),
+        ("everyone", REGEX_HERE),
+        ("role", REGEX_ROLES),
+        ("role", REGEX_ROLES_2),
+        *(("time", regex) for regex, _ in REGEX_TIME_HOLDER),
+        ("slash_command", REGEX_SLASH_COMMAND),
+    )
+    TIME_FORMATS = dict(REGEX_TIME_HOLDER)
+    REGEX_MENTION = re.compile("|".join("(%s)" % regex for _, regex in MENTION_KINDS))
+
     ESCAPE_LT = "______lt______"
     ESCAPE_GT = "______gt______"
     ESCAPE_AMP = "______amp______"
@@ -67,28 +91,48 @@ class ParseMention:
         self.timezone = timezone
         self.code_blocks_content = []
 
+    @timed("mention")
     async def flow(self):
         """The main flow for parsing mentions.
 
+        Every kind of mention is replaced in a single left-to-right pass.
+
         Returns:
             str: The parsed content.
         """
         markdown = ParseMarkdown(self.content)
         markdown.parse_code_block_markdown()
-        self.content = markdown.content
-        await self.escape_mentions()
-        await self.escape_mentions()
-        await self.unescape_mentions()
-        await self.channel_mention()
-        await self.member_mention()
-        await self.role_mention()
-        await self.time_mention()
-        await self.slash_command_mention()
+        self.content = self.REGEX_MENTION.sub(self.replace_mention, markdown.content)
         markdown.content = self.content
         markdown.reverse_code_block_markdown()
         self.content = markdown.content
         return self.content
 
+    def replace_mention(self, match: re.Match[str]) -> str:
+        """Renders a match of the combined mention pattern.
+
+        Args:
+            match (re.Match): The match of ``REGEX_MENTION``.
+
+        Returns:
+            str: The HTML for the mention.
+        """
+        index = match.lastindex
+        kind, regex = self.MENTION_KINDS[(index - 1) // 2]
+        value = match.group(index + 1)
+        if kind == "channel":
+            return self.render_channel(int(value))
+        if kind == "member":
+            return self.render_member(int(value))
+        if kind == "everyone":
+            return self.render_everyone(value)
+        if kind == "role":
+            return self.render_role(int(value))
+        if kind == "time":
+            strf = self.TIME_FORMATS[regex]
+            return self.render_time(match.group(index), int(value), strf)
+        return self.render_slash_command(value)
+
     async def escape_mentions(self):
         """Escapes mentions to prevent them from being parsed."""
         for match in re.finditer(
@@ -126,125 +170,38 @@ class ParseMention:
         """Parses channel mentions."""
         holder = self.REGEX_CHANNELS, self.REGEX_CHANNELS_2
         for regex in holder:
-            match = re.search(regex, self.content)
-            while match is not None:
-                channel_id = int(match.group(1))
-                channel = self.guild.get_channel(channel_id)
-
-                if channel is None:
-                    replacement = "#deleted-channel"
-                else:
-                    replacement = '<span class="mention" title="%s">#%s</span>' % (
-                        channel.id,
-                        channel.name,
-                    )
-                self.content = self.content.replace(
-                    self.content[match.start() : match.end()], replacement
-                )
-
-                match = re.search(regex, self.content)
+            self.content = re.sub(
+                regex, lambda m: self.render_channel(int(m.group(1))), self.content
+            )
 
     async def role_mention(self):
         """Parses role mentions."""
         holder = self.REGEX_EVERYONE, self.REGEX_HERE
         for regex in holder:
-            match = re.search(regex, self.content)
-            while match is not None:
-                role_name = match.group(1)
-                replacement = '<span class="mention" title="%s">@%s</span>' % (
-                    str(role_name),
-                    str(role_name),
-                )
-
-                self.content = self.content.replace(
-                    self.content[match.start() : match.end()], replacement
-                )
-                match = re.search(regex, self.content)
+            self.content = re.sub(
+                regex, lambda m: self.render_everyone(m.group(1)), self.content
+            )
         holder = self.REGEX_ROLES, self.REGEX_ROLES_2
         for regex in holder:
-            match = re.search(regex, self.content)
-            while match is not None:
-                role_id = int(match.group(1))
-                role = self.guild.get_role(role_id)
-
-                if role is None:
-                    replacement = "@deleted-role"
-                else:
-                    if role.color.r == 0 and role.color.g == 0 and role.color.b == 0:
-                        colour = "#dee0fc"
-                        bg_colour = "rgba(88, 101, 242, 0.3)"
-                    else:
-                        colour = "#%02x%02x%02x" % (
-                            role.color.r,
-                            role.color.g,
-                            role.color.b,
-                        )
-                        bg_colour = "rgba(%s, %s, %s, 0.1)" % (
-                            role.color.r,
-                            role.color.g,
-                            role.color.b,
-                        )
-                    replacement = (
-                        '<span class="mention" style="color: %s; background-color: %s;" title="%s">@%s</span>'
-                        % (
-                            colour,
-                            bg_colour,
-                            role.id,
-                            role.name,
-                        )
-                    )
-                self.content = self.content.replace(
-                    self.content[match.start() : match.end()], replacement
-                )
-                match = re.search(regex, self.content)
+            self.content = re.sub(
+                regex, lambda m: self.render_role(int(m.group(1))), self.content
+            )
 
     async def slash_command_mention(self):
         """Parses slash command mentions."""
-        match = re.search(self.REGEX_SLASH_COMMAND, self.content)
-        while match is not None:
-            slash_command_name = match.group(1)
-            replacement = '<span class="mention" title="%s">/%s</span>' % (
-                slash_command_name,
-                slash_command_name,
-            )
-            self.content = self.content.replace(
-                self.content[match.start() : match.end()], replacement
-            )
-
-            match = re.search(self.REGEX_SLASH_COMMAND, self.content)
+        self.content = re.sub(
+            self.REGEX_SLASH_COMMAND,
+            lambda m: self.render_slash_command(m.group(1)),
+            self.content,
+        )
 
     async def member_mention(self):
         """Parses member mentions."""
         holder = self.REGEX_MEMBERS, self.REGEX_MEMBERS_2
         for regex in holder:
-            match = re.search(regex, self.content)
-            while match is not None:
-                member_id = int(match.group(1))
-
-                member = None
-                try:
-                    member = self.guild.get_member(member_id)
-                    if not member and self.bot:
-                        member = self.bot.get_user(member_id)
-                    member_name = member.display_name
-                except AttributeError:
-                    member_name = member
-
-                if member is not None:
-                    replacement = '<span class="mention" title="%s">@%s</span>' % (
-                        str(member_id),
-                        str(member_name),
-                    )
-                else:
-                    replacement = '<span class="mention" title="%s">&lt;@%s></span>' % (
-                        str(member_id),
-                        str(member_id),
-                    )
-                self.content = self.content.replace(
-                    self.content[match.start() : match.end()], replacement
-                )
-
-                match = re.search(regex, self.content)
+            self.content = re.sub(
+                regex, lambda m: self.render_member(int(m.group(1))), self.content
+            )
 
     async def time_mention(self):
         """Parses time mentions."""
@@ -252,27 +209,148 @@ class ParseMention:
 
         for p in holder:
             regex, strf = p
-            match = re.search(regex, self.content)
-            while match is not None:
-                timestamp = int(match.group(1)) - 1
-                time_stamp = time.gmtime(timestamp)
-                datetime_stamp = datetime.datetime(
-                    2010, *time_stamp[1:6], tzinfo=pytz.utc
-                )
-                ui_time = datetime_stamp.strftime(strf)
-                ui_time = ui_time.replace(str(datetime_stamp.year), str(time_stamp[0]))
-                tooltip_time = datetime_stamp.strftime("%A, %e %B %Y at %H:%M")
-                tooltip_time = tooltip_time.replace(
-                    str(datetime_stamp.year), str(time_stamp[0])
-                )
-                original = match.group().replace("&lt;", "<").replace("&gt;", ">")
-                replacement = (
-                    f'<span class="unix-timestamp" data-timestamp="{tooltip_time}" raw-content="{original}">'
-                    f"{ui_time}</span>"
-                )
-
-                self.content = self.content.replace(
-                    self.content[match.start() : match.end()], replacement
-                )
-
-                match = re.search(regex, self.content)
+            self.content = re.sub(
+                regex,
+                lambda m: self.render_time(m.group(), int(m.group(1)), strf),
+                self.content,
+            )
+
+    def render_channel(self, channel_id: int) -> str:
+        """Renders a channel mention.
+
+        Args:
+            channel_id (int): The ID of the mentioned channel.
+
+        Returns:
+            str: The HTML for the mention.
+        """
+        channel = self.guild.get_channel(channel_id)
+
+        if channel is None:
+            return "#deleted-channel"
+        return '<span class="mention" title="%s">#%s</span>' % (
+            channel.id,
+            channel.name,
+        )
+
+    def render_everyone(self, role_name: str) -> str:
+        """Renders an @everyone or @here mention.
+
+        Args:
+            role_name (str): Either ``everyone`` or ``here``.
+
+        Returns:
+            str: The HTML for the mention.
+        """
+        return '<span class="mention" title="%s">@%s</span>' % (
+            str(role_name),
+            str(role_name),
+        )
+
+    def render_role(self, role_id: int) -> str:
+        """Renders a role mention.
+
+        Args:
+            role_id (int): The ID of the mentioned role.
+
+        Returns:
+            str: The HTML for the mention.
+        """
+        role = self.guild.get_role(role_id)
+
+        if role is None:
+            return "@deleted-role"
+
+        if role.color.r == 0 and role.color.g == 0 and role.color.b == 0:
+            colour = "#dee0fc"
+            bg_colour = "rgba(88, 101, 242, 0.3)"
+        else:
+            colour = "#%02x%02x%02x" % (
+                role.color.r,
+                role.color.g,
+                role.color.b,
+            )
+            bg_colour = "rgba(%s, %s, %s, 0.1)" % (
+                role.color.r,
+                role.color.g,
+                role.color.b,
+            )
+        return (
+            '<span class="mention" style="color: %s; background-color: %s;" title="%s">@%s</span>'
+            % (
+                colour,
+                bg_colour,
+                role.id,
+                role.name,
+            )
+        )
+
+    def render_slash_command(self, slash_command_name: str) -> str:
+        """Renders a slash command mention.
+
+        Args:
+            slash_command_name (str): The name of the command.
+
+        Returns:
+            str: The HTML for the mention.
+        """
+        return '<span class="mention" title="%s">/%s</span>' % (
+            slash_command_name,
+            slash_command_name,
+        )
+
+    def render_member(self, member_id: int) -> str:
+        """Renders a member mention.
+
+        Args:
+            member_id (int): The ID of the mentioned member.
+
+        Returns:
+            str: The HTML for the mention.
+        """
+        member = None
+        try:
+            member = self.guild.get_member(member_id)
+            if not member:
+                member = _resolved_member(self.guild, member_id)
+            if not member and self.bot:
+                member = self.bot.get_user(member_id)
+            member_name = member.display_name
+        except AttributeError:
+            member_name = member
+
+        if member is not None:
+            return '<span class="mention" title="%s">@%s</span>' % (
+                str(member_id),
+                str(member_name),
+            )
+        return '<span class="mention" title="%s">&lt;@%s></span>' % (
+            str(member_id),
+            str(member_id),
+        )
+
+    def render_time(self, original: str, timestamp: int, strf: str) -> str:
+        """Renders a timestamp mention.
+
+        Args:
+            original (str): The escaped timestamp markup.
+            timestamp (int): The Unix timestamp.
+            strf (str): The display format of the timestamp style.
+
+        Returns:
+            str: The HTML for the timestamp.
+        """
+        timestamp = timestamp - 1
+        time_stamp = time.gmtime(timestamp)
+        datetime_stamp = datetime.datetime(2010, *time_stamp[1:6], tzinfo=pytz.utc)
+        ui_time = datetime_stamp.strftime(strf)
+        ui_time = ui_time.replace(str(datetime_stamp.year), str(time_stamp[0]))
+        tooltip_time = datetime_stamp.strftime("%A, %e %B %Y at %H:%M")
+        tooltip_time = tooltip_time.replace(
+            str(datetime_stamp.year), str(time_stamp[0])
+        )
+        original = original.replace("&lt;", "<").replace("&gt;", ">")
+        return (
+            f'<span class="unix-timestamp" data-timestamp="{tooltip_time}" raw-content="{original}">'
+            f"{ui_time}</span>"
+        )
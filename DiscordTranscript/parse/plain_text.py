@@ -0,0 +1,101 @@
+import datetime
+import html
+import re
+from typing import TYPE_CHECKING, Optional
+
+import pytz
+
+from DiscordTranscript.parse.mention import ParseMention, _resolved_member
+
+if TYPE_CHECKING:
+    import discord as discord_typings
+
+
+class ParsePlainText(ParseMention):
+    """Renders the mentions of a message as plain text.
+
+    Mentions resolve as they do in the transcript, and what they resolve to is
+    collected along the way.
+
+    Attributes:
+        users (dict): The mentioned members and users, keyed by ID.
+        roles (dict): The mentioned roles, keyed by ID.
+        channels (dict): The mentioned channels, keyed by ID.
+    """
+
+    REGEX_EMOJIS_PLAIN = re.compile(ParseMention.REGEX_EMOJIS)
+
+    def __init__(
+        self,
+        content,
+        guild,
+        bot: Optional["discord_typings.Client"] = None,
+        timezone: str = "UTC",
+    ):
+        """Initializes the ParsePlainText class.
+
+        Args:
+            content (str): The raw content of the message.
+            guild (discord.Guild): The guild the message is in.
+            bot (Optional[discord.Client]): The bot instance. Defaults to None.
+            timezone (str): The timezone to write timestamps in. Defaults to "UTC".
+        """
+        super().__init__(content, guild, bot=bot, timezone=timezone)
+        self.users = {}
+        self.roles = {}
+        self.channels = {}
+
+    async def flow(self) -> str:
+        """Replaces the mentions, custom emojis and timestamps of the content.
+
+        Returns:
+            str: The plain text.
+        """
+        content = html.escape(self.content, quote=False)
+        content = self.REGEX_MENTION.sub(self.replace_mention, content)
+        content = self.REGEX_EMOJIS_PLAIN.sub(lambda match: match[1], content)
+        self.content = html.unescape(content)
+        return self.content
+
+    def replace_mention(self, match: re.Match[str]) -> str:
+        text = super().replace_mention(match)
+        kind, _ = self.MENTION_KINDS[(match.lastindex - 1) // 2]
+        if kind == "everyone":
+            # The pattern also matches the whitespace after the mention.
+            text += match[0][len(text) :]
+        return text
+
+    def render_channel(self, channel_id: int) -> str:
+        channel = self.guild.get_channel(channel_id)
+        if channel is None:
+            return "#deleted-channel"
+        self.channels[channel_id] = channel
+        return html.escape(f"#{channel.name}", quote=False)
+
+    def render_everyone(self, role_name: str) -> str:
+        return f"@{role_name}"
+
+    def render_role(self, role_id: int) -> str:
+        role = self.guild.get_role(role_id)
+        if role is None:
+            return "@deleted-role"
+        self.roles[role_id] = role
+        return html.escape(f"@{role.name}", quote=False)
+
+    def render_slash_command(self, slash_command_name: str) -> str:
+        return f"/{slash_command_name}"
+
+    def render_member(self, member_id: int) -> str:
+        member = self.guild.get_member(member_id) or _resolved_member(
+            self.guild, member_id
+        )
+        if member is None and self.bot:
+            member = self.bot.get_user(member_id)
+        if member is None:
+            return f"&lt;@{member_id}&gt;"
+        self.users[member_id] = member
+        return html.escape(f"@{member.display_name}", quote=False)
+
+    def render_time(self, original: str, timestamp: int, strf: str) -> str:
+        time = datetime.datetime.fromtimestamp(timestamp, pytz.timezone(self.timezone))
+        return time.isoformat()
@@ -0,0 +1,293 @@
+"""Times raw_export on large synthetic channels.
+
+Channels are built from the mocks in ``examples/generate_sample.py`` with a
+fixed seed, so every run renders the same messages. Each stage reports its wall
+time, throughput and peak traced memory.
+
+Run from the repository root::
+
+    python -m benchmarks.export
+    python -m benchmarks.export --sizes 1000 10000 100000 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from unittest.mock import MagicMock
+
+import discord
+
+from DiscordTranscript import raw_export
+from examples.generate_sample import (
+    MockActionRow,
+    MockAttachment,
+    MockButton,
+    MockButtonStyle,
+    MockChannel,
+    MockColor,
+    MockEmbed,
+    MockEmbedField,
+    MockEmbedProxy,
+    MockEmoji,
+    MockGuild,
+    MockMessage,
+    MockReaction,
+    MockRole,
+    MockSelectMenu,
+    MockSelectOption,
+    MockUser,
+)
+
+BASE_TIME = datetime.datetime(2024, 1, 1, 12, 0, 0)
+USER_COUNT = 50
+ROLE_COUNT = 10
+
+WORDS = (
+    "the quick brown fox jumps over a lazy dog while the ticket queue grows "
+    "and moderators reply with logs screenshots and links"
+).split()
+
+MARKDOWN = [
+    "**{word}**",
+    "*{word}*",
+    "__{word}__",
+    "~~{word}~~",
+    "||{word}||",
+    "`{word}`",
+    "[{word}](https://example.com/{word})",
+    "https://example.com/{word}?page=2",
+    ":thumbsup:",
+    "🎉",
+    "<:blobwave:1380533490474549250>",
+]
+
+
+class BenchmarkGuild(MockGuild):
+    def __init__(self, users):
+        super().__init__()
+        self.roles = [
+            MockRole(900 + n, f"role-{n}", MockColor(0x111111 * (n + 1)))
+            for n in range(ROLE_COUNT)
+        ]
+        self.members = {user.id: user for user in users}
+
+    def get_member(self, id):
+        return self.members.get(id)
+
+    def get_channel(self, id):
+        channel = MagicMock()
+        channel.id = id
+        channel.name = f"channel-{id}"
+        return channel
+
+
+def build_content(rng: random.Random) -> str:
+    """Builds a message mixing plain words, markdown, mentions and emoji."""
+    parts = []
+    for _ in range(rng.randint(3, 40)):
+        roll = rng.random()
+        word = rng.choice(WORDS)
+        if roll < 0.6:
+            parts.append(word)
+        elif roll < 0.85:
+            parts.append(rng.choice(MARKDOWN).format(word=word))
+        elif roll < 0.9:
+            parts.append(f"<@{rng.randint(1, USER_COUNT)}>")
+        elif roll < 0.93:
+            parts.append(f"<#{rng.randint(1, 20)}>")
+        elif roll < 0.95:
+            parts.append(f"<@&{900 + rng.randrange(ROLE_COUNT)}>")
+        else:
+            parts.append(f"<t:{1704110400 + rng.randint(0, 10**6)}:R>")
+
+    content = " ".join(parts)
+    if rng.random() < 0.05:
+        content += "\n```python\nprint('hello world')\n```"
+    if rng.random() < 0.05:
+        content = "> " + content
+    return content
+
+
+def build_embed(rng: random.Random, index: int) -> MockEmbed:
+    return MockEmbed(
+        title=f"Report #{index}",
+        description=build_content(rng),
+        color=rng.randint(0, 0xFFFFFF),
+        fields=[
+            MockEmbedField(f"Field {n}", rng.choice(WORDS), bool(n % 2))
+            for n in range(rng.randint(0, 4))
+        ],
+        footer=MockEmbedProxy(text="Automated report"),
+    )
+
+
+def build_components(rng: random.Random, index: int) -> list:
+    if rng.random() < 0.5:
+        return [
+            MockActionRow(
+                [
+                    MockButton("Confirm", MockButtonStyle.primary),
+                    MockButton("Close", MockButtonStyle.danger, emoji=MockEmoji("🔒")),
+                    MockButton(
+                        "Docs", MockButtonStyle.link, url="https://example.com/docs"
+                    ),
+                ]
+            )
+        ]
+    options = [MockSelectOption(f"Option {n}", str(n)) for n in range(5)]
+    return [MockActionRow([MockSelectMenu(f"menu-{index}", options, "Pick one")])]
+
+
+def generate_channel(count: int, seed: int = 0):
+    """Builds a deterministic channel of ``count`` messages.
+
+    Args:
+        count (int): The number of messages.
+        seed (int): The seed of the generator. Defaults to 0.
+
+    Returns:
+        Tuple[MockChannel, list]: The channel and its messages, newest first.
+    """
+    rng = random.Random(seed)
+    users = [
+        MockUser(
+            n,
+            f"user-{n}",
+            f"{n:04d}",
+            f"https://cdn.discordapp.com/embed/avatars/{n % 6}.png",
+            bot=n % 10 == 0,
+            color=MockColor(rng.randint(0, 0xFFFFFF)),
+        )
+        for n in range(1, USER_COUNT + 1)
+    ]
+    for user in users:
+        user.created_at = BASE_TIME - datetime.timedelta(days=365)
+        user.joined_at = BASE_TIME - datetime.timedelta(days=30)
+
+    guild = BenchmarkGuild(users)
+    channel = MockChannel()
+    channel.guild = guild
+    channel.created_at = BASE_TIME - datetime.timedelta(days=400)
+
+    messages = []
+    timestamp = BASE_TIME
+    for index in range(count):
+        timestamp += datetime.timedelta(seconds=rng.choice((5, 30, 60, 600, 3600)))
+        message_id = 10**6 + index
+        message = MockMessage(
+            message_id,
+            build_content(rng),
+            rng.choice(users),
+            timestamp,
+            channel=channel,
+        )
+        message.type = discord.MessageType.default
+        roll = rng.random()
+        if roll < 0.08:
+            message.attachments = [
+                MockAttachment(
+                    f"file-{index}-{n}.png",
+                    f"https://cdn.discordapp.com/attachments/1/{message_id}/file-{n}.png",
+                    rng.randint(10**3, 10**7),
+                    rng.choice(("image/png", "video/mp4", "application/pdf")),
+                )
+                for n in range(rng.randint(1, 3))
+            ]
+        elif roll < 0.13:
+            message.embeds = [build_embed(rng, index)]
+        elif roll < 0.16 and message.author.bot:
+            message.components = build_components(rng, index)
+        if rng.random() < 0.1:
+            message.reactions = [
+                MockReaction(rng.choice(("👍", "🎉", "❤️")), rng.randint(1, 9)),
+                MockReaction(MockEmoji("blobwave", id=1380533490474549250), 1),
+            ][: rng.randint(1, 2)]
+        if messages and rng.random() < 0.05:
+            target = rng.choice(messages[-50:])
+            message.reference = MagicMock(
+                resolved=target,
+                message_id=target.id,
+                guild_id=guild.id,
+                channel_id=channel.id,
+            )
+            message.type = discord.MessageType.reply
+        messages.append(message)
+
+    messages.reverse()
+    return channel, messages
+
+
+async def run_stage(name, count, trace_memory, coro_factory):
+    """Runs one stage and prints its wall time, throughput and peak memory."""
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = await coro_factory()
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if trace_memory else 0
+    if trace_memory:
+        tracemalloc.stop()
+
+    memory = f"{peak / 1024**2:9.1f} MiB" if trace_memory else "        n/a"
+    print(
+        f"{count:>7} messages  {name:<9} {elapsed:9.2f} s  "
+        f"{count / elapsed:10.0f} msg/s  peak {memory}"
+    )
+    return result
+
+
+async def benchmark(count, seed, concurrency, trace_memory):
+    async def generate():
+        return generate_channel(count, seed)
+
+    # Exports rewrite message content in place, so every stage renders a fresh
+    # copy of the channel.
+    channel, messages = await run_stage("generate", count, trace_memory, generate)
+
+    async def export():
+        return await raw_export(
+            channel, messages, guild=channel.guild, concurrency=concurrency
+        )
+
+    html = await run_stage("export", count, trace_memory, export)
+    del html, channel, messages
+
+    channel, messages = generate_channel(count, seed)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "transcript.html")
+
+        async def stream():
+            return await raw_export(
+                channel,
+                messages,
+                guild=channel.guild,
+                output_path=path,
+                concurrency=concurrency,
+            )
+
+        await run_stage("stream", count, trace_memory, stream)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--no-memory",
+        action="store_true",
+        help="skip tracemalloc, which slows every stage down",
+    )
+    args = parser.parse_args()
+
+    for count in args.sizes:
+        await benchmark(count, args.seed, args.concurrency, not args.no_memory)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
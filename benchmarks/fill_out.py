@@ -0,0 +1,119 @@
+"""Times fill_out on the start_message and meta.html templates.
+
+Each template is filled with the values of a typical message or participant,
+once with the plain-text fast path and once with every value sent through the
+mention and markdown parsers.
+
+Run from the repository root::
+
+    python -m benchmarks.fill_out
+"""
+
+import asyncio
+import contextlib
+import time
+from types import SimpleNamespace
+
+from DiscordTranscript.ext import html_generator
+from DiscordTranscript.ext.html_generator import (
+    PARSE_MODE_NONE,
+    fill_out,
+    meta_data_temp,
+    start_message,
+)
+
+RUNS = 2000
+
+
+class Guild:
+    def get_member(self, member_id):
+        return SimpleNamespace(display_name=f"member-{member_id}")
+
+
+def start_message_values(n):
+    return [
+        ("REFERENCE_SYMBOL", "", PARSE_MODE_NONE),
+        ("REFERENCE", "", PARSE_MODE_NONE),
+        (
+            "AVATAR_URL",
+            "https://cdn.discordapp.com/embed/avatars/0.png",
+            PARSE_MODE_NONE,
+        ),
+        ("NAME_TAG", f"user{n}#0001", PARSE_MODE_NONE),
+        ("USER_ID", str(300000000000000000 + n)),
+        ("USER_COLOUR", "#FFFFFF"),
+        ("USER_ICON", "", PARSE_MODE_NONE),
+        ("NAME", f"user{n}"),
+        ("BOT_TAG", "", PARSE_MODE_NONE),
+        ("TIMESTAMP", "01-01-2024 12:00"),
+        ("DEFAULT_TIMESTAMP", "January 1, 2024 12:00", PARSE_MODE_NONE),
+        ("MESSAGE_ID", str(1200000000000000000 + n)),
+        ("MESSAGE_CONTENT", "hello world", PARSE_MODE_NONE),
+        ("EMBEDS", "", PARSE_MODE_NONE),
+        ("ATTACHMENTS", "", PARSE_MODE_NONE),
+        ("COMPONENTS", "", PARSE_MODE_NONE),
+        ("EMOJI", "", PARSE_MODE_NONE),
+    ]
+
+
+def meta_values(n):
+    return [
+        ("USER_ID", str(300000000000000000 + n), PARSE_MODE_NONE),
+        ("USERNAME", f"user{n}", PARSE_MODE_NONE),
+        ("DISCRIMINATOR", ""),
+        ("BOT", "", PARSE_MODE_NONE),
+        ("CREATED_AT", "Jan 01, 2020", PARSE_MODE_NONE),
+        ("JOINED_AT", "Jan 01, 2021", PARSE_MODE_NONE),
+        ("GUILD_ICON", "https://cdn.discordapp.com/icons/1/a.png", PARSE_MODE_NONE),
+        ("DISCORD_ICON", "https://cdn.discordapp.com/logo.png", PARSE_MODE_NONE),
+        ("MEMBER_ID", str(300000000000000000 + n), PARSE_MODE_NONE),
+        (
+            "USER_AVATAR",
+            "https://cdn.discordapp.com/embed/avatars/0.png",
+            PARSE_MODE_NONE,
+        ),
+        ("DISPLAY", "", PARSE_MODE_NONE),
+        ("MESSAGE_COUNT", str(n % 500)),
+        ("GUILD_ID", "Guild ID", PARSE_MODE_NONE),
+        ("CHANNEL_ID", "Channel ID", PARSE_MODE_NONE),
+        ("CHANNEL_CREATED_AT", "Channel created at", PARSE_MODE_NONE),
+        ("MESSAGE_COUNT_LABEL", "Message count", PARSE_MODE_NONE),
+        ("MESSAGE_PARTICIPANTS_LABEL", "Participants", PARSE_MODE_NONE),
+    ]
+
+
+@contextlib.contextmanager
+def without_fast_path():
+    is_plain_text = html_generator.is_plain_text
+    html_generator.is_plain_text = lambda _: False
+    try:
+        yield
+    finally:
+        html_generator.is_plain_text = is_plain_text
+
+
+async def time_template(guild, template, build_values):
+    replacements = [build_values(n) for n in range(RUNS)]
+    start = time.perf_counter()
+    for values in replacements:
+        await fill_out(guild, template, values)
+    return (time.perf_counter() - start) / RUNS
+
+
+async def main():
+    guild = Guild()
+    for name, template, build_values in (
+        ("start_message", start_message, start_message_values),
+        ("meta.html", meta_data_temp, meta_values),
+    ):
+        fast = await time_template(guild, template, build_values)
+        with without_fast_path():
+            full = await time_template(guild, template, build_values)
+        print(
+            f"{name:<14} fast path {fast * 1e6:8.1f} us  "
+            f"full parse {full * 1e6:8.1f} us  ({full / fast:4.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""Times ParseMention.flow on mention-dense messages.
+
+Run from the repository root::
+
+    python -m benchmarks.mention
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from DiscordTranscript.parse.mention import ParseMention
+
+MENTIONS = [
+    "&lt;@{n}&gt;",
+    "&lt;#{n}&gt;",
+    "&lt;@&amp;{n}&gt;",
+    "@everyone ",
+    "&lt;t:1622548800:f&gt;",
+    "&lt;/ping:{n}&gt;",
+]
+
+
+class Guild:
+    def get_channel(self, channel_id):
+        return SimpleNamespace(id=channel_id, name=f"channel-{channel_id}")
+
+    def get_member(self, member_id):
+        return SimpleNamespace(display_name=f"member-{member_id}")
+
+    def get_role(self, role_id):
+        colour = SimpleNamespace(r=role_id % 256, g=0, b=0)
+        return SimpleNamespace(id=role_id, name=f"role-{role_id}", color=colour)
+
+
+def mention_dense_message(count: int) -> str:
+    return " ".join(
+        MENTIONS[n % len(MENTIONS)].format(n=n) + " hi" for n in range(count)
+    )
+
+
+async def main():
+    guild = Guild()
+    for count in (10, 100, 1000, 5000):
+        content = mention_dense_message(count)
+        runs = max(1, 2000 // count)
+        start = time.perf_counter()
+        for _ in range(runs):
+            await ParseMention(content, guild).flow()
+        elapsed = (time.perf_counter() - start) / runs
+        print(
+            f"{count:>5} mentions: {elapsed * 1000:9.2f} ms/message "
+            f"({elapsed / count * 1e6:6.1f} us/mention)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
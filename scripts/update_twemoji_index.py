@@ -0,0 +1,74 @@
+"""Regenerates DiscordTranscript/ext/twemoji.txt from the Twemoji asset names.
+
+The index lists the file names of ``assets/72x72`` in jdecked/twemoji, without
+the ``.png`` extension. Run it from the repository root, either against the
+GitHub tree of a tag or against a local checkout of that tag::
+
+    python scripts/update_twemoji_index.py
+    python scripts/update_twemoji_index.py --checkout ../twemoji
+
+The tag defaults to ``REF``, the release ``cdn_fmt`` in
+DiscordTranscript/ext/emoji_convert.py serves the images from. Pass ``--ref``
+after bumping both.
+"""
+
+import argparse
+import json
+import os
+import urllib.request
+
+ASSETS = "assets/72x72"
+INDEX = os.path.join("DiscordTranscript", "ext", "twemoji.txt")
+REF = "v16.0.1"
+TREE_URL = "https://api.github.com/repos/jdecked/twemoji/git/trees/{ref}?recursive=1"
+
+
+def names_from_checkout(path: str) -> list[str]:
+    return [
+        name[:-4]
+        for name in os.listdir(os.path.join(path, ASSETS))
+        if name.endswith(".png")
+    ]
+
+
+def names_from_github(ref: str) -> list[str]:
+    with urllib.request.urlopen(TREE_URL.format(ref=ref)) as response:
+        tree = json.load(response)
+    if tree.get("truncated"):
+        raise SystemExit("The GitHub tree is truncated; use --checkout instead.")
+    prefix = f"{ASSETS}/"
+    return [
+        entry["path"][len(prefix) : -4]
+        for entry in tree["tree"]
+        if entry["path"].startswith(prefix) and entry["path"].endswith(".png")
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--ref", default=REF, help=f"A tag of jdecked/twemoji. Defaults to {REF}."
+    )
+    parser.add_argument(
+        "--checkout", help="A local checkout of the tag, used instead of GitHub."
+    )
+    args = parser.parse_args()
+
+    if args.checkout:
+        names = names_from_checkout(args.checkout)
+    else:
+        names = names_from_github(args.ref)
+    with open(INDEX, "w", encoding="utf-8", newline="\n") as file:
+        file.write(
+            "# Twemoji 72x72 asset names, one per line, without the extension.\n"
+        )
+        file.write(
+            f"# Generated from jdecked/twemoji {args.ref} {ASSETS} by "
+            "scripts/update_twemoji_index.py.\n"
+        )
+        file.writelines(f"{name}\n" for name in sorted(set(names)))
+    print(f"Wrote {len(set(names))} names to {INDEX}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import datetime
+from unittest.mock import MagicMock
+
+import discord
+import pytest
+
+from DiscordTranscript.construct.message import MessageConstruct
+
+START = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class Author:
+    """A user with only the attributes the renderers read."""
+
+    discriminator = "0"
+    bot = False
+    display_avatar = "avatar.png"
+    created_at = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+    joined_at = None
+
+    def __init__(self, user_id, display_name=None):
+        self.id = user_id
+        self.name = f"user{user_id}"
+        self.display_name = display_name or f"User {user_id}"
+
+    def __repr__(self):
+        # Cache keys are built from the repr of the arguments.
+        return f"<Author id={self.id}>"
+
+
+class Channel:
+    """A text channel in a guild whose members are not cached."""
+
+    type = "text"
+    topic = None
+    created_at = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    def __init__(self, channel_id=42, name="ticket-1"):
+        self.id = channel_id
+        self.name = name
+        self.guild = MagicMock()
+        self.guild.id = 2
+        self.guild.name = "Test Guild"
+        self.guild.icon = ""
+        self.guild.get_member.return_value = None
+        self.guild.fetch_member = None
+
+
+def create_message(
+    message_id,
+    channel,
+    content=None,
+    author=None,
+    created_at=None,
+    reply_to=None,
+):
+    message = MagicMock()
+    message.id = message_id
+    message.type = discord.MessageType.default
+    message.webhook_id = None
+    message.channel = channel
+    message.content = f"message {message_id}" if content is None else content
+    message.created_at = created_at or START + datetime.timedelta(minutes=message_id)
+    message.edited_at = None
+    message.author = author or Author(1)
+    message.mentions = []
+    message.attachments = []
+    message.embeds = []
+    message.stickers = []
+    message.components = []
+    message.reactions = []
+    message.interaction = None
+    message.interaction_metadata = None
+    message.reference = None
+    if reply_to is not None:
+        message.reference = MagicMock(message_id=reply_to, channel_id=channel.id)
+    return message
+
+
+@pytest.fixture
+def make_author():
+    """Creates a user: ``make_author(user_id, display_name=None)``."""
+    return Author
+
+
+@pytest.fixture
+def make_channel():
+    """Creates a text channel: ``make_channel(channel_id=42, name="ticket-1")``."""
+    return Channel
+
+
+@pytest.fixture
+def make_message():
+    """Creates a plain message with no attachments, embeds or reactions.
+
+    Called as ``make_message(message_id, channel, content=None, author=None,
+    created_at=None, reply_to=None)``; the message is sent ``message_id``
+    minutes into 2023 by user 1 unless told otherwise.
+    """
+    return create_message
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """The IDs of the messages whose content was rendered."""
+    rendered = []
+    build_content = MessageConstruct.build_content
+
+    async def counting(self):
+        rendered.append(self.message.id)
+        await build_content(self)
+
+    monkeypatch.setattr(MessageConstruct, "build_content", counting)
+    return rendered
@@ -0,0 +1,102 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from DiscordTranscript.construct.attachment_handler import AttachmentToDataURIHandler
+from DiscordTranscript.ext.asset_cache import AssetCache
+
+EXPIRING_URL = "https://cdn.discordapp.com/attachments/1/2/file.txt?ex=1&is=2&hm=3"
+RENEWED_URL = "https://cdn.discordapp.com/attachments/1/2/file.txt?ex=4&is=5&hm=6"
+
+
+class FakeResponse:
+    status = 200
+
+    def __init__(self, data):
+        self.data = data
+
+    async def read(self):
+        return self.data
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url):
+        self.requests.append(url)
+        return FakeResponse(b"hello")
+
+
+def create_attachment(url):
+    attachment = MagicMock()
+    attachment.url = url
+    attachment.proxy_url = url
+    attachment.content_type = "text/plain"
+    return attachment
+
+
+def test_asset_cache_round_trips_and_persists(tmp_path):
+    asset_cache = AssetCache(tmp_path)
+    key = AssetCache.make_key(EXPIRING_URL, 80)
+    assert asset_cache.get(key) is None
+
+    asset_cache.set(key, b"data", "image/webp")
+    asset_cache.close()
+
+    reopened = AssetCache(tmp_path)
+    assert reopened.get(key) == (b"data", "image/webp")
+    assert len(reopened) == 1
+
+
+def test_asset_cache_keys_ignore_discord_signatures():
+    assert AssetCache.make_key(EXPIRING_URL, 80) == AssetCache.make_key(RENEWED_URL, 80)
+    assert AssetCache.make_key(EXPIRING_URL, 80) != AssetCache.make_key(
+        EXPIRING_URL, 90
+    )
+    assert AssetCache.make_key("https://a.com/x?v=1") != AssetCache.make_key(
+        "https://a.com/x?v=2"
+    )
+
+
+def test_asset_cache_evicts_least_recently_used(tmp_path):
+    asset_cache = AssetCache(tmp_path, max_size=10)
+    asset_cache.set("a", b"1234", None)
+    asset_cache.set("b", b"1234", None)
+    assert asset_cache.get("a") is not None
+
+    asset_cache.set("c", b"1234", None)
+
+    assert asset_cache.get("b") is None
+    assert asset_cache.get("a") == (b"1234", None)
+    assert asset_cache.size == 8
+    assert not (tmp_path / "b" / "b").exists()
+
+    asset_cache.set("huge", b"x" * 11, None)
+    assert asset_cache.get("huge") is None
+
+
+@pytest.mark.asyncio
+async def test_handler_reuses_assets_from_disk(tmp_path):
+    first_session = FakeSession()
+    first = AttachmentToDataURIHandler(
+        session=first_session, asset_cache=AssetCache(tmp_path)
+    )
+    expected = "data:text/plain;base64,aGVsbG8="
+    assert (await first.process_asset(create_attachment(EXPIRING_URL))).url == expected
+
+    second_session = FakeSession()
+    second = AttachmentToDataURIHandler(
+        session=second_session, asset_cache=AssetCache(tmp_path)
+    )
+    attachment = await second.process_asset(create_attachment(RENEWED_URL))
+
+    assert attachment.url == attachment.proxy_url == expected
+    assert first_session.requests == [EXPIRING_URL]
+    assert second_session.requests == []
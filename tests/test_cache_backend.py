@@ -0,0 +1,134 @@
+import pytest
+
+from DiscordTranscript.ext import cache_backend
+from DiscordTranscript.ext.cache import cache
+from DiscordTranscript.ext.cache_backend import DictCache, DiskCache, LRUCache
+from DiscordTranscript.ext.context import ExportContext
+
+
+def test_lru_cache_evicts_least_recently_used():
+    backend = LRUCache(maxsize=2)
+    backend.set("a", 1)
+    backend.set("b", 2)
+    assert backend.get("a") == 1
+
+    backend.set("c", 3)
+
+    assert len(backend) == 2
+    assert backend.get("a") == 1
+    assert backend.get("c") == 3
+    with pytest.raises(KeyError):
+        backend.get("b")
+    assert backend.stats.evictions == 1
+
+
+def test_lru_cache_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache_backend.time, "monotonic", lambda: now[0])
+    backend = LRUCache(ttl=10)
+    backend.set("a", 1)
+
+    now[0] = 109.0
+    assert backend.get("a") == 1
+
+    now[0] = 110.0
+    with pytest.raises(KeyError):
+        backend.get("a")
+    assert len(backend) == 0
+    assert backend.stats.evictions == 1
+
+
+def test_cache_stats_count_hits_and_misses():
+    backend = DictCache()
+    backend.set("a", 1)
+    backend.get("a")
+    backend.get("a")
+    with pytest.raises(KeyError):
+        backend.get("b")
+
+    assert (backend.stats.hits, backend.stats.misses) == (2, 1)
+    assert backend.stats.hit_rate == pytest.approx(2 / 3)
+
+    backend.stats.reset()
+    assert backend.stats.hit_rate == 0.0
+
+
+def test_lru_cache_rejects_invalid_limits():
+    with pytest.raises(ValueError):
+        LRUCache(maxsize=0)
+    with pytest.raises(ValueError):
+        LRUCache(ttl=0)
+
+
+@pytest.mark.asyncio
+async def test_shared_backend_outlives_the_context():
+    calls = []
+
+    class Lookup:
+        def __init__(self, context):
+            self.context = context
+
+        @cache()
+        async def get(self, key):
+            calls.append(key)
+            return key * 2
+
+    backend = LRUCache(maxsize=1)
+    async with ExportContext(cache=backend) as first:
+        assert await Lookup(first).get(2) == 4
+    async with ExportContext(cache=backend) as second:
+        assert await Lookup(second).get(2) == 4
+        assert await Lookup(second).get(3) == 6
+        assert await Lookup(second).get(2) == 4
+
+    assert calls == [2, 3, 2]
+    assert (backend.stats.hits, backend.stats.misses) == (1, 3)
+    assert backend.stats.evictions == 2
+
+
+def test_disk_cache_persists_and_evicts(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    backend = DiskCache(path, maxsize=2)
+    backend.set("a", {"content": "1"})
+    backend.set("b", ["2"])
+    backend.get("a")
+    backend.set("c", "3")
+    backend.close()
+
+    backend = DiskCache(path, maxsize=2)
+    assert backend.get("a") == {"content": "1"}
+    assert backend.get("c") == "3"
+    with pytest.raises(KeyError):
+        backend.get("b")
+    assert len(backend) == 2
+    backend.close()
+
+
+def test_disk_cache_lookups_do_not_write(tmp_path):
+    backend = DiskCache(tmp_path / "cache.sqlite")
+    backend.set("a", "1")
+    backend.set("b", "2")
+    writes = backend._db.total_changes
+
+    assert "a" in backend
+    assert "z" not in backend
+    assert backend.get("a") == "1"
+
+    assert backend._db.total_changes == writes
+    assert (backend.stats.hits, backend.stats.misses) == (1, 0)
+    backend.close()
+
+
+def test_disk_cache_evicts_by_last_lookup(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    backend = DiskCache(path, maxsize=2)
+    backend.set("a", "1")
+    backend.set("b", "2")
+    backend.get("a")
+    backend.close()
+
+    backend = DiskCache(path, maxsize=2)
+    backend.set("c", "3")
+    assert "a" in backend
+    assert "b" not in backend
+    backend.close()
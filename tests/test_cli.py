@@ -0,0 +1,160 @@
+import datetime
+import json
+
+from DiscordTranscript.cli import main
+from DiscordTranscript.ext.snapshot import (
+    ChannelSnapshot,
+    ColourSnapshot,
+    GuildSnapshot,
+    RoleSnapshot,
+    UserSnapshot,
+)
+
+CHANNEL_ID = 1084000000000000000
+CREATED_AT = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def user(user_id, name):
+    return {
+        "id": str(user_id),
+        "username": name,
+        "global_name": name.title(),
+        "discriminator": "0",
+        "avatar": None,
+    }
+
+
+def message(message_id, author, content, **fields):
+    return {
+        "id": str(message_id),
+        "channel_id": str(CHANNEL_ID),
+        "type": 0,
+        "content": content,
+        "timestamp": f"2024-03-01T12:{message_id % 60:02d}:00.000000+00:00",
+        "edited_timestamp": None,
+        "author": author,
+        **fields,
+    }
+
+
+ALICE = user(1, "alice")
+BOB = user(2, "bob")
+
+
+def write_dump(path, topic, encoding="utf-8"):
+    older = message(5, ALICE, "an older message")
+    lines = [
+        message(10, ALICE, f"**hello** <@2> about {topic}", mentions=[BOB]),
+        message(
+            11,
+            BOB,
+            "a reply",
+            message_reference={"message_id": "5", "channel_id": str(CHANNEL_ID)},
+            referenced_message=older,
+            reactions=[{"emoji": {"id": None, "name": "👍"}, "count": 2}],
+        ),
+        message(
+            12,
+            BOB,
+            "",
+            embeds=[{"type": "rich", "title": "Embed title", "color": 0x123456}],
+            components=[
+                {
+                    "type": 1,
+                    "components": [
+                        {"type": 2, "style": 1, "label": "Click", "custom_id": "a"}
+                    ],
+                }
+            ],
+        ),
+    ]
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding)
+
+
+def write_guild(path):
+    guild = GuildSnapshot(
+        3,
+        "Archive Guild",
+        None,
+        members={
+            1: UserSnapshot(
+                1, "alice", "0", "Alice the Admin", None, False, False, CREATED_AT
+            )
+        },
+        roles={4: RoleSnapshot(4, "staff", ColourSnapshot(0xFF0000))},
+        channels={CHANNEL_ID: ChannelSnapshot(CHANNEL_ID, "support", "text", "Help")},
+    )
+    path.write_text(json.dumps(guild.to_dict()), "utf-8")
+
+
+def test_renders_dumps_in_parallel(tmp_path):
+    write_guild(tmp_path / "guild.json")
+    for topic in ("apples", "pears"):
+        write_dump(tmp_path / f"{topic}.ndjson", topic)
+
+    status = main(
+        [
+            str(tmp_path / "apples.ndjson"),
+            str(tmp_path / "pears.ndjson"),
+            "--guild",
+            str(tmp_path / "guild.json"),
+            "--output",
+            str(tmp_path / "html"),
+            "--jobs",
+            "2",
+        ]
+    )
+
+    assert status == 0
+    for topic in ("apples", "pears"):
+        html = (tmp_path / "html" / f"{topic}.html").read_text("utf-8")
+        assert "<strong>hello</strong> " in html
+        assert f"about {topic}" in html
+        assert "Archive Guild" in html
+        assert "support" in html
+        assert "Alice the Admin" in html
+        assert "an older message" in html
+        assert "Embed title" in html
+        assert "Click" in html
+        assert "👍" in html or "1f44d" in html
+
+
+def test_streams_to_standard_output(tmp_path, capsys):
+    write_guild(tmp_path / "guild.json")
+    write_dump(tmp_path / "dump.ndjson", "apples")
+
+    status = main(
+        [
+            str(tmp_path / "dump.ndjson"),
+            "-g",
+            str(tmp_path / "guild.json"),
+            "-o",
+            "-",
+        ]
+    )
+
+    assert status == 0
+    assert "about apples" in capsys.readouterr().out
+    assert not (tmp_path / "dump.html").exists()
+
+
+def test_reads_dumps_with_a_byte_order_mark(tmp_path):
+    write_guild(tmp_path / "guild.json")
+    write_dump(tmp_path / "dump.ndjson", "apples", "utf-8-sig")
+
+    status = main([str(tmp_path / "dump.ndjson"), "-g", str(tmp_path / "guild.json")])
+
+    assert status == 0
+    html = (tmp_path / "dump.html").read_text("utf-8")
+    assert "about apples" in html
+    assert "support" in html
+
+
+def test_reports_failed_dumps(tmp_path, capsys):
+    write_guild(tmp_path / "guild.json")
+    (tmp_path / "broken.ndjson").write_text("{not json\n", "utf-8")
+
+    status = main([str(tmp_path / "broken.ndjson"), "-g", str(tmp_path / "guild.json")])
+
+    assert status == 1
+    assert "broken.ndjson" in capsys.readouterr().err
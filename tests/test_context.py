@@ -0,0 +1,146 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import discord
+import pytest
+
+from DiscordTranscript.construct.attachment_handler import AttachmentHandler
+from DiscordTranscript.construct.transcript import TranscriptDAO
+from DiscordTranscript.ext.cache import cache
+from DiscordTranscript.ext.cache_backend import LRUCache
+from DiscordTranscript.ext.context import ExportContext
+
+
+@pytest.fixture
+def create_message(make_author, make_message):
+    authors = {author_id: make_author(author_id) for author_id in (0, 1, 7)}
+
+    def create_message(message_id, author_id, with_menu=False):
+        # The channel is set by `export`.
+        message = make_message(message_id, None, author=authors[author_id])
+        attachment = MagicMock()
+        attachment.content_type = "image/png"
+        attachment.filename = f"file{message_id}.png"
+        attachment.proxy_url = f"https://example.com/file{message_id}.png"
+        message.attachments = [attachment]
+        if with_menu:
+            menu = MagicMock(spec=discord.SelectMenu)
+            menu.placeholder = "Pick one"
+            menu.options = []
+            menu.disabled = False
+            row = MagicMock(spec=discord.ActionRow)
+            row.children = [menu]
+            message.components = [row]
+        return message
+
+    return create_message
+
+
+class SlowAttachmentHandler(AttachmentHandler):
+    async def process_asset(self, attachment):
+        await asyncio.sleep(0.01)
+        return attachment
+
+
+@pytest.fixture
+def export(make_channel):
+    async def export(messages, fetches, delay=0.01, cache_backend=None):
+        async def fetch_member(member_id):
+            fetches.append(member_id)
+            await asyncio.sleep(delay)
+            member = MagicMock()
+            member.colour = "#ff0000"
+            return member
+
+        channel = make_channel(1, "test-channel")
+        channel.guild.fetch_member = fetch_member
+        for message in messages:
+            message.channel = channel
+        transcript = TranscriptDAO(
+            channel,
+            None,
+            messages,
+            "UTC",
+            True,
+            False,
+            None,
+            None,
+            None,
+            SlowAttachmentHandler(),
+            cache_backend=cache_backend,
+        )
+        return (await transcript.build_transcript()).html
+
+    return export
+
+
+@pytest.mark.asyncio
+async def test_concurrent_exports_number_menus_independently(create_message, export):
+    first, second = await asyncio.gather(
+        export([create_message(n, 1, with_menu=True) for n in range(3)], []),
+        export([create_message(n, 1, with_menu=True) for n in range(2)], []),
+    )
+
+    assert [f"dropdownButton{n}" in first for n in range(4)] == [1, 1, 1, 0]
+    assert [f"dropdownButton{n}" in second for n in range(4)] == [1, 1, 0, 0]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_exports_keep_their_own_member_cache(create_message, export):
+    short_fetches, long_fetches = [], []
+    await asyncio.gather(
+        export([create_message(1, 7)], short_fetches, delay=0.05),
+        export([create_message(n, n % 2) for n in range(1, 20)], long_fetches),
+    )
+
+    assert sorted(short_fetches) == [7]
+    assert sorted(long_fetches) == [0, 1]
+
+
+@pytest.mark.asyncio
+async def test_cache_is_scoped_to_the_context():
+    calls = []
+
+    class Lookup:
+        def __init__(self, context):
+            self.context = context
+
+        @cache()
+        async def get(self, key):
+            calls.append(key)
+            return key * 2
+
+    first, second = ExportContext(), ExportContext()
+    assert await Lookup(first).get(2) == 4
+    assert await Lookup(first).get(2) == 4
+    assert await Lookup(second).get(2) == 4
+    assert calls == [2, 2]
+
+    await first.close()
+    assert len(first.cache) == 0
+    assert len(second.cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_shared_cache_backend_stays_warm_across_exports(create_message, export):
+    backend = LRUCache(maxsize=16)
+    fetches = []
+
+    first = await export([create_message(0, 1)], fetches, cache_backend=backend)
+    second = await export([create_message(1, 1)], fetches, cache_backend=backend)
+
+    assert fetches == [1]
+    assert backend.stats.hits > 0
+    assert len(backend) > 0
+    assert "message 0" in first and "message 1" in second
+
+
+@pytest.mark.asyncio
+async def test_context_shares_one_session_and_closes_it():
+    async with ExportContext() as context:
+        assert ExportContext.current() is context
+        session = await context.get_session()
+        assert await context.get_session() is session
+
+    assert session.closed
+    assert ExportContext.current() is None
@@ -0,0 +1,109 @@
+import io
+import json
+
+from DiscordTranscript.cli import main
+from DiscordTranscript.ext.dce_archive import iter_archive, read_archive
+
+AUTHOR = {
+    "id": "1",
+    "name": "alice",
+    "discriminator": "0000",
+    "nickname": "Alice the Admin",
+    "color": "#1ABC9C",
+    "isBot": False,
+    "roles": [
+        {"id": "8", "name": "member", "color": None, "position": 1},
+        {"id": "9", "name": "staff", "color": "#1ABC9C", "position": 5},
+    ],
+    "avatarUrl": "https://cdn.discordapp.com/embed/avatars/0.png",
+}
+
+
+def message(message_id, content, **fields):
+    return {
+        "id": str(message_id),
+        "type": "Default",
+        "timestamp": f"2021-03-14T13:{message_id:02d}:15.4130000+00:00",
+        "timestampEdited": None,
+        "isPinned": False,
+        "content": content,
+        "author": AUTHOR,
+        "attachments": [],
+        "embeds": [],
+        "stickers": [],
+        "reactions": [],
+        "mentions": [],
+        **fields,
+    }
+
+
+ARCHIVE = {
+    "guild": {"id": "3", "name": "Legacy Guild", "iconUrl": None},
+    "channel": {
+        "id": "4",
+        "type": "GuildTextChat",
+        "category": "Archive",
+        "name": "old-support",
+        "topic": "Old tickets",
+    },
+    "dateRange": {"after": None, "before": None},
+    "exportedAt": "2021-03-15T00:00:00+00:00",
+    "messages": [
+        message(10, 'first [message] with "quotes" and {braces}'),
+        message(
+            11,
+            "a reply",
+            type="Reply",
+            reference={"messageId": "10", "channelId": "4", "guildId": "3"},
+            embeds=[
+                {
+                    "title": "Embed title",
+                    "color": "#123456",
+                    "fields": [{"name": "Field", "value": "value", "isInline": True}],
+                }
+            ],
+            reactions=[
+                {"emoji": {"id": "", "name": "👍", "isAnimated": False}, "count": 2}
+            ],
+            attachments=[
+                {
+                    "id": "12",
+                    "url": "https://cdn.discordapp.com/attachments/4/12/notes.txt",
+                    "fileName": "notes.txt",
+                    "fileSizeBytes": 5,
+                }
+            ],
+        ),
+    ],
+    "messageCount": 2,
+}
+
+
+def test_archives_are_read_incrementally():
+    text = json.dumps(ARCHIVE, indent=2, ensure_ascii=False)
+
+    header, messages = read_archive(io.StringIO(text), chunk_size=7)
+
+    assert header["channel"]["name"] == "old-support"
+    assert "messages" not in header
+    assert list(messages) == ARCHIVE["messages"]
+    items = dict(iter_archive(io.StringIO(json.dumps(ARCHIVE)), chunk_size=3))
+    assert items["messageCount"] == 2
+
+
+def test_renders_archives_without_a_guild_file(tmp_path):
+    path = tmp_path / "legacy.json"
+    path.write_text(json.dumps(ARCHIVE, indent=2), "utf-8")
+
+    assert main([str(path), "-o", str(tmp_path / "out.html")]) == 0
+
+    html = (tmp_path / "out.html").read_text("utf-8")
+    assert "Legacy Guild" in html
+    assert "old-support" in html
+    assert "Alice the Admin" in html
+    assert "#1abc9c" in html
+    assert "first [message] with &quot;quotes&quot;" in html
+    assert "Embed title" in html
+    assert "notes.txt" in html
+    # The reply shows the message it replies to, which is earlier in the export.
+    assert html.count("first [message]") == 2
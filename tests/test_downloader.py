@@ -0,0 +1,156 @@
+import asyncio
+from collections import Counter
+from unittest.mock import MagicMock
+
+import pytest
+
+from DiscordTranscript.construct.attachment_handler import (
+    AttachmentHandler,
+    AttachmentToDataURIHandler,
+)
+from DiscordTranscript.construct.message import gather_messages
+from DiscordTranscript.ext.context import ExportContext
+from DiscordTranscript.ext.downloader import DownloadScheduler
+
+
+class FakeResponse:
+    def __init__(self, session, url):
+        self.session = session
+        self.url = url
+        self.status = 404 if url.endswith("missing") else 200
+
+    async def read(self):
+        return self.url.encode()
+
+    async def __aenter__(self):
+        host = self.url.split("/")[2]
+        self.session.in_flight[host] += 1
+        self.session.max_in_flight = max(
+            self.session.max_in_flight, sum(self.session.in_flight.values())
+        )
+        self.session.max_per_host = max(
+            self.session.max_per_host, self.session.in_flight[host]
+        )
+        await asyncio.sleep(0.01)
+        self.session.in_flight[host] -= 1
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class FakeSession:
+    closed = False
+
+    def __init__(self):
+        self.requests = []
+        self.in_flight = Counter()
+        self.max_in_flight = 0
+        self.max_per_host = 0
+
+    def get(self, url):
+        self.requests.append(url)
+        return FakeResponse(self, url)
+
+
+@pytest.mark.asyncio
+async def test_scheduler_caps_downloads_globally_and_per_host():
+    session = FakeSession()
+    scheduler = DownloadScheduler(limit=3, per_host_limit=2)
+    urls = [f"https://host{n % 2}.com/{n}" for n in range(8)] + [
+        "https://host2.com/missing"
+    ]
+
+    results = await asyncio.gather(*(scheduler.fetch(session, url) for url in urls))
+
+    assert results[0] == (200, b"https://host0.com/0")
+    assert results[-1] == (404, b"")
+    assert session.max_in_flight == 3
+    assert session.max_per_host == 2
+
+
+@pytest.mark.asyncio
+async def test_scheduler_fetches_a_url_in_flight_once():
+    session = FakeSession()
+    scheduler = DownloadScheduler()
+    url = "https://example.com/image.png"
+
+    results = await asyncio.gather(*(scheduler.fetch(session, url) for _ in range(5)))
+
+    assert results == [(200, url.encode())] * 5
+    assert session.requests == [url]
+
+
+@pytest.mark.asyncio
+async def test_handlers_share_the_export_downloads():
+    session = FakeSession()
+    handler = AttachmentToDataURIHandler(only_expiring=False, optimize_images=False)
+    attachments = [MagicMock(url="https://example.com/a.txt") for _ in range(3)]
+    for attachment in attachments:
+        attachment.content_type = "text/plain"
+
+    async with ExportContext(session=session) as context:
+        processed = await asyncio.gather(*map(handler.process_asset, attachments))
+
+    assert session.requests == ["https://example.com/a.txt"]
+    assert len({attachment.url for attachment in processed}) == 1
+    assert not context.downloads._in_flight
+
+
+class RecordingHandler(AttachmentHandler):
+    def __init__(self):
+        self.processed = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def process_asset(self, attachment):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.processed.append(attachment.filename)
+        return attachment
+
+
+@pytest.fixture
+def create_message(make_message):
+    def create_message(message_id, channel):
+        message = make_message(message_id, channel)
+        attachment = MagicMock()
+        attachment.content_type = "image/png"
+        attachment.filename = f"file{message_id}.png"
+        attachment.proxy_url = f"https://example.com/file{message_id}.png"
+        message.attachments = [attachment]
+        return message
+
+    return create_message
+
+
+@pytest.mark.asyncio
+async def test_attachments_of_upcoming_messages_are_prefetched(
+    make_channel, create_message
+):
+    channel = make_channel()
+    sequential = RecordingHandler()
+    sequential_html, _ = await gather_messages(
+        [create_message(n, channel) for n in range(6)],
+        channel.guild,
+        "UTC",
+        True,
+        sequential,
+    )
+    prefetching = RecordingHandler()
+    prefetched_html, _ = await gather_messages(
+        [create_message(n, channel) for n in range(6)],
+        channel.guild,
+        "UTC",
+        True,
+        prefetching,
+        concurrency=2,
+    )
+
+    assert prefetched_html == sequential_html
+    assert sorted(prefetching.processed) == sorted(sequential.processed)
+    assert len(prefetching.processed) == 6
+    assert sequential.max_in_flight == 1
+    assert prefetching.max_in_flight > 2
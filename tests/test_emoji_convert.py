@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+import pytest
+
+from DiscordTranscript.ext import emoji_convert
+from DiscordTranscript.ext.emoji_convert import convert, convert_emoji
+
+
+def test_index_contains_twemoji_names():
+    codepoints = emoji_convert.twemoji_codepoints
+    assert "1f600" in codepoints
+    assert "2764" in codepoints
+    assert "23-20e3" in codepoints
+    assert "1f3f3-fe0f-200d-1f308" in codepoints
+    assert "1f44d-1f3fd" in codepoints
+    assert "2764-fe0f" not in codepoints
+
+
+@pytest.mark.asyncio
+async def test_convert_emoji_makes_no_network_calls():
+    with patch("aiohttp.ClientSession", side_effect=AssertionError):
+        result = await convert_emoji("hi 😀 ❤️ 🏳️‍🌈 👍🏽")
+
+    assert result.startswith("hi ")
+    assert result.count("<img") == 4
+    assert "/72x72/1f600.png" in result
+    assert "/72x72/2764.png" in result
+    assert "/72x72/1f3f3-fe0f-200d-1f308.png" in result
+    assert "/72x72/1f44d-1f3fd.png" in result
+
+
+@pytest.mark.asyncio
+async def test_convert_falls_back_to_text_for_unknown_sequences():
+    assert await convert("→") == "→"
+    assert await convert("☐") == "☐"
+    assert await convert("é") == "é"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    ("char", "asset"),
+    [
+        ("👁️‍🗨️", "1f441-200d-1f5e8"),
+        ("🏳️‍🌈", "1f3f3-fe0f-200d-1f308"),
+        ("🏳️‍⚧️", "1f3f3-fe0f-200d-26a7-fe0f"),
+        ("🏴‍☠️", "1f3f4-200d-2620-fe0f"),
+        ("❤️‍🔥", "2764-fe0f-200d-1f525"),
+        ("🕵️‍♀️", "1f575-fe0f-200d-2640-fe0f"),
+        ("👨‍❤️‍👨", "1f468-200d-2764-fe0f-200d-1f468"),
+    ],
+)
+async def test_zwj_sequences_with_variation_selectors_use_asset_names(char, asset):
+    assert f"/72x72/{asset}.png" in await convert(char)
+
+
+def test_index_has_no_names_without_assets():
+    assert "1f441-fe0f-200d-1f5e8-fe0f" not in emoji_convert.twemoji_codepoints
+
+
+def test_images_come_from_the_release_the_index_lists():
+    with open(emoji_convert.index_path, encoding="utf-8") as f:
+        header = "".join(line for line in f if line.startswith("#"))
+
+    assert "@latest" not in emoji_convert.cdn_fmt
+    assert f"@{emoji_convert.twemoji_version}/" in emoji_convert.cdn_fmt
+    assert f"jdecked/twemoji {emoji_convert.twemoji_version} " in header
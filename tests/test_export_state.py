@@ -0,0 +1,177 @@
+import datetime
+import re
+
+import pytest
+
+from DiscordTranscript.construct.transcript import Transcript
+from DiscordTranscript.ext.export_state import ExportState
+from DiscordTranscript.ext.history import to_snowflake
+
+START = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+GENERATED_AT = re.compile(r"\d{1,2} \w+ \d{4} at \d\d:\d\d:\d\d \(UTC\)")
+
+
+@pytest.fixture
+def ticket_channel(make_author, make_channel, make_message):
+    """Creates a channel whose messages come in short bursts from two authors."""
+    authors = [make_author(1), make_author(2)]
+
+    def message_id(index):
+        return to_snowflake(START + datetime.timedelta(minutes=index)) + index
+
+    def ticket_channel(count):
+        channel = make_channel()
+        channel.count = count
+        channel.history_calls = []
+        channel.message_id = message_id
+
+        async def history(limit=100, before=None, after=None, oldest_first=None):
+            channel.history_calls.append(after)
+            after_id = to_snowflake(after, high=True)
+            messages = [
+                make_message(
+                    message_id(index),
+                    channel,
+                    f"message {index}",
+                    authors[index // 3 % 2],
+                    START + datetime.timedelta(minutes=index),
+                )
+                for index in range(channel.count)
+                if after_id is None or message_id(index) > after_id
+            ]
+            if oldest_first is None:
+                oldest_first = after is not None
+            if not oldest_first:
+                messages.reverse()
+            for message in messages[:limit]:
+                yield message
+
+        channel.history = history
+        return channel
+
+    return ticket_channel
+
+
+async def export(channel, path, state_path=None, messages=None, **kwargs):
+    await Transcript(
+        channel,
+        None,
+        messages,
+        "UTC",
+        True,
+        False,
+        None,
+        None,
+        None,
+        None,
+        output_path=path,
+        state_path=state_path,
+        **kwargs,
+    ).export()
+    return GENERATED_AT.sub("", path.read_text(encoding="utf-8"))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("count", [5, 10, 11, 12])
+async def test_appending_matches_a_full_export(tmp_path, count, ticket_channel):
+    channel = ticket_channel(count)
+    state_path = tmp_path / "state.json"
+    await export(channel, tmp_path / "ticket.html", state_path)
+    channel.count = 25
+
+    appended = await export(channel, tmp_path / "ticket.html", state_path)
+    full = await export(ticket_channel(25), tmp_path / "full.html")
+
+    assert channel.history_calls[-1].id == channel.message_id(count - 1)
+    assert appended == full
+    state = ExportState.load(state_path)
+    assert state.message_count == 25
+    assert state.meta_data[1][4] + state.meta_data[2][4] == 25
+    assert state.last_message_id == channel.message_id(24)
+
+
+@pytest.mark.asyncio
+async def test_appending_nothing_keeps_the_transcript(tmp_path, ticket_channel):
+    channel = ticket_channel(7)
+    state_path = tmp_path / "state.json"
+    first = await export(channel, tmp_path / "ticket.html", state_path)
+
+    again = await export(channel, tmp_path / "ticket.html", state_path)
+
+    assert again == first
+
+
+@pytest.mark.asyncio
+async def test_other_options_render_the_transcript_again(tmp_path, ticket_channel):
+    channel = ticket_channel(5)
+    state_path = tmp_path / "state.json"
+    await export(channel, tmp_path / "ticket.html", state_path)
+    channel.count = 8
+
+    await export(channel, tmp_path / "ticket.html", state_path, language="fr")
+
+    assert channel.history_calls[-1] is None
+    assert ExportState.load(state_path).message_count == 8
+
+
+def test_state_requires_an_output_path(tmp_path, ticket_channel):
+    with pytest.raises(ValueError):
+        Transcript(
+            ticket_channel(1),
+            None,
+            None,
+            "UTC",
+            True,
+            False,
+            None,
+            None,
+            None,
+            None,
+            state_path=tmp_path / "state.json",
+        )
+
+
+@pytest.mark.asyncio
+async def test_appending_supplied_messages(tmp_path, ticket_channel):
+    async def messages(count):
+        return [message async for message in ticket_channel(count).history(None)]
+
+    channel = ticket_channel(0)
+    state_path = tmp_path / "state.json"
+    path = tmp_path / "ticket.html"
+    await export(channel, path, state_path, messages=await messages(5))
+
+    appended = await export(channel, path, state_path, messages=await messages(9))
+    full = await export(ticket_channel(9), tmp_path / "full.html")
+
+    assert channel.history_calls == []
+    assert appended == full
+    assert ExportState.load(state_path).message_count == 9
+
+
+@pytest.mark.asyncio
+async def test_failed_append_keeps_the_transcript(tmp_path, ticket_channel, capsys):
+    channel = ticket_channel(5)
+    state_path = tmp_path / "state.json"
+    path = tmp_path / "ticket.html"
+    await export(channel, path, state_path)
+    before = path.read_bytes()
+    channel.count = 12
+    history = channel.history
+
+    async def failing_history(*args, **kwargs):
+        async for message in history(*args, **kwargs):
+            if message.id == channel.message_id(8):
+                raise RuntimeError("connection lost")
+            yield message
+
+    channel.history = failing_history
+    await export(channel, path, state_path, pipeline=True)
+
+    assert "connection lost" in capsys.readouterr().err
+    assert path.read_bytes() == before
+    assert ExportState.load(state_path).message_count == 5
+
+    channel.history = history
+    appended = await export(channel, path, state_path, pipeline=True)
+    assert appended == await export(ticket_channel(12), tmp_path / "full.html")
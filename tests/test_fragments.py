@@ -0,0 +1,145 @@
+import datetime
+import re
+from unittest.mock import MagicMock
+
+import pytest
+
+from DiscordTranscript.construct.transcript import TranscriptDAO
+from DiscordTranscript.ext.cache_backend import DiskCache, LRUCache
+
+GENERATED_AT = re.compile(r"\d{1,2} \w+ \d{4} at \d\d:\d\d:\d\d \(UTC\)")
+
+
+def create_reaction(emoji, count):
+    reaction = MagicMock()
+    reaction.emoji = emoji
+    reaction.count = count
+    return reaction
+
+
+@pytest.fixture
+def export(make_message):
+    async def export(channel, fragment_cache, changes=None):
+        changes = changes or {}
+        messages = []
+        for n in range(1, 13):
+            message = make_message(
+                n, channel, f"**message** {n}", reply_to=n - 1 if n % 4 == 3 else None
+            )
+            for name, value in changes.get(n, {}).items():
+                setattr(message, name, value)
+            messages.append(message)
+        transcript = TranscriptDAO(
+            channel,
+            None,
+            messages,
+            "UTC",
+            True,
+            False,
+            None,
+            None,
+            None,
+            None,
+            fragment_cache=fragment_cache,
+        )
+        return GENERATED_AT.sub("", (await transcript.build_transcript()).html)
+
+    return export
+
+
+@pytest.mark.asyncio
+async def test_re_export_reuses_rendered_bodies(rendered, export, make_channel):
+    channel = make_channel()
+    fragments = LRUCache(maxsize=None)
+
+    html = await export(channel, fragments)
+    first = list(rendered)
+    rendered.clear()
+    again = await export(channel, fragments)
+
+    assert sorted(first) == list(range(1, 13))
+    assert rendered == []
+    assert again == html
+
+
+@pytest.mark.asyncio
+async def test_changed_messages_are_rendered_again(rendered, export, make_channel):
+    channel = make_channel()
+    fragments = LRUCache(maxsize=None)
+
+    await export(channel, fragments)
+    rendered.clear()
+    html = await export(
+        channel,
+        fragments,
+        {
+            4: {"edited_at": datetime.datetime(2023, 1, 2)},
+            9: {"reactions": [create_reaction("👍", 2)]},
+        },
+    )
+
+    assert sorted(rendered) == [4, 9]
+    assert "(edited)" in html
+
+
+@pytest.mark.asyncio
+async def test_fragments_survive_in_a_disk_cache(
+    rendered, export, make_channel, tmp_path
+):
+    channel = make_channel()
+    fragments = DiskCache(tmp_path / "fragments.sqlite")
+    html = await export(channel, fragments)
+    fragments.close()
+
+    rendered.clear()
+    fragments = DiskCache(tmp_path / "fragments.sqlite")
+    again = await export(channel, fragments)
+    fragments.close()
+
+    assert rendered == []
+    assert again == html
+
+
+@pytest.mark.asyncio
+async def test_renewed_attachment_signatures_reuse_rendered_bodies(
+    rendered, export, make_channel
+):
+    channel = make_channel()
+    fragments = LRUCache(maxsize=None)
+    url = "https://cdn.discordapp.com/attachments/1/7/notes.txt?ex={}&is={}&hm={}"
+
+    def attachments(signature):
+        attachment = MagicMock()
+        attachment.id = 7
+        attachment.filename = "notes.txt"
+        attachment.size = 5
+        attachment.content_type = "text/plain"
+        attachment.url = attachment.proxy_url = url.format(*signature)
+        return {"attachments": [attachment]}
+
+    await export(channel, fragments, {5: attachments("abc")})
+    rendered.clear()
+    await export(channel, fragments, {5: attachments("def")})
+
+    assert rendered == []
+
+
+@pytest.mark.asyncio
+async def test_reply_previews_follow_edits_to_the_replied_message(
+    rendered, export, make_channel
+):
+    channel = make_channel()
+    fragments = LRUCache(maxsize=None)
+    edit = {
+        2: {
+            "content": "**edited** 2",
+            "edited_at": datetime.datetime(2023, 1, 2, tzinfo=datetime.timezone.utc),
+        }
+    }
+
+    await export(channel, fragments)
+    rendered.clear()
+    html = await export(channel, fragments, edit)
+
+    assert rendered == [2]
+    assert html == await export(channel, None, edit)
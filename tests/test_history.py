@@ -0,0 +1,217 @@
+import asyncio
+import datetime
+import re
+from unittest.mock import MagicMock
+
+import pytest
+
+from DiscordTranscript.construct.transcript import Transcript, TranscriptDAO
+from DiscordTranscript.ext.history import (
+    fetch_history_sharded,
+    snowflake_windows,
+    stream_history,
+    to_snowflake,
+)
+
+START = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class HistoryChannel:
+    def __init__(self, message_ids):
+        self.id = to_snowflake(START) - 10
+        self.message_ids = sorted(message_ids)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.yielded = 0
+
+    async def history(self, limit=100, before=None, after=None, oldest_first=None):
+        self.calls.append((limit, before, after))
+        before_id = to_snowflake(before)
+        after_id = to_snowflake(after, high=True)
+        selected = [
+            message_id
+            for message_id in self.message_ids
+            if (before_id is None or message_id < before_id)
+            and (after_id is None or message_id > after_id)
+        ]
+        if oldest_first is None:
+            oldest_first = after is not None
+        if not oldest_first:
+            selected.reverse()
+        if limit is not None:
+            selected = selected[:limit]
+
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            for start in range(0, len(selected), 100):
+                await asyncio.sleep(0.001)
+                for message_id in selected[start : start + 100]:
+                    self.yielded += 1
+                    yield self.create_message(message_id)
+        finally:
+            self.in_flight -= 1
+
+    def create_message(self, message_id):
+        return MagicMock(id=message_id)
+
+
+class RenderableChannel(HistoryChannel):
+    name = "test-channel"
+    type = "text"
+    topic = None
+    created_at = datetime.datetime(2020, 1, 1, tzinfo=datetime.timezone.utc)
+
+    def __init__(self, message_ids, guild, make_message):
+        super().__init__(message_ids)
+        self.guild = guild
+        self.make_message = make_message
+        self.fetch_message = MagicMock(side_effect=AssertionError("not in window"))
+
+    def create_message(self, message_id):
+        index = self.message_ids.index(message_id)
+        return self.make_message(
+            message_id,
+            self,
+            f"message {index}",
+            created_at=START + datetime.timedelta(minutes=7 * index),
+            reply_to=self.message_ids[index - 3] if index % 10 == 5 else None,
+        )
+
+
+@pytest.fixture
+def renderable_channel(make_channel, make_message):
+    def renderable_channel(message_ids):
+        return RenderableChannel(message_ids, make_channel().guild, make_message)
+
+    return renderable_channel
+
+
+def message_ids(count):
+    return [
+        to_snowflake(START + datetime.timedelta(minutes=7 * n)) + n
+        for n in range(count)
+    ]
+
+
+def test_windows_cover_the_range_once():
+    windows = snowflake_windows(10, 1000, 7)
+    covered = [value for after, before in windows for value in range(after + 1, before)]
+    assert covered == list(range(11, 1000))
+    assert snowflake_windows(10, 13, 8) == [(10, 12), (11, 13)]
+
+
+@pytest.mark.asyncio
+async def test_sharded_history_matches_a_single_iterator():
+    ids = message_ids(500)
+    channel = HistoryChannel(ids)
+    before = START + datetime.timedelta(minutes=7 * 400)
+    after = START + datetime.timedelta(minutes=7 * 30)
+
+    messages = await fetch_history_sharded(channel, 6, before=before, after=after)
+
+    expected = [
+        message.id
+        async for message in HistoryChannel(ids).history(
+            limit=None, before=before, after=after
+        )
+    ]
+    assert [message.id for message in messages] == expected
+    assert len(channel.calls) == 6
+    assert channel.max_in_flight == 6
+
+
+@pytest.mark.asyncio
+async def test_sharded_export_keeps_chronological_order(monkeypatch):
+    ids = message_ids(250)
+
+    def create_transcript(channel, history_shards):
+        return Transcript(
+            channel,
+            None,
+            None,
+            "UTC",
+            True,
+            False,
+            None,
+            None,
+            None,
+            None,
+            history_shards=history_shards,
+        )
+
+    sequential = create_transcript(HistoryChannel(ids), 1)
+    sharded_channel = HistoryChannel(ids)
+    sharded = create_transcript(sharded_channel, 4)
+
+    async def fetch_only(self):
+        return self
+
+    monkeypatch.setattr(TranscriptDAO, "build_transcript", fetch_only)
+    for transcript in (sequential, sharded):
+        await transcript.export()
+
+    assert [m.id for m in sharded.messages] == [m.id for m in sequential.messages]
+    assert [m.id for m in sharded.messages] == ids
+    assert len(sharded_channel.calls) == 4
+
+
+@pytest.mark.asyncio
+async def test_stream_history_stops_fetching_when_the_queue_is_full():
+    ids = message_ids(1000)
+    channel = HistoryChannel(ids)
+
+    history = stream_history(channel, queue_size=50)
+    first = await anext(history)
+    await asyncio.sleep(0.05)
+
+    assert first.id == ids[0]
+    assert channel.yielded <= 52
+    assert [first.id] + [message.id async for message in history] == ids
+
+
+@pytest.mark.asyncio
+async def test_sharded_stream_history_keeps_chronological_order():
+    ids = message_ids(500)
+    channel = HistoryChannel(ids)
+
+    messages = [message async for message in stream_history(channel, shards=5)]
+
+    assert [message.id for message in messages] == ids
+    assert len(channel.calls) == 5
+
+
+def create_renderable_transcript(channel, **kwargs):
+    return Transcript(
+        channel, None, None, "UTC", True, False, None, None, None, None, **kwargs
+    )
+
+
+def without_date(html):
+    return re.sub(r"\d+ \w+ \d{4} at [\d:]+ \(UTC\)", "", html)
+
+
+@pytest.mark.asyncio
+async def test_pipelined_export_matches_the_fetch_first_export(
+    tmp_path, renderable_channel
+):
+    ids = message_ids(120)
+    fetched = await create_renderable_transcript(renderable_channel(ids)).export()
+    pipelined = await create_renderable_transcript(
+        renderable_channel(ids), pipeline=True, history_shards=3
+    ).export()
+    path = tmp_path / "transcript.html"
+    streamed = await create_renderable_transcript(
+        renderable_channel(ids), pipeline=True, output_path=path
+    ).export()
+
+    assert pipelined.messages is None
+    assert pipelined.message_count == 120
+    assert "message 119" in pipelined.html
+    assert ">120<" in pipelined.html
+    assert without_date(pipelined.html) == without_date(fetched.html)
+    assert without_date(path.read_text(encoding="utf-8")) == without_date(
+        pipelined.html
+    )
+    assert streamed.bytes_written == path.stat().st_size
@@ -0,0 +1,378 @@
+import html
+import random
+import re
+
+import pytest
+
+from DiscordTranscript.ext.emoji_convert import convert_emoji
+from DiscordTranscript.parse.markdown import ParseMarkdown
+
+PRESERVE = '<div class="chatlog__markdown-preserve">'
+
+
+class LegacyParseMarkdown(ParseMarkdown):
+    """The search-and-replace implementation the single-pass one must match."""
+
+    def restore_links(self):
+        """Restores the links from placeholders."""
+        for placeholder, tag in self.links_placeholders.items():
+            self.content = self.content.replace(placeholder, tag)
+
+    async def parse_emoji(self):
+        """Parses emojis."""
+        holder = (
+            [
+                r"&lt;:.*?:(\d*)&gt;",
+                '<img class="emoji emoji--small" src="https://cdn.discordapp.com/emojis/%s.png" alt="Emoji">',
+            ],
+            [
+                r"&lt;a:.*?:(\d*)&gt;",
+                '<img class="emoji emoji--small" src="https://cdn.discordapp.com/emojis/%s.gif" alt="Emoji">',
+            ],
+            [
+                r"<:.*?:(\d*)>",
+                '<img class="emoji emoji--small" src="https://cdn.discordapp.com/emojis/%s.png" alt="Emoji">',
+            ],
+            [
+                r"<a:.*?:(\d*)>",
+                '<img class="emoji emoji--small" src="https://cdn.discordapp.com/emojis/%s.gif" alt="Emoji">',
+            ],
+        )
+
+        self.content = await convert_emoji(self.content)
+
+        for x in holder:
+            p, r = x
+            match = re.search(p, self.content)
+            while match is not None:
+                emoji_id = match.group(1)
+                self.content = self.content.replace(
+                    self.content[match.start() : match.end()], r % emoji_id
+                )
+                match = re.search(p, self.content)
+
+    def strip_preserve(self):
+        """Strips the preserve tags from the content."""
+        p = r'<div class="chatlog__markdown-preserve">(.*)</div>'
+        r = "%s"
+
+        pattern = re.compile(p)
+        match = re.search(pattern, self.content)
+        while match is not None:
+            affected_text = match.group(1)
+            self.content = self.content.replace(
+                self.content[match.start() : match.end()], r % affected_text
+            )
+            match = re.search(pattern, self.content)
+
+    def parse_code_block_markdown(self, reference=False):
+        """Parses code block markdown."""
+
+        markdown_languages = [
+            "asciidoc",
+            "autohotkey",
+            "bash",
+            "coffeescript",
+            "cpp",
+            "cs",
+            "css",
+            "diff",
+            "fix",
+            "glsl",
+            "ini",
+            "json",
+            "md",
+            "ml",
+            "prolog",
+            "py",
+            "tex",
+            "xl",
+            "xml",
+            "js",
+            "html",
+        ]
+        self.content = re.sub(r"\n", "<br>", self.content)
+
+        pattern = re.compile(r"```(.*?)```")
+        match = re.search(pattern, self.content)
+        while match is not None:
+            language_class = "nohighlight"
+            affected_text = match.group(1)
+
+            for language in markdown_languages:
+                if affected_text.lower().startswith(language):
+                    language_class = f"language-{language}"
+                    _, _, affected_text = affected_text.partition("<br>")
+
+            second_pattern = re.compile(r"^<br>|<br>$")
+            second_match = re.search(second_pattern, affected_text)
+            while second_match is not None:
+                affected_text = re.sub(r"^<br>|<br>$", "", affected_text)
+                second_match = re.search(second_pattern, affected_text)
+            affected_text = re.sub("  ", "&nbsp;&nbsp;", affected_text)
+
+            self.code_blocks_content.append(affected_text)
+            if not reference:
+                self.content = self.content.replace(
+                    self.content[match.start() : match.end()],
+                    '<div class="pre pre--multiline %s">%s</div>'
+                    % (language_class, f"%s{len(self.code_blocks_content)}"),
+                )
+            else:
+                self.content = self.content.replace(
+                    self.content[match.start() : match.end()],
+                    '<span class="pre pre-inline">%s</span>'
+                    % f"%s{len(self.code_blocks_content)}",
+                )
+
+            match = re.search(pattern, self.content)
+
+        pattern = re.compile(r"``(.*?)``")
+        match = re.search(pattern, self.content)
+        while match is not None:
+            affected_text = match.group(1)
+
+            self.code_blocks_content.append(affected_text)
+            self.content = self.content.replace(
+                self.content[match.start() : match.end()],
+                '<code class="inline">%s</code>' % f"%s{len(self.code_blocks_content)}",
+            )
+            match = re.search(pattern, self.content)
+
+        pattern = re.compile(r"`(.*?)`")
+        match = re.search(pattern, self.content)
+        while match is not None:
+            affected_text = match.group(1)
+
+            self.code_blocks_content.append(affected_text)
+            self.content = self.content.replace(
+                self.content[match.start() : match.end()],
+                '<span class="pre pre-inline">%s</span>'
+                % f"%s{len(self.code_blocks_content)}",
+            )
+            match = re.search(pattern, self.content)
+
+        self.content = re.sub(r"<br>", "\n", self.content)
+
+    def reverse_code_block_markdown(self):
+        """Reverses the code block markdown parsing."""
+        for x in range(len(self.code_blocks_content)):
+            self.content = self.content.replace(
+                f"%s{x + 1}", self.code_blocks_content[x]
+            )
+
+    def parse_masked_links(self):
+        """Parses masked links (e.g. [text](url))."""
+
+        pattern = re.compile(r"\[(.+?)]\((.+?)\)")
+        match = re.search(pattern, self.content)
+        while match is not None:
+            affected_text = match.group(1)
+            affected_url = match.group(2)
+            if affected_url.startswith("<") and affected_url.endswith(">"):
+                affected_url = affected_url[1:-1]
+
+            start_tag = f'<a href="{affected_url}" style="color: #00a8fc;">'
+            end_tag = "</a>"
+            start_ph, end_ph = self.add_link_placeholder(
+                start_tag=start_tag, end_tag=end_tag
+            )
+
+            self.content = self.content.replace(
+                self.content[match.start() : match.end()],
+                f"{start_ph}{affected_text}{end_ph}",
+            )
+            match = re.search(pattern, self.content)
+
+    def return_to_markdown(self, content):
+        """Returns the content to markdown."""
+
+        holders = (
+            [r"<strong>(.*?)</strong>", "**%s**"],
+            [r"<em>([^<>]+)</em>", "*%s*"],
+            [r"<h1[^>]*>([^<>]+)</h1>", "# %s"],
+            [r"<h2[^>]*>([^<>]+)</h2>", "## %s"],
+            [r"<h3[^>]*>([^<>]+)</h3>", "### %s"],
+            [r'<span style="text-decoration: underline">([^<>]+)</span>', "__%s__"],
+            [r'<span style="text-decoration: line-through">([^<>]+)</span>', "~~%s~~"],
+            [r'<div class="quote">(.*?)</div>', "> %s"],
+            [
+                r'<span class="spoiler spoiler--hidden" onclick="showSpoiler\(event, this\)"> <span '
+                r'class="spoiler-text">(.*?)<\/span><\/span>',
+                "||%s||",
+            ],
+            [
+                r'<span class="unix-timestamp" data-timestamp=".*?" raw-content="(.*?)">.*?</span>',
+                "%s",
+            ],
+        )
+
+        for x in holders:
+            p, r = x
+
+            pattern = re.compile(p)
+            match = re.search(pattern, content)
+            while match is not None:
+                affected_text = match.group(1)
+                content = content.replace(
+                    content[match.start() : match.end()], r % html.escape(affected_text)
+                )
+                match = re.search(pattern, content)
+
+        pattern = re.compile(r'<a href="(.*?)".*?>(.*?)</a>')
+        match = re.search(pattern, content)
+        while match is not None:
+            affected_url = match.group(1)
+            affected_text = match.group(2)
+            if affected_url != affected_text:
+                content = content.replace(
+                    content[match.start() : match.end()],
+                    "[%s](%s)" % (affected_text, affected_url),
+                )
+            else:
+                content = content.replace(
+                    content[match.start() : match.end()], "%s" % affected_url
+                )
+            match = re.search(pattern, content)
+
+        return content.lstrip().rstrip()
+
+
+PIECES = [
+    "hello",
+    "wörld",
+    "a_b",
+    "x*y",
+    " ",
+    " ",
+    "  ",
+    "\n",
+    "\n",
+    "**",
+    "__",
+    "*",
+    "_",
+    "~~",
+    "||",
+    "&lt;:e:12&gt;",
+    "&lt;a:e:34&gt;",
+    "😀",
+    "❤️",
+    "🏳️‍🌈",
+]
+
+LINE_STARTS = [
+    "# ",
+    "## ",
+    "### ",
+    "-# ",
+    "- ",
+    "  - ",
+    "    * ",
+    "1. ",
+    "3. ",
+    "&gt; ",
+    "&gt;&gt;&gt; ",
+]
+
+
+def unique_piece(rng, n):
+    return rng.choice(
+        [
+            f"`c{n}`",
+            f"``d{n} e``",
+            f"```py\nx{n} =  1\n```",
+            f"```\n\n  y{n}\n\n```",
+            f"[label {n}](https://e.com/{n})",
+            f"[**l{n}**](&lt;https://e.com/{n}&gt;)",
+            f"https://e.com/p_{n}",
+            f"&lt;https://e.com/s{n}&gt;",
+            f"(https://e.com/q{n}).",
+        ]
+    )
+
+
+def random_markdown(rng):
+    parts = []
+    unique = 0
+    for _ in range(rng.randint(1, 40)):
+        roll = rng.random()
+        if roll < 0.1 and (not parts or parts[-1] == "\n"):
+            parts.append(rng.choice(LINE_STARTS))
+        elif roll < 0.25 and unique < 9:
+            unique += 1
+            parts.append(unique_piece(rng, unique))
+        else:
+            parts.append(rng.choice(PIECES))
+    return "".join(parts)
+
+
+def random_preserved(rng):
+    parts = []
+    for _ in range(rng.randint(1, 12)):
+        parts.append(rng.choice([PRESERVE, PRESERVE, "</div>", "text", " "]))
+    return "".join(parts)
+
+
+FLOWS = [
+    "standard_message_flow",
+    "standard_embed_flow",
+    "special_embed_flow",
+    "link_embed_flow",
+    "message_reference_flow",
+    "special_emoji_flow",
+]
+
+
+async def run_flow(cls, flow, content):
+    parser = cls(content)
+    await getattr(parser, flow)()
+    return parser.content
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("flow", FLOWS)
+async def test_flows_match_legacy_implementation(flow):
+    rng = random.Random(flow)
+    for _ in range(300):
+        content = random_markdown(rng)
+        if flow == "message_reference_flow":
+            depth = rng.randint(0, 2)
+            content = PRESERVE * depth + content + "</div>" * rng.randint(0, depth + 1)
+
+        expected = await run_flow(LegacyParseMarkdown, flow, content)
+        assert await run_flow(ParseMarkdown, flow, content) == expected, content
+
+
+@pytest.mark.asyncio
+async def test_return_to_markdown_matches_legacy_implementation():
+    rng = random.Random(0)
+    for _ in range(300):
+        content = await run_flow(
+            ParseMarkdown, "standard_embed_flow", random_markdown(rng)
+        )
+        content = content.replace("\n", "<br>")
+
+        expected = LegacyParseMarkdown("").return_to_markdown(content)
+        assert ParseMarkdown("").return_to_markdown(content) == expected, content
+
+
+def test_strip_preserve_matches_legacy_implementation():
+    rng = random.Random(1)
+    for _ in range(1000):
+        content = random_preserved(rng)
+
+        legacy = LegacyParseMarkdown(content)
+        legacy.strip_preserve()
+        parser = ParseMarkdown(content)
+        parser.strip_preserve()
+        assert parser.content == legacy.content, content
+
+
+@pytest.mark.asyncio
+async def test_more_than_nine_code_blocks_are_restored():
+    content = " ".join(f"`c{n}`" for n in range(1, 13))
+    result = await run_flow(ParseMarkdown, "standard_message_flow", content)
+    assert re.findall(r'pre-inline">(.*?)</span>', result) == [
+        f"c{n}" for n in range(1, 13)
+    ]
@@ -0,0 +1,153 @@
+import asyncio
+import datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from DiscordTranscript.construct.message import gather_messages
+from DiscordTranscript.ext.context import ExportContext
+from DiscordTranscript.ext.members import MemberIndex, collect_user_ids
+
+
+def create_user(user_id):
+    user = MagicMock()
+    user.id = user_id
+    user.name = f"user{user_id}"
+    user.display_name = f"user{user_id}"
+    user.discriminator = "0"
+    user.bot = False
+    user.display_avatar = "avatar.png"
+    user.created_at = datetime.datetime(2020, 1, 1)
+    user.joined_at = None
+    return user
+
+
+def create_member(user_id):
+    member = create_user(user_id)
+    member.colour = "#ff0000"
+    member.display_icon = None
+    member.top_role = None
+    return member
+
+
+def create_message(message_id, author, mentions=(), interaction_user=None):
+    message = MagicMock()
+    message.id = message_id
+    message.content = " ".join(f"<@{user.id}>" for user in mentions) or "hello"
+    message.created_at = datetime.datetime(2023, 1, 1, 12, message_id)
+    message.edited_at = None
+    message.author = author
+    message.mentions = list(mentions)
+    message.attachments = []
+    message.embeds = []
+    message.stickers = []
+    message.reactions = []
+    message.components = []
+    message.interaction = None
+    message.interaction_metadata = None
+    if interaction_user is not None:
+        message.interaction_metadata = MagicMock(user=interaction_user)
+    message.reference = None
+    return message
+
+
+def create_guild(cached=(), query_members=None):
+    guild = MagicMock()
+    guild.id = 2
+    members = {user_id: create_member(user_id) for user_id in cached}
+    guild.get_member = members.get
+    guild.fetch_member = AsyncMock(side_effect=create_member)
+    guild.query_members = query_members or AsyncMock(
+        side_effect=lambda user_ids, **_: [create_member(n) for n in user_ids]
+    )
+    return guild
+
+
+def test_collect_user_ids_covers_authors_mentions_and_interactions():
+    users = [create_user(n) for n in range(5)]
+    messages = [
+        create_message(0, users[0], mentions=[users[1]]),
+        create_message(1, users[1], interaction_user=users[2]),
+        create_message(2, users[0], mentions=[users[3], users[0]]),
+    ]
+
+    assert collect_user_ids(messages) == [0, 1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_resolve_queries_uncached_members_in_batches():
+    guild = create_guild(cached=[0, 1])
+    index = MemberIndex(guild)
+
+    await index.resolve(range(250))
+    await index.resolve(range(250))
+
+    batches = [call.kwargs["user_ids"] for call in guild.query_members.call_args_list]
+    assert [len(batch) for batch in batches] == [100, 100, 48]
+    assert sorted(sum(batches, [])) == list(range(2, 250))
+    assert (await index.get(120)).id == 120
+    guild.fetch_member.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_resolve_falls_back_to_fetch_member():
+    guild = create_guild(
+        query_members=AsyncMock(side_effect=RuntimeError("members intent"))
+    )
+    guild.fetch_member = AsyncMock(
+        side_effect=lambda user_id: create_member(user_id) if user_id % 2 else None
+    )
+    index = MemberIndex(guild)
+
+    await index.resolve([1, 2, 3])
+
+    assert guild.fetch_member.await_count == 3
+    assert (await index.get(3)).id == 3
+    assert await index.get(2) is None
+    assert guild.fetch_member.await_count == 3
+
+
+@pytest.mark.asyncio
+async def test_fetch_member_fallback_is_limited():
+    guild = create_guild(
+        query_members=AsyncMock(side_effect=RuntimeError("members intent"))
+    )
+    in_flight = []
+    most = 0
+
+    async def fetch_member(user_id):
+        nonlocal most
+        in_flight.append(user_id)
+        most = max(most, len(in_flight))
+        await asyncio.sleep(0.001)
+        in_flight.remove(user_id)
+        return create_member(user_id)
+
+    guild.fetch_member = fetch_member
+    index = MemberIndex(guild, limit=4)
+
+    await index.resolve(range(30))
+
+    assert most == 4
+    assert all(index.peek(n).id == n for n in range(30))
+
+
+@pytest.mark.asyncio
+async def test_rendering_reads_members_from_one_bulk_query():
+    users = [create_user(n) for n in range(1, 4)]
+    guild = create_guild()
+    messages = [
+        create_message(n, users[n % 2], mentions=[users[2]], interaction_user=users[0])
+        for n in range(6)
+    ]
+
+    async with ExportContext() as context:
+        html, meta_data = await gather_messages(
+            messages, guild, "UTC", True, None, context=context
+        )
+
+    guild.query_members.assert_awaited_once()
+    assert guild.query_members.call_args.kwargs["user_ids"] == [1, 3, 2]
+    assert "#ff0000" in html
+    assert "@user3" in html
+    assert set(meta_data) == {1, 2}
@@ -0,0 +1,290 @@
+import datetime
+import random
+import re
+import time
+from types import SimpleNamespace
+
+import pytest
+import pytz
+
+from DiscordTranscript.parse.markdown import ParseMarkdown
+from DiscordTranscript.parse.mention import ParseMention
+
+
+class LegacyParseMention(ParseMention):
+    """The per-kind search-and-replace loops the single-pass scanner must match."""
+
+    async def flow(self):
+        """The main flow for parsing mentions.
+
+        Returns:
+            str: The parsed content.
+        """
+        markdown = ParseMarkdown(self.content)
+        markdown.parse_code_block_markdown()
+        self.content = markdown.content
+        await self.escape_mentions()
+        await self.escape_mentions()
+        await self.unescape_mentions()
+        await self.channel_mention()
+        await self.member_mention()
+        await self.role_mention()
+        await self.time_mention()
+        await self.slash_command_mention()
+        markdown.content = self.content
+        markdown.reverse_code_block_markdown()
+        self.content = markdown.content
+        return self.content
+
+    async def channel_mention(self):
+        """Parses channel mentions."""
+        holder = self.REGEX_CHANNELS, self.REGEX_CHANNELS_2
+        for regex in holder:
+            match = re.search(regex, self.content)
+            while match is not None:
+                channel_id = int(match.group(1))
+                channel = self.guild.get_channel(channel_id)
+
+                if channel is None:
+                    replacement = "#deleted-channel"
+                else:
+                    replacement = '<span class="mention" title="%s">#%s</span>' % (
+                        channel.id,
+                        channel.name,
+                    )
+                self.content = self.content.replace(
+                    self.content[match.start() : match.end()], replacement
+                )
+
+                match = re.search(regex, self.content)
+
+    async def role_mention(self):
+        """Parses role mentions."""
+        holder = self.REGEX_EVERYONE, self.REGEX_HERE
+        for regex in holder:
+            match = re.search(regex, self.content)
+            while match is not None:
+                role_name = match.group(1)
+                replacement = '<span class="mention" title="%s">@%s</span>' % (
+                    str(role_name),
+                    str(role_name),
+                )
+
+                self.content = self.content.replace(
+                    self.content[match.start() : match.end()], replacement
+                )
+                match = re.search(regex, self.content)
+        holder = self.REGEX_ROLES, self.REGEX_ROLES_2
+        for regex in holder:
+            match = re.search(regex, self.content)
+            while match is not None:
+                role_id = int(match.group(1))
+                role = self.guild.get_role(role_id)
+
+                if role is None:
+                    replacement = "@deleted-role"
+                else:
+                    if role.color.r == 0 and role.color.g == 0 and role.color.b == 0:
+                        colour = "#dee0fc"
+                        bg_colour = "rgba(88, 101, 242, 0.3)"
+                    else:
+                        colour = "#%02x%02x%02x" % (
+                            role.color.r,
+                            role.color.g,
+                            role.color.b,
+                        )
+                        bg_colour = "rgba(%s, %s, %s, 0.1)" % (
+                            role.color.r,
+                            role.color.g,
+                            role.color.b,
+                        )
+                    replacement = (
+                        '<span class="mention" style="color: %s; background-color: %s;" title="%s">@%s</span>'
+                        % (
+                            colour,
+                            bg_colour,
+                            role.id,
+                            role.name,
+                        )
+                    )
+                self.content = self.content.replace(
+                    self.content[match.start() : match.end()], replacement
+                )
+                match = re.search(regex, self.content)
+
+    async def slash_command_mention(self):
+        """Parses slash command mentions."""
+        match = re.search(self.REGEX_SLASH_COMMAND, self.content)
+        while match is not None:
+            slash_command_name = match.group(1)
+            replacement = '<span class="mention" title="%s">/%s</span>' % (
+                slash_command_name,
+                slash_command_name,
+            )
+            self.content = self.content.replace(
+                self.content[match.start() : match.end()], replacement
+            )
+
+            match = re.search(self.REGEX_SLASH_COMMAND, self.content)
+
+    async def member_mention(self):
+        """Parses member mentions."""
+        holder = self.REGEX_MEMBERS, self.REGEX_MEMBERS_2
+        for regex in holder:
+            match = re.search(regex, self.content)
+            while match is not None:
+                member_id = int(match.group(1))
+
+                member = None
+                try:
+                    member = self.guild.get_member(member_id)
+                    if not member and self.bot:
+                        member = self.bot.get_user(member_id)
+                    member_name = member.display_name
+                except AttributeError:
+                    member_name = member
+
+                if member is not None:
+                    replacement = '<span class="mention" title="%s">@%s</span>' % (
+                        str(member_id),
+                        str(member_name),
+                    )
+                else:
+                    replacement = '<span class="mention" title="%s">&lt;@%s></span>' % (
+                        str(member_id),
+                        str(member_id),
+                    )
+                self.content = self.content.replace(
+                    self.content[match.start() : match.end()], replacement
+                )
+
+                match = re.search(regex, self.content)
+
+    async def time_mention(self):
+        """Parses time mentions."""
+        holder = self.REGEX_TIME_HOLDER
+
+        for p in holder:
+            regex, strf = p
+            match = re.search(regex, self.content)
+            while match is not None:
+                timestamp = int(match.group(1)) - 1
+                time_stamp = time.gmtime(timestamp)
+                datetime_stamp = datetime.datetime(
+                    2010, *time_stamp[1:6], tzinfo=pytz.utc
+                )
+                ui_time = datetime_stamp.strftime(strf)
+                ui_time = ui_time.replace(str(datetime_stamp.year), str(time_stamp[0]))
+                tooltip_time = datetime_stamp.strftime("%A, %e %B %Y at %H:%M")
+                tooltip_time = tooltip_time.replace(
+                    str(datetime_stamp.year), str(time_stamp[0])
+                )
+                original = match.group().replace("&lt;", "<").replace("&gt;", ">")
+                replacement = (
+                    f'<span class="unix-timestamp" data-timestamp="{tooltip_time}" raw-content="{original}">'
+                    f"{ui_time}</span>"
+                )
+
+                self.content = self.content.replace(
+                    self.content[match.start() : match.end()], replacement
+                )
+
+                match = re.search(regex, self.content)
+
+
+class Guild:
+    def __init__(self):
+        self.channels = {1: SimpleNamespace(id=1, name="general")}
+        self.members = {1: SimpleNamespace(display_name="Alice")}
+        self.roles = {
+            5: SimpleNamespace(
+                id=5, name="Mods", color=SimpleNamespace(r=255, g=0, b=0)
+            ),
+            6: SimpleNamespace(
+                id=6, name="Plain", color=SimpleNamespace(r=0, g=0, b=0)
+            ),
+        }
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+    def get_role(self, role_id):
+        return self.roles.get(role_id)
+
+
+class Bot:
+    def get_user(self, user_id):
+        return SimpleNamespace(display_name="Bob") if user_id == 2 else None
+
+
+PIECES = [
+    "hello",
+    " ",
+    " ",
+    "\n",
+    "\t",
+    "<#1>",
+    "&lt;#1&gt;",
+    "<#3>",
+    "<@1>",
+    "<@!2>",
+    "&lt;@1&gt;",
+    "&lt;@!404&gt;",
+    "<@&5>",
+    "&lt;@&amp;6&gt;",
+    "<@&7>",
+    "@everyone",
+    "@here",
+    "@everyone,",
+    "&lt;t:1622548800&gt;",
+    "&lt;/cmd:1&gt;",
+    "&lt;/cmd sub:12&gt;",
+    "&lt;:emoji:12&gt;",
+    "&lt;",
+    "&gt;",
+    "`<@1>`",
+    "```\n<#1>\n```",
+]
+
+
+def random_message(rng):
+    parts = [rng.choice(PIECES) for _ in range(rng.randint(1, 30))]
+    if rng.random() < 0.3:
+        style = rng.choice("tTdDfFR")
+        parts.insert(
+            rng.randint(0, len(parts)), f"&lt;t:{rng.randint(0, 2**31)}:{style}&gt;"
+        )
+    # A bare "@everyone" at the very end made the old loops replace every
+    # "@everyone" prefix in the message, see test_everyone_needs_a_separator.
+    return "".join(parts) + "."
+
+
+async def render(cls, content, guild, bot):
+    try:
+        return await cls(content, guild, bot=bot).flow()
+    except ValueError as e:
+        return type(e)
+
+
+@pytest.mark.asyncio
+async def test_flow_matches_legacy_implementation():
+    rng = random.Random(0)
+    guild = Guild()
+    for _ in range(1000):
+        content = random_message(rng)
+        bot = Bot() if rng.random() < 0.5 else None
+
+        assert await render(ParseMention, content, guild, bot) == await render(
+            LegacyParseMention, content, guild, bot
+        ), content
+
+
+@pytest.mark.asyncio
+async def test_everyone_needs_a_separator():
+    result = await ParseMention("@everyone, @everyone", Guild()).flow()
+    assert (
+        result == '@everyone, <span class="mention" title="everyone">@everyone</span>'
+    )
@@ -0,0 +1,99 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from DiscordTranscript.construct.attachment_handler import AttachmentHandler
+from DiscordTranscript.construct.message import gather_messages
+
+
+class SlowAttachmentHandler(AttachmentHandler):
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def process_asset(self, attachment):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return attachment
+
+
+async def fetch_sticker():
+    await asyncio.sleep(0.02)
+    sticker = MagicMock()
+    sticker.id = 7
+    sticker.pack_id = 3
+    return sticker
+
+
+@pytest.fixture
+def create_messages(make_author, make_channel, make_message):
+    channel = make_channel()
+
+    def create_message(message_id, content, reply_to=None):
+        message = make_message(
+            message_id,
+            channel,
+            content,
+            make_author(message_id % 2),
+            reply_to=reply_to,
+        )
+        attachment = MagicMock()
+        attachment.content_type = "image/png"
+        attachment.filename = f"file{message_id}.png"
+        attachment.proxy_url = f"https://example.com/file{message_id}.png"
+        message.attachments = [attachment]
+        return message
+
+    def create_messages():
+        first = create_message(1, "first message")
+        first.stickers = [MagicMock(url="https://example.com/sticker.json")]
+        first.stickers[0].fetch = fetch_sticker
+        return [
+            first,
+            create_message(2, "second message"),
+            create_message(3, "reply to the first", reply_to=1),
+            create_message(4, "fourth message"),
+            create_message(5, "reply to the fourth", reply_to=4),
+        ]
+
+    return create_messages
+
+
+async def render(messages, concurrency):
+    handler = SlowAttachmentHandler()
+    html, meta_data = await gather_messages(
+        messages,
+        messages[0].channel.guild,
+        "UTC",
+        True,
+        handler,
+        concurrency=concurrency,
+    )
+    return html, meta_data, handler
+
+
+@pytest.mark.asyncio
+async def test_concurrent_rendering_matches_sequential(create_messages):
+    sequential_html, sequential_meta, sequential_handler = await render(
+        create_messages(), 1
+    )
+    concurrent_html, concurrent_meta, concurrent_handler = await render(
+        create_messages(), 4
+    )
+
+    assert sequential_handler.max_in_flight == 1
+    assert concurrent_handler.max_in_flight > 1
+    assert concurrent_html == sequential_html
+    assert list(concurrent_meta) == list(sequential_meta)
+    assert [v[4] for v in concurrent_meta.values()] == [3, 2]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_reply_uses_rendered_reference(create_messages):
+    html, _, _ = await render(create_messages(), 8)
+
+    reply = html[html.index("scrollToMessage(event, '1')") :]
+    assert reply.index("stickers/3/7.gif") < reply.index("reply to the first")
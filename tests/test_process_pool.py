@@ -0,0 +1,115 @@
+import datetime
+import io
+import pickle
+from unittest.mock import MagicMock
+
+import discord
+import pytest
+
+from DiscordTranscript.construct.message import stream_messages
+from DiscordTranscript.construct.process_pool import stream_messages_in_processes
+from DiscordTranscript.ext.context import ExportContext
+from DiscordTranscript.ext.snapshot import MessageSnapshot
+from DiscordTranscript.ext.writer import RecordWriter
+
+START = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+@pytest.fixture
+def channel(make_channel, make_message):
+    channel = make_channel()
+
+    async def fetch_message(message_id):
+        if message_id == 1:
+            return make_message(1, channel, "an older message")
+        raise type("NotFound", (Exception,), {})()
+
+    channel.fetch_message = fetch_message
+    return channel
+
+
+@pytest.fixture
+def create_messages(make_author, make_message):
+    authors = [make_author(1), make_author(2)]
+
+    def create_messages(channel):
+        messages = [
+            make_message(
+                100 + index,
+                channel,
+                f"**message** {index} <@1>",
+                authors[index // 3 % 2],
+                START + datetime.timedelta(minutes=index),
+            )
+            for index in range(10)
+        ]
+        messages[4].reference = MagicMock(message_id=101, channel_id=42)
+        messages[7].reference = MagicMock(message_id=1, channel_id=42)
+        messages[8].reference = MagicMock(message_id=2, channel_id=42)
+        messages[9].embeds = [discord.Embed(title="Embed", description="<@2>")]
+        messages[9].reactions = [MagicMock(emoji="👍", count=3)]
+        return messages
+
+    return create_messages
+
+
+@pytest.mark.asyncio
+async def test_process_rendering_matches_in_process_rendering(channel, create_messages):
+    expected_meta_data = {}
+    expected_records = io.StringIO()
+    async with ExportContext() as context:
+        context.records = RecordWriter(expected_records)
+        expected = "".join(
+            [
+                chunk
+                async for chunk in stream_messages(
+                    create_messages(channel),
+                    channel.guild,
+                    "UTC",
+                    True,
+                    None,
+                    expected_meta_data,
+                    context=context,
+                )
+            ]
+        )
+
+    meta_data = {}
+    records = io.StringIO()
+    async with ExportContext() as context:
+        context.records = RecordWriter(records)
+        html = "".join(
+            [
+                chunk
+                async for chunk in stream_messages_in_processes(
+                    create_messages(channel),
+                    channel.guild,
+                    "UTC",
+                    True,
+                    None,
+                    meta_data,
+                    processes=2,
+                    context=context,
+                    chunk_size=3,
+                )
+            ]
+        )
+
+    assert html == expected
+    assert "an older message" in html
+    assert list(meta_data) == list(expected_meta_data) == [1, 2]
+    assert [data[4] for data in meta_data.values()] == [6, 4]
+    assert records.getvalue() == expected_records.getvalue()
+    assert context.records.count == 10
+
+
+def test_message_snapshots_pickle(channel, create_messages):
+    message = create_messages(channel)[9]
+
+    snapshot = pickle.loads(pickle.dumps(MessageSnapshot.of(message)))
+
+    assert snapshot.type == discord.MessageType.default
+    assert snapshot.author.display_name == "User 2"
+    assert snapshot.embeds[0].description == "<@2>"
+    assert snapshot.reactions[0].emoji == "👍"
+    assert snapshot.channel.id == 42
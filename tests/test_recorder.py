@@ -0,0 +1,173 @@
+import datetime
+import re
+from unittest.mock import MagicMock
+
+import pytest
+
+from DiscordTranscript.construct.recorder import TranscriptRecorder
+from DiscordTranscript.construct.transcript import TranscriptDAO
+
+START = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+GENERATED_AT = re.compile(r"\d{1,2} \w+ \d{4} at \d\d:\d\d:\d\d \(UTC\)")
+
+
+@pytest.fixture
+def ticket_channel(make_channel):
+    """Creates a channel whose history must not be fetched."""
+
+    def ticket_channel(channel_id=42):
+        channel = make_channel(channel_id)
+        channel.history = MagicMock(side_effect=AssertionError("history fetched"))
+        channel.fetch_message = MagicMock(side_effect=AssertionError("message fetched"))
+        return channel
+
+    return ticket_channel
+
+
+@pytest.fixture
+def create_message(make_author, make_message):
+    """Creates the ``index``-th message of a channel, in bursts of three."""
+    authors = [make_author(1), make_author(2)]
+
+    def create_message(channel, index, reply_to=None):
+        return make_message(
+            1000 + index,
+            channel,
+            f"**message** {index}",
+            authors[index // 3 % 2],
+            START + datetime.timedelta(minutes=index),
+            None if reply_to is None else 1000 + reply_to,
+        )
+
+    return create_message
+
+
+async def full_export(channel, messages, path):
+    await TranscriptDAO(
+        channel,
+        None,
+        messages,
+        "UTC",
+        True,
+        True,
+        None,
+        None,
+        None,
+        None,
+        output_path=path,
+    ).build_transcript()
+    return read(path)
+
+
+def read(path):
+    return GENERATED_AT.sub("", path.read_text(encoding="utf-8"))
+
+
+@pytest.mark.asyncio
+async def test_recorded_transcript_matches_a_full_export(
+    tmp_path, ticket_channel, create_message
+):
+    channel = ticket_channel()
+    recorder = TranscriptRecorder(channel, tmp_path / "ticket.html")
+    for index in range(14):
+        reply_to = index - 4 if index % 5 == 4 else None
+        await recorder.on_message(create_message(channel, index, reply_to))
+
+    path = await recorder.finalize()
+
+    expected = [
+        create_message(channel, index, index - 4 if index % 5 == 4 else None)
+        for index in range(14)
+    ]
+    assert read(tmp_path / "ticket.html") == await full_export(
+        channel, expected, tmp_path / "full.html"
+    )
+    assert path == str(tmp_path / "ticket.html")
+    assert recorder.messages[1004].content == "**message** 4"
+
+
+@pytest.mark.asyncio
+async def test_changes_render_only_the_changed_messages(
+    tmp_path, rendered, ticket_channel, create_message
+):
+    channel = ticket_channel()
+    recorder = TranscriptRecorder(channel, tmp_path / "ticket.html")
+    messages = [create_message(channel, index) for index in range(6)]
+    for message in messages:
+        await recorder.on_message(message)
+    other = ticket_channel(43)
+    await recorder.on_message(create_message(other, 9))
+    rendered.clear()
+
+    edited = create_message(channel, 2)
+    edited.content = "edited"
+    edited.edited_at = START + datetime.timedelta(hours=1)
+    await recorder.on_message_edit(messages[2], edited)
+    reaction = MagicMock(emoji="👍", count=1, message=messages[4])
+    messages[4].reactions = [reaction]
+    await recorder.on_reaction_add(reaction, messages[0].author)
+    await recorder.on_message_delete(messages[0])
+    assert recorder.stale
+    await recorder.finalize()
+
+    assert sorted(rendered) == [1002, 1004]
+    assert list(recorder.messages) == [1001, 1002, 1003, 1004, 1005]
+    html = read(tmp_path / "ticket.html")
+    assert "edited" in html
+    assert "message</strong> 0" not in html
+    assert html == await full_export(
+        channel,
+        [edited if m is messages[2] else m for m in messages[1:]],
+        tmp_path / "full.html",
+    )
+
+
+@pytest.mark.asyncio
+async def test_restarted_recorder_appends_to_the_transcript(
+    tmp_path, rendered, ticket_channel, create_message
+):
+    channel = ticket_channel()
+    messages = [create_message(channel, index) for index in range(10)]
+    recorder = TranscriptRecorder(channel, tmp_path / "ticket.html")
+    for message in messages[:6]:
+        await recorder.on_message(message)
+    await recorder.finalize()
+    rendered.clear()
+
+    recorder = TranscriptRecorder(channel, tmp_path / "ticket.html")
+    assert not recorder.stale
+    await recorder.on_message(messages[5])
+    for message in messages[6:]:
+        await recorder.on_message(message)
+    await recorder.finalize()
+
+    assert rendered == [1006, 1007, 1008, 1009]
+    assert read(tmp_path / "ticket.html") == await full_export(
+        channel, messages, tmp_path / "full.html"
+    )
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_is_retried(
+    tmp_path, monkeypatch, ticket_channel, create_message
+):
+    channel = ticket_channel()
+    messages = [create_message(channel, index) for index in range(4)]
+    recorder = TranscriptRecorder(channel, tmp_path / "ticket.html")
+    await recorder.on_message(messages[0])
+    build_transcript = TranscriptDAO.build_transcript
+
+    async def failing(self):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(TranscriptDAO, "build_transcript", failing)
+    with pytest.raises(OSError):
+        await recorder.on_message(messages[1])
+    monkeypatch.setattr(TranscriptDAO, "build_transcript", build_transcript)
+    for message in messages[2:]:
+        await recorder.on_message(message)
+    await recorder.finalize()
+
+    assert read(tmp_path / "ticket.html") == await full_export(
+        channel, messages, tmp_path / "full.html"
+    )
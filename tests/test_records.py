@@ -0,0 +1,134 @@
+import datetime
+import io
+import json
+import re
+from unittest.mock import MagicMock
+
+import discord
+import pytest
+
+from DiscordTranscript.construct.attachment_handler import AttachmentToDataURIHandler
+from DiscordTranscript.construct.transcript import TranscriptDAO
+from DiscordTranscript.ext.cache_backend import LRUCache
+from DiscordTranscript.ext.snapshot import ColourSnapshot, RoleSnapshot
+
+START = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+GENERATED_AT = re.compile(r"\d{1,2} \w+ \d{4} at \d\d:\d\d:\d\d \(UTC\)")
+
+
+@pytest.fixture
+def channel(make_author, make_channel):
+    channel = make_channel()
+    members = {2: make_author(2, "Bob the Builder")}
+    roles = {5: RoleSnapshot(5, "staff", ColourSnapshot(0xFF0000))}
+    channel.guild.get_member.side_effect = members.get
+    channel.guild.get_role.side_effect = roles.get
+    channel.guild.get_channel.side_effect = {42: channel}.get
+    return channel
+
+
+class Attachment:
+    id = 7
+    filename = "notes.txt"
+    size = 5
+    content_type = "text/plain"
+
+    def __init__(self):
+        self.url = "https://cdn.discordapp.com/attachments/1/7/notes.txt"
+        self.proxy_url = self.url
+
+
+@pytest.fixture
+def create_messages(make_author, make_message):
+    def create_messages(channel):
+        messages = [
+            make_message(
+                100 + index,
+                channel,
+                f"**message** {index}",
+                make_author(1),
+                START + datetime.timedelta(minutes=index),
+            )
+            for index in range(3)
+        ]
+        messages[1].content = "hey <@2>, ask <@&5> in <#42> <:blob:123> @everyone now"
+        messages[1].mentions = [make_author(2)]
+        messages[1].attachments = [Attachment()]
+        messages[1].embeds = [discord.Embed(title="Embed", colour=0x123456)]
+        messages[1].reactions = [MagicMock(emoji="👍", count=2)]
+        return messages
+
+    return create_messages
+
+
+@pytest.fixture(autouse=True)
+def fetch_asset(monkeypatch):
+    async def fetch_asset(url, session=None):
+        return 200, b"notes"
+
+    monkeypatch.setattr(
+        "DiscordTranscript.construct.attachment_handler.fetch_asset", fetch_asset
+    )
+
+
+@pytest.fixture
+def export(create_messages):
+    async def export(channel, ndjson_fp=None, fragment_cache=None):
+        transcript = TranscriptDAO(
+            channel,
+            None,
+            create_messages(channel),
+            "UTC",
+            True,
+            False,
+            None,
+            None,
+            None,
+            AttachmentToDataURIHandler(),
+            ndjson_fp=ndjson_fp,
+            fragment_cache=fragment_cache,
+        )
+        return GENERATED_AT.sub("", (await transcript.build_transcript()).html)
+
+    return export
+
+
+def read_records(fp):
+    return [json.loads(line) for line in fp.getvalue().splitlines()]
+
+
+@pytest.mark.asyncio
+async def test_records_are_written_with_the_html(channel, export):
+    records = io.StringIO()
+
+    html = await export(channel, ndjson_fp=records)
+
+    assert html == await export(channel)
+    lines = read_records(records)
+    assert [line["id"] for line in lines] == [100, 101, 102]
+    record = lines[1]
+    assert record["type"] == "default"
+    assert record["author"]["display_name"] == "User 1"
+    assert record["text"] == (
+        "hey @Bob the Builder, ask @staff in #ticket-1 :blob: @everyone now"
+    )
+    assert [user["display_name"] for user in record["mentions"]["users"]] == [
+        "Bob the Builder"
+    ]
+    assert record["mentions"]["roles"][0]["name"] == "staff"
+    assert record["mentions"]["channels"][0]["name"] == "ticket-1"
+    assert record["attachments"][0]["url"] == "data:text/plain;base64,bm90ZXM="
+    assert record["embeds"][0]["title"] == "Embed"
+    assert record["reactions"] == [{"emoji": "👍", "count": 2}]
+
+
+@pytest.mark.asyncio
+async def test_records_of_cached_bodies_keep_processed_attachments(channel, export):
+    fragments = LRUCache(maxsize=None)
+    first, again = io.StringIO(), io.StringIO()
+
+    await export(channel, ndjson_fp=first, fragment_cache=fragments)
+    await export(channel, ndjson_fp=again, fragment_cache=fragments)
+
+    assert read_records(again) == read_records(first)
+    assert read_records(again)[1]["attachments"][0]["url"].startswith("data:")
@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from DiscordTranscript.construct.transcript import TranscriptDAO
+from DiscordTranscript.ext.cache_backend import LRUCache
+from DiscordTranscript.ext.references import ReferenceIndex
+
+
+class NotFound(Exception):  # noqa: N818 - matched by name, like discord.NotFound
+    pass
+
+
+@pytest.fixture
+def reply_channel(make_channel, make_message):
+    """Creates a channel whose old messages can only be fetched, some deleted."""
+
+    def reply_channel(deleted=(), delay=0.01):
+        channel = make_channel(1, "support")
+        channel.fetches = []
+        channel.in_flight = 0
+        channel.max_in_flight = 0
+
+        async def fetch_message(message_id):
+            channel.fetches.append(message_id)
+            channel.in_flight += 1
+            channel.max_in_flight = max(channel.max_in_flight, channel.in_flight)
+            try:
+                await asyncio.sleep(delay)
+            finally:
+                channel.in_flight -= 1
+            if message_id in deleted:
+                raise NotFound()
+            return make_message(message_id, channel)
+
+        channel.fetch_message = fetch_message
+        return channel
+
+    return reply_channel
+
+
+@pytest.mark.asyncio
+async def test_get_remembers_found_and_deleted_messages(reply_channel):
+    channel = reply_channel(deleted=[2])
+    index = ReferenceIndex()
+
+    assert (await index.get(channel, 1)).id == 1
+    assert await index.get(channel, 2) is None
+    assert (await index.get(channel, 1)).id == 1
+    assert await index.get(channel, 2) is None
+    assert channel.fetches == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_get_does_not_remember_other_errors(reply_channel):
+    channel = reply_channel()
+    index = ReferenceIndex()
+
+    async def forbidden(message_id):
+        channel.fetches.append(message_id)
+        raise RuntimeError("Forbidden")
+
+    channel.fetch_message = forbidden
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await index.get(channel, 1)
+    assert channel.fetches == [1, 1]
+
+
+@pytest.mark.asyncio
+async def test_resolve_fetches_concurrently_within_the_limit(reply_channel):
+    channel = reply_channel(deleted=[5])
+    index = ReferenceIndex(limit=4)
+
+    await index.resolve([(channel, n % 10) for n in range(30)])
+
+    assert sorted(channel.fetches) == list(range(10))
+    assert channel.max_in_flight == 4
+
+
+@pytest.fixture
+def export(make_message):
+    async def export(channel, cache_backend):
+        messages = [
+            make_message(100 + n, channel, reply_to=n % 12 if n % 3 else None)
+            for n in range(24)
+        ]
+        transcript = TranscriptDAO(
+            channel,
+            None,
+            messages,
+            "UTC",
+            True,
+            False,
+            None,
+            None,
+            None,
+            None,
+            cache_backend=cache_backend,
+        )
+        return (await transcript.build_transcript()).html
+
+    return export
+
+
+@pytest.mark.asyncio
+async def test_export_fetches_missing_reply_targets_once(reply_channel, export):
+    channel = reply_channel(deleted=[4, 7])
+    backend = LRUCache(maxsize=64)
+
+    html = await export(channel, backend)
+    again = await export(channel, backend)
+
+    assert sorted(channel.fetches) == [n for n in range(12) if n % 3]
+    assert channel.max_in_flight > 1
+    assert html.count("Original message was deleted.") == 4
+    assert again.count("chatlog__reference") == html.count("chatlog__reference")
@@ -0,0 +1,135 @@
+import datetime
+import json
+import pickle
+from unittest.mock import MagicMock
+
+import discord
+import pytest
+
+from DiscordTranscript.construct.attachment_handler import AttachmentToDataURIHandler
+from DiscordTranscript.construct.message import stream_messages
+from DiscordTranscript.ext.snapshot import (
+    AttachmentSnapshot,
+    MessageSnapshot,
+    UserSnapshot,
+)
+
+START = datetime.datetime(2023, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+class Attachment:
+    id = 7
+    filename = "notes.txt"
+    size = 5
+    content_type = "text/plain"
+
+    def __init__(self):
+        self.url = "https://cdn.discordapp.com/attachments/1/7/notes.txt"
+        self.proxy_url = self.url
+
+
+@pytest.fixture
+def create_messages(make_author, make_message):
+    def create_messages(channel):
+        messages = [
+            make_message(
+                100 + index,
+                channel,
+                f"**message** {index}",
+                make_author(index % 2 + 1),
+                START + datetime.timedelta(minutes=index),
+            )
+            for index in range(3)
+        ]
+        messages[1].embeds = [
+            discord.Embed(title="Embed", description="text", colour=0x123456)
+            .add_field(name="Field", value="value")
+            .set_footer(text="footer")
+        ]
+        messages[1].attachments = [Attachment()]
+        messages[2].reference = MagicMock(message_id=100, channel_id=42)
+        return messages
+
+    return create_messages
+
+
+async def render(messages, guild, attachment_handler=None):
+    return "".join(
+        [
+            chunk
+            async for chunk in stream_messages(
+                messages, guild, "UTC", True, attachment_handler, {}
+            )
+        ]
+    )
+
+
+def test_snapshots_are_immutable(make_author):
+    author = UserSnapshot.of(make_author(1))
+
+    with pytest.raises(AttributeError):
+        author.name = "someone else"
+    with pytest.raises(AttributeError):
+        author.nickname = "someone else"
+
+    renamed = author.replace(name="someone else")
+    assert (author.name, renamed.name) == ("user1", "someone else")
+    assert renamed.id == author.id
+
+
+def test_message_snapshots_round_trip(make_channel, create_messages):
+    message = create_messages(make_channel())[1]
+    snapshot = MessageSnapshot.of(message)
+
+    data = json.loads(json.dumps(snapshot.to_dict()))
+
+    assert MessageSnapshot.from_dict(data) == snapshot
+    assert pickle.loads(pickle.dumps(snapshot)) == snapshot
+    assert snapshot.embeds[0].colour.r == 0x12
+    assert snapshot.embeds[0].author is None
+
+
+@pytest.mark.asyncio
+async def test_snapshots_render_like_messages(make_channel, create_messages):
+    channel = make_channel()
+    messages = create_messages(channel)
+
+    expected = await render(messages, channel.guild)
+
+    assert await render(list(map(MessageSnapshot.of, messages)), channel.guild) == (
+        expected
+    )
+
+
+@pytest.mark.asyncio
+async def test_rendering_leaves_messages_unchanged(
+    monkeypatch, make_channel, create_messages
+):
+    async def fetch_asset(url, session=None):
+        return 200, b"notes"
+
+    monkeypatch.setattr(
+        "DiscordTranscript.construct.attachment_handler.fetch_asset", fetch_asset
+    )
+    channel = make_channel()
+    messages = create_messages(channel)
+    attachment = messages[1].attachments[0]
+    handler = AttachmentToDataURIHandler()
+
+    html = await render(messages, channel.guild, handler)
+
+    assert [message.content for message in messages] == [
+        "**message** 0",
+        "**message** 1",
+        "**message** 2",
+    ]
+    assert len(messages[1].embeds) == 1
+    assert attachment.url.startswith("https://")
+    assert "data:text/plain;base64,bm90ZXM=" in html
+    # The reply preview still shows the rendered content of the message.
+    assert html.count("<strong>message</strong> 0") == 2
+
+    processed = await handler.process_asset(attachment)
+    assert isinstance(processed, AttachmentSnapshot)
+    assert processed.url.startswith("data:")
+    assert attachment.url.startswith("https://")
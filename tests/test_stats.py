@@ -0,0 +1,135 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+
+from DiscordTranscript.construct.attachment_handler import AttachmentHandler
+from DiscordTranscript.construct.transcript import Transcript, TranscriptDAO
+from DiscordTranscript.ext.context import ExportContext
+from DiscordTranscript.ext.stats import ExportStats, timed
+
+
+class SlowAttachmentHandler(AttachmentHandler):
+    async def process_asset(self, attachment):
+        await asyncio.sleep(0.02 if attachment.filename == "file3.png" else 0)
+        return attachment
+
+
+@pytest.fixture
+def channel(make_channel):
+    return make_channel(1, "test-channel")
+
+
+@pytest.fixture
+def create_message(make_message, channel):
+    def create_message(message_id):
+        message = make_message(message_id, channel, f"**message** {message_id} <@1> 🎉")
+        attachment = MagicMock()
+        attachment.content_type = "image/png"
+        attachment.filename = f"file{message_id}.png"
+        attachment.proxy_url = f"https://example.com/file{message_id}.png"
+        message.attachments = [attachment]
+        return message
+
+    return create_message
+
+
+def create_transcript(channel, messages, **kwargs):
+    async def history(**kwargs):
+        for message in messages:
+            yield message
+
+    channel.history = history
+    return Transcript(
+        channel,
+        None,
+        None,
+        "UTC",
+        True,
+        False,
+        None,
+        None,
+        None,
+        SlowAttachmentHandler(),
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_profiled_export_reports_every_stage(channel, create_message):
+    transcript = await create_transcript(
+        channel, [create_message(n) for n in range(5)], profile=True
+    ).export()
+
+    stages = transcript.stats.stages
+    assert set(stages) >= {
+        "history",
+        "fill_out",
+        "markdown",
+        "mention",
+        "emoji",
+        "attachments",
+        "members",
+        "messages",
+        "transcript",
+    }
+    assert stages["history"].calls == 1
+    assert stages["attachments"].calls == 5
+    assert stages["messages"].calls == 5
+    assert stages["members"].calls == 1
+    assert stages["transcript"].bytes == len(transcript.html)
+    assert stages["fill_out"].bytes > 0
+    assert transcript.stats.slowest_messages[0][0] == 3
+
+    report = transcript.stats.as_dict()
+    assert report["stages"]["messages"]["calls"] == 5
+    assert report["slowest_messages"][0]["message_id"] == 3
+
+
+@pytest.mark.asyncio
+async def test_export_is_not_profiled_by_default(channel, create_message):
+    transcript = await create_transcript(channel, [create_message(0)]).export()
+    assert transcript.stats is None
+
+
+@pytest.mark.asyncio
+async def test_stats_can_be_passed_in(channel, create_message):
+    stats = ExportStats(slowest=2)
+    transcript = TranscriptDAO(
+        channel,
+        None,
+        [create_message(n) for n in range(4)],
+        "UTC",
+        True,
+        False,
+        None,
+        None,
+        None,
+        SlowAttachmentHandler(),
+        stats=stats,
+    )
+    await transcript.build_transcript()
+
+    assert transcript.stats is stats
+    assert "history" not in stats.stages
+    assert [message_id for message_id, _ in stats.slowest_messages][0] == 3
+    assert len(stats.slowest_messages) == 2
+
+
+@pytest.mark.asyncio
+async def test_timed_only_records_inside_a_profiled_export():
+    @timed("lookup")
+    async def lookup():
+        return "value"
+
+    assert await lookup() == "value"
+
+    stats = ExportStats()
+    async with ExportContext(stats=stats):
+        await lookup()
+        await lookup()
+    async with ExportContext():
+        await lookup()
+
+    assert stats.stages["lookup"].calls == 2
+    assert stats.stages["lookup"].bytes == 10
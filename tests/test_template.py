@@ -0,0 +1,185 @@
+import random
+from unittest.mock import MagicMock
+
+import pytest
+
+from DiscordTranscript.ext import html_generator
+from DiscordTranscript.ext.html_generator import (
+    PARSE_MODE_EMBED,
+    PARSE_MODE_EMOJI,
+    PARSE_MODE_MARKDOWN,
+    PARSE_MODE_NO_MARKDOWN,
+    PARSE_MODE_NONE,
+    PARSE_MODE_REFERENCE,
+    PARSE_MODE_SPECIAL_EMBED,
+    fill_out,
+    fill_values,
+    is_plain_text,
+)
+from DiscordTranscript.ext.template import PLACEHOLDER_PATTERN, Template, get_template
+from DiscordTranscript.parse.markdown import ParseMarkdown
+from DiscordTranscript.parse.mention import ParseMention
+
+
+def legacy_fill(base, values):
+    for k, v in values:
+        base = base.replace("{{" + k + "}}", v)
+    return base
+
+
+def test_template_matches_legacy_replace_for_every_template():
+    sources = [v for v in vars(html_generator).values() if isinstance(v, str)]
+    sources = [s for s in sources if "{{" in s]
+    assert html_generator.total in sources
+
+    for source in sources:
+        keys = list(dict.fromkeys(PLACEHOLDER_PATTERN.findall(source)))
+        values = [(k, f"<value of {k.lower()}>") for k in keys]
+        assert Template(source).render(dict(values)) == legacy_fill(source, values)
+
+
+def test_template_keeps_unknown_placeholders():
+    template = Template("<a>{{ONE}}</a><b>{{TWO}}</b>{{ONE}}")
+    assert template.render({"ONE": "1"}) == "<a>1</a><b>{{TWO}}</b>1"
+
+
+def test_template_does_not_rescan_values():
+    template = Template("{{FIRST}}|{{SECOND}}")
+    assert template.render({"FIRST": "{{SECOND}}", "SECOND": "2"}) == "{{SECOND}}|2"
+
+
+def test_templates_are_compiled_at_import():
+    assert get_template(html_generator.total) is get_template(html_generator.total)
+    assert get_template("{{X}}") is not get_template("{{X}}")
+
+
+@pytest.mark.asyncio
+async def test_fill_out_first_replacement_wins():
+    result = await fill_out(
+        MagicMock(),
+        "<p>{{KEY}}</p>",
+        [("KEY", " first ", PARSE_MODE_NONE), ("KEY", "second", PARSE_MODE_NONE)],
+    )
+    assert result == "<p>first</p>"
+
+
+def test_template_partition_round_trips():
+    template = Template("<h>{{A}}</h><m>{{MESSAGES}}</m><f>{{A}}{{B}}</f>")
+    head, tail = template.partition("MESSAGES")
+    values = {"A": "a", "B": "b", "MESSAGES": "m"}
+    assert head.render(values) + "m" + tail.render(values) == template.render(values)
+    assert "MESSAGES" not in head.slots + tail.slots
+
+
+PARSED_MODES = (
+    PARSE_MODE_NO_MARKDOWN,
+    PARSE_MODE_MARKDOWN,
+    PARSE_MODE_EMBED,
+    PARSE_MODE_SPECIAL_EMBED,
+    PARSE_MODE_REFERENCE,
+    PARSE_MODE_EMOJI,
+)
+
+PLAIN_CORPUS = [
+    "",
+    "0",
+    "1182736451827364512",
+    "#FFFFFF",
+    "#ff0000",
+    "#1abc9c",
+    "01-01-2023 12:00",
+    "31-12-2023 09:05 PM",
+    "Jan 01, 2023",
+    "Jan 01, 2023 12:00:00 PM",
+    "user1",
+    "Mr Smith",
+    "12:00:00",
+    "1.5",
+    "1.",
+    "a - b",
+    "#general",
+    "#a #b",
+    "TENORGIFPLACEHOLDER0",
+    "LINK-FULL-0",
+    "trailing ",
+]
+
+MARKUP_CORPUS = [
+    " leading",
+    "#",
+    "##",
+    "# heading",
+    "### heading",
+    "1. item",
+    "- item",
+    "-# subtext",
+    "a_b_c",
+    "**bold**",
+    "~~gone~~",
+    "||spoiler||",
+    "`code`",
+    "&lt;@1&gt;",
+    "<@1>",
+    "@everyone here",
+    "&gt; quote",
+    "https://example.com",
+    "[a](b)",
+    "line\nbreak",
+    "🎉",
+    "&lt;:emoji:123&gt;",
+]
+
+
+async def parse_fully(guild, value, mode):
+    value = await ParseMention(value, guild).flow()
+    markdown = ParseMarkdown(value)
+    if mode == PARSE_MODE_MARKDOWN:
+        value = await markdown.standard_message_flow()
+    elif mode == PARSE_MODE_EMBED:
+        value = await markdown.standard_embed_flow()
+    elif mode == PARSE_MODE_SPECIAL_EMBED:
+        value = await markdown.special_embed_flow()
+    elif mode == PARSE_MODE_REFERENCE:
+        value = await markdown.message_reference_flow()
+    elif mode == PARSE_MODE_EMOJI:
+        value = await markdown.special_emoji_flow()
+    return str(value or "").strip()
+
+
+def test_plain_text_detection():
+    assert all(is_plain_text(value) for value in PLAIN_CORPUS)
+    assert not any(is_plain_text(value) for value in MARKUP_CORPUS)
+    assert not is_plain_text(None)
+    assert not is_plain_text(12)
+
+
+@pytest.mark.asyncio
+async def test_plain_values_skip_the_parsers(monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError("parsed a plain value")
+
+    monkeypatch.setattr(html_generator, "ParseMention", fail)
+    monkeypatch.setattr(html_generator, "ParseMarkdown", fail)
+    values = await fill_values(
+        MagicMock(), [(f"K{n}", value) for n, value in enumerate(PLAIN_CORPUS)]
+    )
+    assert list(values.values()) == [value.strip() for value in PLAIN_CORPUS]
+
+
+@pytest.mark.asyncio
+async def test_fast_path_matches_the_parsers():
+    rng = random.Random(0)
+    fuzzed = [
+        "".join(rng.choice("aZ09 #:,.-") for _ in range(rng.randint(1, 12)))
+        for _ in range(500)
+    ]
+    corpus = PLAIN_CORPUS + MARKUP_CORPUS + fuzzed
+    guild = MagicMock()
+
+    for mode in PARSED_MODES:
+        values = await fill_values(
+            guild, [(str(n), value, mode) for n, value in enumerate(corpus)]
+        )
+        for n, value in enumerate(corpus):
+            expected = await parse_fully(guild, value, mode)
+            assert values[str(n)] == expected, (mode, value)
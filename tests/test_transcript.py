@@ -1,4 +1,6 @@
 import datetime
+import io
+import re
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -173,3 +175,77 @@ async def test_attachment_data_uri_handler_image_optimization():
     opt_data, opt_type = handler._optimize_image(raw_data, "image/png")
     assert len(opt_data) < len(raw_data)
     assert opt_type in ("image/jpeg", "image/webp")
+
+
+@pytest.fixture
+def export_channel(mock_channel):
+    mock_channel.id = 42
+    mock_channel.topic = None
+    mock_channel.guild.id = 24
+    mock_channel.guild.name = "test-guild"
+    return mock_channel
+
+
+def _normalize(html):
+    html = re.sub(r"\d{2}:\d{2}:\d{2}( [AP]M)? \(UTC\)", "", html)
+    return re.sub(r"id='\d+'", "", html)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("binary", [False, True])
+async def test_streamed_transcript_matches_buffered(export_channel, binary):
+    def make_messages():
+        return [
+            create_mock_message(f"message {i}", datetime.datetime(2023, 1, 1, 12, i, 0))
+            for i in range(3)
+        ]
+
+    def make_transcript(messages, **kwargs):
+        return Transcript(
+            channel=export_channel,
+            limit=None,
+            messages=messages,
+            pytz_timezone="UTC",
+            military_time=True,
+            fancy_times=True,
+            before=None,
+            after=None,
+            bot=None,
+            attachment_handler=None,
+            **kwargs,
+        )
+
+    buffered = await make_transcript(make_messages()).export()
+
+    fp = io.BytesIO() if binary else io.StringIO()
+    streamed = await make_transcript(make_messages(), fp=fp).export()
+    output = fp.getvalue().decode() if binary else fp.getvalue()
+
+    assert streamed.html is None
+    assert "message 2" in output
+    assert _normalize(output) == _normalize(buffered.html)
+
+
+@pytest.mark.asyncio
+async def test_streamed_transcript_to_output_path(export_channel, tmp_path):
+    path = tmp_path / "transcript.html"
+    transcript = Transcript(
+        channel=export_channel,
+        limit=None,
+        messages=[create_mock_message("hello", datetime.datetime(2023, 1, 1))],
+        pytz_timezone="UTC",
+        military_time=True,
+        fancy_times=False,
+        before=None,
+        after=None,
+        bot=None,
+        attachment_handler=None,
+        output_path=path,
+    )
+
+    await transcript.export()
+
+    output = path.read_text(encoding="utf-8")
+    assert output.startswith("<!DOCTYPE html>")
+    assert "hello" in output
+    assert output.rstrip().endswith("</html>")